@@ -35,6 +35,11 @@ class CircularArc:
         }
         return CircularArc(**_param)
 
+    @staticmethod
+    def from_dict(data):
+        return CircularArc(data["radius"], data["is_ccw"], data["arc_length"], data["initial_direction"],
+                           np.array(data["start_point"], dtype=np.float64))
+
     def __init__(self, radius, is_ccw, arc_length, initial_direction, start_point: np.array):
         self.radius = radius
         self.arc_length = arc_length
@@ -88,6 +93,24 @@ class CircularArc:
             distances[i] = (samples[i]-start) * self.radius
         return np.flipud(distances) if _reverse else distances, np.array(parametric_circle(samples, center[0], center[1], self.radius))
 
+    @property
+    def signed_curvature(self):
+        return 1 / self.radius if self.is_ccw else -1 / self.radius
+
+    def curvature_at(self, distances):
+        return np.full_like(np.asarray(distances, dtype=np.float64), self.signed_curvature)
+
+    def evaluate(self, distances):
+        """
+        :param distances: distances along the segment, measured from its start
+        :return: points (2, n), heading (n,) and signed curvature (n,) at the given distances
+        """
+        distances = np.atleast_1d(np.asarray(distances, dtype=np.float64))
+        turned = distances * self.signed_curvature
+        center = self.center
+        points = np.array(parametric_circle(self.start_angle + turned, center[0], center[1], self.radius))
+        return points, self.initial_direction + turned, self.curvature_at(distances)
+
     def plot(self, _plt, linspace=1, is_end=False, color="dodgerblue"):
         _, points = self.sample(linspace, is_end)
         _plt.plot(points[0], points[1], lw=3, color=color)
@@ -16,6 +16,11 @@ class HorizontalLineSegment:
         }
         return HorizontalLineSegment(**_param)
 
+    @staticmethod
+    def from_dict(data):
+        return HorizontalLineSegment(data["segment_length"], data["initial_direction"],
+                                     np.array(data["start_point"], dtype=np.float64))
+
     def __init__(self, segment_length, initial_direction, start_point: np.array):
         self.segment_length = segment_length
         self.initial_direction = initial_direction
@@ -39,6 +44,19 @@ class HorizontalLineSegment:
       
         return distances, samples
 
+    def curvature_at(self, distances):
+        return np.zeros_like(np.asarray(distances, dtype=np.float64))
+
+    def evaluate(self, distances):
+        """
+        :param distances: distances along the segment, measured from its start
+        :return: points (2, n), heading (n,) and signed curvature (n,) at the given distances
+        """
+        distances = np.atleast_1d(np.asarray(distances, dtype=np.float64))
+        m = np.array([np.cos(self.initial_direction), np.sin(self.initial_direction)])
+        points = np.outer(m, distances) + self.start_point[:, None]
+        return points, np.full_like(distances, self.initial_direction), self.curvature_at(distances)
+
     def plot(self, _plt, linspace=1, is_end=False, color="dodgerblue"):
         _, points = self.sample(linspace, is_end)
         _plt.plot(points[0], points[1], lw=3, color=color)
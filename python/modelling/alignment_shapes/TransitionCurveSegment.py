@@ -6,7 +6,7 @@
 import numpy as np
 from numpy import cos, sin, arccos
 from scipy.integrate import odeint
-from pyclothoids import Clothoid
+from scipy.special import fresnel
 
 
 def clothoid_ode_rhs(state, s, kappa0, kappa1):
@@ -24,6 +24,27 @@ def parametric_circle(t, xc, yc, R):
     return x, y
 
 
+# Curvature law k(t) = k0 + (k1 - k0) * f(t) of the transition curve types with t = s / L in [0, 1].
+# Every entry is (f(t), integral of f from 0 to t). The cubic parabola is approximated by the clothoid law,
+# which is its first order (small angle) approximation.
+_biquadratic_f = lambda t: np.where(t <= 0.5, 2 * t ** 2, 1 - 2 * (1 - t) ** 2)
+_biquadratic_F = lambda t: np.where(t <= 0.5, 2 * t ** 3 / 3, t - 0.5 + 2 * (1 - t) ** 3 / 3)
+CURVATURE_LAWS = {
+    "CLOTHOIDCURVE": (lambda t: t, lambda t: t ** 2 / 2),
+    "CUBICPARABOLA": (lambda t: t, lambda t: t ** 2 / 2),
+    "BLOSSCURVE": (lambda t: 3 * t ** 2 - 2 * t ** 3, lambda t: t ** 3 - t ** 4 / 2),
+    "COSINECURVE": (lambda t: (1 - np.cos(np.pi * t)) / 2, lambda t: (t - np.sin(np.pi * t) / np.pi) / 2),
+    "SINECURVE": (lambda t: t - np.sin(2 * np.pi * t) / (2 * np.pi),
+                  lambda t: t ** 2 / 2 + (np.cos(2 * np.pi * t) - 1) / (4 * np.pi ** 2)),
+    "BIQUADRATICPARABOLA": (_biquadratic_f, _biquadratic_F),
+}
+
+# Gauss-Legendre nodes for integrating the heading of the non-clothoid transition curves
+_GL_NODES, _GL_WEIGHTS = np.polynomial.legendre.leggauss(8)
+# maximum change of the heading inside one integration interval [rad]
+_MAX_HEADING_STEP = 0.25
+
+
 class TransitionCurveSegment:
     @staticmethod
     def from_ifc(ifc_object):
@@ -39,6 +60,20 @@ class TransitionCurveSegment:
         }
         return TransitionCurveSegment(**_param)
 
+    @staticmethod
+    def from_dict(data):
+        _param = {
+            "segment_length": data["segment_length"],
+            "initial_direction": data["initial_direction"],
+            "start_point": np.array(data["start_point"], dtype=np.float64),
+            "start_radius": data.get("start_radius"),
+            "start_radius_ccw": data.get("start_radius_ccw"),
+            "end_radius": data.get("end_radius"),
+            "end_radius_ccw": data.get("end_radius_ccw"),
+            "curve_type": data["curve_type"]
+        }
+        return TransitionCurveSegment(**_param)
+
     def __init__(self, segment_length, initial_direction, start_point, start_radius, start_radius_ccw,
                  end_radius, end_radius_ccw, curve_type):
         self.segment_length = segment_length
@@ -51,27 +86,85 @@ class TransitionCurveSegment:
         self.end_radius_ccw = end_radius_ccw
         self.curve_type = curve_type
 
+    @property
+    def start_curvature(self):
+        k0 = 0 if self.start_radius == 0 else 1 / self.start_radius
+        return k0 if self.start_radius_ccw else -k0
+
+    @property
+    def end_curvature(self):
+        k1 = 0 if self.end_radius == 0 else 1 / self.end_radius
+        return k1 if self.end_radius_ccw else -k1
+
+    def _law(self):
+        if self.curve_type not in CURVATURE_LAWS:
+            raise NotImplementedError("{} was not yet implemented !".format(self.curve_type))
+        return CURVATURE_LAWS[self.curve_type]
+
+    def curvature_at(self, distances):
+        f, _ = self._law()
+        k0, k1 = self.start_curvature, self.end_curvature
+        return k0 + (k1 - k0) * f(np.asarray(distances, dtype=np.float64) / self.segment_length)
+
+    def heading_at(self, distances):
+        _, F = self._law()
+        s = np.asarray(distances, dtype=np.float64)
+        k0, k1 = self.start_curvature, self.end_curvature
+        return self.initial_direction + k0 * s + (k1 - k0) * self.segment_length * F(s / self.segment_length)
+
+    def _clothoid_points(self, s):
+        """Closed form of the clothoid (linear curvature) using Fresnel integrals."""
+        k0 = self.start_curvature
+        kd = (self.end_curvature - k0) / self.segment_length
+        a = abs(kd)
+        sigma = np.sign(kd)
+        # complete the square: theta(s) = phi + kd / 2 * (s + k0 / kd)^2
+        phi = self.initial_direction - k0 * k0 / (2 * kd)
+        scale = np.sqrt(np.pi / a)
+        S0, C0 = fresnel((k0 / kd) / scale)
+        S, C = fresnel((s + k0 / kd) / scale)
+        dc, ds = scale * (C - C0), sigma * scale * (S - S0)
+        x = self.start_point[0] + np.cos(phi) * dc - np.sin(phi) * ds
+        y = self.start_point[1] + np.sin(phi) * dc + np.cos(phi) * ds
+        return np.array([x, y])
+
+    def _integrated_points(self, s):
+        """Integrates the heading with a cumulative Gauss-Legendre quadrature, works for every curvature law."""
+        k_max = np.abs(self.curvature_at(np.linspace(0, self.segment_length, 33))).max()
+        m = max(int(np.ceil(k_max * self.segment_length / _MAX_HEADING_STEP)), 1)
+        breaks = np.unique(np.concatenate(([0.0], np.linspace(0, self.segment_length, m + 1), s)))
+
+        lower, upper = breaks[:-1], breaks[1:]
+        half = (upper - lower)[:, None] / 2
+        nodes = (upper + lower)[:, None] / 2 + half * _GL_NODES[None, :]
+        theta = self.heading_at(nodes)
+        dx = np.cumsum((half * np.cos(theta) * _GL_WEIGHTS).sum(axis=1))
+        dy = np.cumsum((half * np.sin(theta) * _GL_WEIGHTS).sum(axis=1))
+        dx, dy = np.concatenate(([0.0], dx)), np.concatenate(([0.0], dy))
+
+        idx = np.searchsorted(breaks, s)
+        return np.array([self.start_point[0] + dx[idx], self.start_point[1] + dy[idx]])
+
+    def evaluate(self, distances):
+        """
+        Evaluates the transition curve for all distances in one call.
+        :param distances: distances along the segment, measured from its start
+        :return: points (2, n), heading (n,) and signed curvature (n,) at the given distances
+        """
+        s = np.atleast_1d(np.asarray(distances, dtype=np.float64))
+        kd = (self.end_curvature - self.start_curvature) / self.segment_length
+        if self.curve_type == "CLOTHOIDCURVE" and abs(kd) > 1e-12:
+            points = self._clothoid_points(s)
+        else:
+            points = self._integrated_points(s)
+        return points, self.heading_at(s), self.curvature_at(s)
+
     def sample(self, linspace=1, is_end=True):
         samples = np.arange(0, self.segment_length, linspace)
         if is_end:
             samples = np.append(samples, self.segment_length)
-
-        if self.curve_type == "CLOTHOIDCURVE":
-            k0 = 0 if self.start_radius == 0 else 1 / self.start_radius
-            k1 = 0 if self.end_radius == 0 else 1 / self.end_radius
-            if not self.start_radius_ccw:
-                k0 *= -1
-            if not self.end_radius_ccw:
-                k1 *= -1
-
-            kd = (k1 - k0) / self.segment_length
-
-            clothoid = Clothoid.StandardParams(self.start_point[0], self.start_point[1], self.initial_direction,
-                                               k0, kd, self.segment_length)
-
-            cx = [clothoid.X(i) for i in samples]
-            cy = [clothoid.Y(i) for i in samples]
-            return samples, np.array([cx, cy])
+        points, _, _ = self.evaluate(samples)
+        return samples, points
 
     def plot(self, _plt, linspace=1, is_end=False, color="purple"):
         _, points = self.sample(linspace, is_end)
@@ -93,14 +186,15 @@ if __name__ == "__main__":
     obj.StartDirection = 0
     obj.StartPoint = type('IfcCartesianPoint', (object,), {})()
     obj.StartPoint.Coordinates = [0, 0]
-    obj.TransitionCurveType = "CLOTHOIDCURVE"
 
-    ca = TransitionCurveSegment.from_ifc(obj)
     plt.xlabel('x (m)')
     plt.ylabel('y (m)')
-    plt.title('An awesome Circle !')
+    plt.title('Some awesome Transitions !')
     plt.rc('grid', linestyle="-", color='black')
     plt.grid(True)
-    ca.plot(plt, is_end=True)
+    for curve_type, color in zip(CURVATURE_LAWS, ["purple", "orange", "green", "red", "blue", "black"]):
+        obj.TransitionCurveType = curve_type
+        ca = TransitionCurveSegment.from_ifc(obj)
+        ca.plot(plt, linspace=0.1, is_end=True, color=color)
     plt.gca().set_aspect('equal', adjustable='box')
     plt.show()
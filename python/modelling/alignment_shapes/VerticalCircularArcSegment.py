@@ -13,7 +13,6 @@ class VerticalCircularArcSegment(VerticalSegment):
         super().__init__()
         self.radius = 0
         self.is_convex = False
-        a = 1/0
 
     def parse(self, ifc_object):
         super().parse(ifc_object)
@@ -21,22 +20,31 @@ class VerticalCircularArcSegment(VerticalSegment):
         self.is_convex = ifc_object.IsConvex
         return self
 
-    def sample(self, linspace=1, is_end=False):
-        sample = np.arange(0, self.horizontal_length, self.horizontal_length / linspace)
-        values = np.zeros((len(sample), 2))
-        for i in range(len(sample)):
-            x = sample[i]
-            y = self.at_horizontal(x)
-            values[i] = np.array([x, y])
-        return values
-
-    def at_horizontal(self, in_seg_horizontal_pos):
-        # is_convex True, for crest and False for sag curves
+    @property
+    def center(self):
+        # is_convex True, for crest (center below the curve) and False for sag curves (center above the curve)
         a = self.radius / np.sqrt(1 + self.start_gradient * self.start_gradient)
         if self.is_convex:
-            return - np.sqrt(self.radius ^ 2 - (in_seg_horizontal_pos + a * self.start_gradient) ^ 2) + a
-        else:
-            return np.sqrt(self.radius ^ 2 - (in_seg_horizontal_pos - a * self.start_gradient) ^ 2) - a
+            return a * self.start_gradient, self.start_height - a
+        return -a * self.start_gradient, self.start_height + a
+
+    def _root(self, in_seg_horizontal_pos):
+        xc, _ = self.center
+        dx = np.asarray(in_seg_horizontal_pos, dtype=np.float64) - xc
+        return dx, np.sqrt(self.radius ** 2 - dx ** 2)
+
+    def at_horizontal(self, in_seg_horizontal_pos):
+        _, zc = self.center
+        _, root = self._root(in_seg_horizontal_pos)
+        return zc + root if self.is_convex else zc - root
+
+    def gradient_at(self, in_seg_horizontal_pos):
+        dx, root = self._root(in_seg_horizontal_pos)
+        return -dx / root if self.is_convex else dx / root
+
+    def curvature_at(self, in_seg_horizontal_pos):
+        curvature = -1 / self.radius if self.is_convex else 1 / self.radius
+        return np.full_like(np.asarray(in_seg_horizontal_pos, dtype=np.float64), curvature)
 
     def draw(self):
         pass
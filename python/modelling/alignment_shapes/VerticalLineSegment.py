@@ -13,20 +13,16 @@ class VerticalLineSegment(VerticalSegment):
         super().__init__()
 
     def parse(self, ifc_object):
-        super().parse(ifc_object)
-
-    def sample(self, linspace=1, is_end=False):
-        sample = np.arange(0, self.horizontal_length, self.horizontal_length / linspace)
-        m_cos = np.cos(self.m_angle)
-        values = np.zeros((len(sample), 2))
-        for i in range(len(sample)):
-            x = sample[i] * m_cos
-            y = self.at_horizontal(x)
-            values[i] = np.array([x, y])
-        return values
-
-    def at_horizontal(self, horizonal_pos):
-        return self.m_angle * horizonal_pos + self.start_height
+        return super().parse(ifc_object)
+
+    def at_horizontal(self, in_seg_horizontal_pos):
+        return self.start_gradient * np.asarray(in_seg_horizontal_pos, dtype=np.float64) + self.start_height
+
+    def gradient_at(self, in_seg_horizontal_pos):
+        return np.full_like(np.asarray(in_seg_horizontal_pos, dtype=np.float64), self.start_gradient)
+
+    def curvature_at(self, in_seg_horizontal_pos):
+        return np.zeros_like(np.asarray(in_seg_horizontal_pos, dtype=np.float64))
 
     def draw(self):
         pass
@@ -18,21 +18,25 @@ class VerticalParabolicArcSegment(VerticalSegment):
         super().parse(ifc_object)
         self.is_convex = ifc_object.IsConvex
         self.parabola_constant = ifc_object.ParabolaConstant
+        return self
 
-    def sample(self, linspace=1, is_end=False):
-        # warning this is not correct ! but it would need to be solved numerically
-        sample = np.arange(0, self.horizontal_length, self.horizontal_length / linspace)
-        values = np.zeros((len(sample), 2))
-        for i in range(len(sample)):
-            x = sample[i]
-            y = self.at_horizontal(x)
-            values[i] = np.array([x, y])
-        return values
+    @property
+    def signed_parabola_constant(self):
+        # is_convex True, for crest and False for sag curves
+        return -1 * self.parabola_constant if self.is_convex else self.parabola_constant
 
     def at_horizontal(self, in_seg_horizontal_pos):
-        R = -1 * self.parabola_constant if self.is_convex else self.parabola_constant
-        gradient = in_seg_horizontal_pos / R + self.start_gradient
-        return in_seg_horizontal_pos * (gradient + self.start_gradient)/2 + self.start_height
+        x = np.asarray(in_seg_horizontal_pos, dtype=np.float64)
+        gradient = x / self.signed_parabola_constant + self.start_gradient
+        return x * (gradient + self.start_gradient) / 2 + self.start_height
+
+    def gradient_at(self, in_seg_horizontal_pos):
+        x = np.asarray(in_seg_horizontal_pos, dtype=np.float64)
+        return x / self.signed_parabola_constant + self.start_gradient
+
+    def curvature_at(self, in_seg_horizontal_pos):
+        gradient = self.gradient_at(in_seg_horizontal_pos)
+        return 1 / self.signed_parabola_constant / (1 + gradient * gradient) ** 1.5
 
     def draw(self):
         pass
@@ -8,6 +8,10 @@ import numpy as np
 
 
 class VerticalSegment(ABC):
+    """
+    Base of all vertical alignment segments. Positions are horizontal distances measured from the start of the segment.
+    All evaluation methods are vectorized: they accept scalars or arrays and return arrays of the same shape.
+    """
 
     def __init__(self):
         self.start_distance_horizontal = 0
@@ -22,6 +26,7 @@ class VerticalSegment(ABC):
         self.horizontal_length = ifc_object.HorizontalLength
         self.start_height = ifc_object.StartHeight
         self.start_gradient = ifc_object.StartGradient
+        return self
 
     @classmethod
     def from_ifc(cls, ifc_object):
@@ -29,16 +34,47 @@ class VerticalSegment(ABC):
         vs.parse(ifc_object)
         return vs
 
+    @classmethod
+    def from_dict(cls, data):
+        """Restores a segment from its attributes, e.g. as written by the AlignmentEncoder"""
+        vs = cls()
+        for key in vs.__dict__:
+            if key in data:
+                setattr(vs, key, data[key])
+        return vs
+
     @property
     def m_angle(self):
         return np.arctan2(self.start_gradient, 1)
 
-    @abstractmethod
     def sample(self, linspace=1, is_end=False):
+        sample = np.arange(0, self.horizontal_length, self.horizontal_length / linspace)
+        if is_end:
+            sample = np.append(sample, self.horizontal_length)
+        return np.column_stack((sample, self.at_horizontal(sample)))
+
+    def evaluate(self, in_seg_horizontal_pos):
+        """
+        :param in_seg_horizontal_pos: horizontal distance(s) inside of the segment
+        :return: height, gradient and curvature of the profile at the given positions
+        """
+        return self.at_horizontal(in_seg_horizontal_pos), \
+            self.gradient_at(in_seg_horizontal_pos), \
+            self.curvature_at(in_seg_horizontal_pos)
+
+    @abstractmethod
+    def at_horizontal(self, in_seg_horizontal_pos):
+        """Height of the profile"""
+        pass
+
+    @abstractmethod
+    def gradient_at(self, in_seg_horizontal_pos):
+        """Gradient dz/dx of the profile"""
         pass
 
     @abstractmethod
-    def at_horizontal(self, horizonal_pos):
+    def curvature_at(self, in_seg_horizontal_pos):
+        """Signed curvature of the profile, positive for sag (concave up) and negative for crest curves"""
         pass
 
     @abstractmethod
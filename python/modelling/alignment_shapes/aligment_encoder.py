@@ -42,3 +42,71 @@ class AlignmentEncoder(json.JSONEncoder):
             return o.tolist()
 
         return json.JSONEncoder.default(self, o)
+
+
+class AlignmentDecoder:
+    """
+    Counterpart of the AlignmentEncoder, restores the segment objects from the dumped attributes.
+    """
+    m_registered_types = {
+        "CircularArc": lambda data: CircularArc.from_dict(data),
+        "HorizontalLineSegment": lambda data: HorizontalLineSegment.from_dict(data),
+        "TransitionCurveSegment": lambda data: TransitionCurveSegment.from_dict(data),
+        "VerticalLineSegment": lambda data: VerticalLineSegment.from_dict(data),
+        "VerticalParabolicArcSegment": lambda data: VerticalParabolicArcSegment.from_dict(data),
+        "VerticalCircularArcSegment": lambda data: VerticalCircularArcSegment.from_dict(data),
+    }
+
+    @classmethod
+    def decode(cls, data):
+        """json object_hook, dicts without a registered type are returned unchanged"""
+        ctype = data.get("type")
+        if ctype is None:
+            return data
+        if ctype in cls.m_registered_types:
+            return cls.m_registered_types[ctype](data)
+        raise NotImplementedError("{} can not be decoded !".format(ctype))
+
+
+# compact binary layout: one float64 row per segment, absent / None attributes are stored as nan
+HORIZONTAL_FIELDS = ["segment_length", "initial_direction", "radius", "is_ccw", "start_radius", "start_radius_ccw",
+                     "end_radius", "end_radius_ccw"]
+VERTICAL_FIELDS = ["start_distance_horizontal", "horizontal_length", "start_height", "start_gradient", "radius",
+                   "parabola_constant", "is_convex"]
+BOOLEAN_FIELDS = {"is_ccw", "start_radius_ccw", "end_radius_ccw", "is_convex"}
+
+
+def _value(segment, field):
+    value = getattr(segment, field, None)
+    return np.nan if value is None else float(value)
+
+
+def encode_segments(segments, fields, prefix):
+    """
+    :return: dict of arrays (types, parameter table and for horizontal segments start points and curve types)
+    """
+    arrays = {
+        f"{prefix}_types": np.array([type(s).__name__ for s in segments], dtype=str),
+        f"{prefix}_table": np.array([[_value(s, f) for f in fields] for s in segments],
+                                    dtype=np.float64).reshape(len(segments), len(fields)),
+    }
+    if prefix == "horizontal":
+        arrays[f"{prefix}_start_points"] = np.array([np.asarray(s.start_point, dtype=np.float64)[:2] for s in segments],
+                                                    dtype=np.float64).reshape(len(segments), 2)
+        arrays[f"{prefix}_curve_types"] = np.array([str(getattr(s, "curve_type", "")) for s in segments], dtype=str)
+    return arrays
+
+
+def decode_segments(arrays, fields, prefix):
+    segments = []
+    for idx, ctype in enumerate(arrays[f"{prefix}_types"]):
+        data = {"type": str(ctype)}
+        for field, value in zip(fields, arrays[f"{prefix}_table"][idx]):
+            if not np.isnan(value):
+                data[field] = bool(value) if field in BOOLEAN_FIELDS else float(value)
+        if prefix == "horizontal":
+            data["start_point"] = arrays[f"{prefix}_start_points"][idx]
+            data["arc_length"] = data["segment_length"]
+            data["curve_type"] = str(arrays[f"{prefix}_curve_types"][idx])
+        segments.append(AlignmentDecoder.decode(data))
+    return segments
@@ -1,14 +1,33 @@
 import json
 
 import pandas
+import pyarrow
+import pyarrow.feather
 
-from .aligment_encoder import AlignmentEncoder
+from .aligment_encoder import AlignmentEncoder, AlignmentDecoder, encode_segments, decode_segments, HORIZONTAL_FIELDS, \
+    VERTICAL_FIELDS
 from .dispatcher import Dispatcher
 import numpy as np
 from pathlib import Path
 import plotly.express as px
 from pandas import DataFrame
 
+# column types of a sampled alignment
+SAMPLE_DTYPES = {"x": np.float64,
+                 "y": np.float64,
+                 "z": np.float64,
+                 "horizontal_distance": np.float64,
+                 "segment_horizontal": np.int32,
+                 "horizontal_type": np.int32,
+                 "segment_vertical": np.int32,
+                 "segment_type": np.int32}
+# binary stores of the sampled alignments (single alignment & all alignments of one ifc)
+SAMPLE_SUFFIX = ".arrow"
+COMBINED_SAMPLE_SUFFIX = ".carrow"
+BINARY_SUFFIX = ".alignment.npz"
+# points per plotted line, a default plotly figure is 700px wide
+PLOT_POINT_BUDGET = 2000
+
 class Alignment:
     def __init__(self):
         self.name = ""
@@ -34,46 +53,162 @@ class Alignment:
                 return i - 1, horz_distance - self.vertical_search[i - 1], self.vertical[i - 1]
         return i, horz_distance - self.vertical_search[-1], self.vertical[-1]
 
-    def sample(self, linspace=0.1):
-        dataframes = []
+    def determine_vertical_alignments(self, horz_distances):
+        """
+        Batched version of determine_vertical_alignment. All stations are resolved with a single sorted search.
+        :param horz_distances: array of horizontal distances (stations)
+        :return: index of the vertical segment and the distance inside this segment for every station
+        """
+        search = np.asarray(self.vertical_search, dtype=np.float64)
+        horz_distances = np.asarray(horz_distances, dtype=np.float64)
+        idx = np.searchsorted(search, horz_distances, side="right") - 1
+        idx = np.clip(idx, 0, len(search) - 1)
+        return idx, horz_distances - search[idx]
+
+    def vertical_profile(self, horz_distances):
+        """
+        Evaluates the vertical alignment for all stations at once. Every vertical segment is evaluated over the whole
+        array of its stations instead of one milestone at a time.
+        :param horz_distances: array of horizontal distances (stations)
+        :return: (vertical segment index, vertical type id, z) per station
+        """
+        vt, seg_dist = self.determine_vertical_alignments(horz_distances)
+        z = np.empty_like(seg_dist)
+
+        # group stations by vertical segment
+        order = np.argsort(vt, kind="stable")
+        segments, starts = np.unique(vt[order], return_index=True)
+        bounds = np.append(starts, len(order))
+
+        type_ids = np.zeros(len(self.vertical), dtype=np.int64)
+        for seg_idx, start, end in zip(segments, bounds[:-1], bounds[1:]):
+            group = order[start:end]
+            z[group] = self.vertical[seg_idx].at_horizontal(seg_dist[group])
+
+        # register the type names in order of their first appearance (same as the milestone wise approach)
+        _, first_seen = np.unique(vt, return_index=True)
+        for seg_idx in vt[np.sort(first_seen)]:
+            vertical_segment_name = type(self.vertical[seg_idx]).__name__
+            if vertical_segment_name not in self.vertical_mapping:
+                self.vertical_mapping[vertical_segment_name] = len(self.vertical_mapping)
+            type_ids[seg_idx] = self.vertical_mapping[vertical_segment_name]
+
+        return vt, type_ids[vt], z
+
+    def vertical_curvature(self, horz_distances):
+        """
+        :param horz_distances: array of horizontal distances (stations)
+        :return: signed curvature of the vertical profile per station
+        """
+        vt, seg_dist = self.determine_vertical_alignments(horz_distances)
+        curvature = np.empty_like(seg_dist)
+        for seg_idx in np.unique(vt):
+            group = vt == seg_idx
+            curvature[group] = self.vertical[seg_idx].curvature_at(seg_dist[group])
+        return curvature
+
+    def _sample_stations(self, sampler):
+        """
+        Collects the stations of all horizontal segments and assembles the sampled alignment.
+        :param sampler: callable(horizontal_segment, distance_until_current_segment, is_end) -> (distances, xy)
+        """
         distance_until_current_segment = 0
-        # self.type_names = {}
+        xs, ys, stations, hsegments, htypes = [], [], [], [], []
 
         for hs_count, hs in enumerate(self.horizontal):
-            [samples, xy] = hs.sample(linspace=linspace, is_end=hs_count == len(self.horizontal) - 1)
-            z = np.ones_like(samples) * 101
-            vt = np.ones_like(samples)
-            vts = []
-            samples += distance_until_current_segment
-            for mpos, milestone in enumerate(samples):
-                [vst_pos, seg_dist, vertical_segment] = self.determine_vertical_alignment(milestone)
-                z[mpos] = vertical_segment.at_horizontal(seg_dist)
-                vt[mpos] = vst_pos
-                vertical_segment_name = type(vertical_segment).__name__
-                if vertical_segment_name not in self.vertical_mapping:
-                    self.vertical_mapping[vertical_segment_name] = len(self.vertical_mapping)
-                vertical_name_id = self.vertical_mapping[vertical_segment_name]
-                vts.append(vertical_name_id)
+            [samples, xy] = sampler(hs, distance_until_current_segment, hs_count == len(self.horizontal) - 1)
+            samples = samples + distance_until_current_segment
 
             type_name = type(hs).__name__
             if type_name not in self.horizontal_mapping:
                 self.horizontal_mapping[type_name] = len(self.horizontal_mapping)
             tt = self.horizontal_mapping[type_name]
 
-            dataframes.append(DataFrame({"x": xy[0], "y": xy[1], "z": z, "horizontal_distance": samples,
-                                         "segment_horizontal": np.ones_like(samples) * hs_count,
-                                         "horizontal_type": np.ones_like(samples) * tt,
-                                         "segment_vertical": vt, "segment_type": vts}))
+            xs.append(xy[0])
+            ys.append(xy[1])
+            stations.append(samples)
+            hsegments.append(np.ones_like(samples) * hs_count)
+            htypes.append(np.ones_like(samples) * tt)
             distance_until_current_segment += hs.segment_length
 
-        return pandas.concat(dataframes, ignore_index=True)
+        stations = np.concatenate(stations)
+        vt, vts, z = self.vertical_profile(stations)
+
+        return DataFrame({"x": np.concatenate(xs), "y": np.concatenate(ys), "z": z, "horizontal_distance": stations,
+                          "segment_horizontal": np.concatenate(hsegments),
+                          "horizontal_type": np.concatenate(htypes),
+                          "segment_vertical": vt.astype(np.float64), "segment_type": vts})
 
-    def plot(self, path=Path(""), show=False):
-        df = self.sample()
+    def sample(self, linspace=0.1):
+        return self._sample_stations(lambda hs, offset, is_end: hs.sample(linspace=linspace, is_end=is_end))
+
+    def adaptive_distances(self, hs, offset, max_error=0.01, min_step=0.1, max_step=50.0, is_end=False):
+        """
+        Places stations on a horizontal segment so that the sagitta between two consecutive points stays below
+        max_error. For a curvature k the allowed chord is sqrt(8 * max_error / |k|), therefore straights only get a
+        point every max_step, while arcs, clothoids and vertical curves get dense.
+        :param hs: horizontal segment
+        :param offset: horizontal distance at the start of the segment
+        :param max_error: maximum chord / sagitta error [m]
+        :param min_step: minimal distance between two stations [m]
+        :param max_step: maximal distance between two stations [m]
+        :param is_end: the end of the segment is added as station
+        :return: distances along the segment
+        """
+        length = hs.segment_length
+        vertical_breaks = np.asarray(self.vertical_search, dtype=np.float64) - offset
+        grid = np.unique(np.concatenate((np.linspace(0, length, 65),
+                                         vertical_breaks[(vertical_breaks > 0) & (vertical_breaks < length)])))
+
+        curvature = np.maximum(np.abs(hs.curvature_at(grid)), np.abs(self.vertical_curvature(grid + offset)))
+        density = np.clip(np.sqrt(curvature / (8 * max_error)), 1 / max_step, 1 / min_step)
+
+        # number of stations needed up to every grid point, the stations are placed on equal increments of it
+        cumulative = np.concatenate(([0.0], np.cumsum((density[1:] + density[:-1]) / 2 * np.diff(grid))))
+        n = max(int(np.ceil(cumulative[-1])), 1)
+        distances = np.interp(np.linspace(0, cumulative[-1], n + 1), cumulative, grid)
+        return distances if is_end else distances[:-1]
+
+    def sample_adaptive(self, max_error=0.01, min_step=0.1, max_step=50.0):
+        """
+        Samples the alignment with a curvature driven station spacing (see adaptive_distances) instead of a uniform
+        one. The resulting frame has the same columns as sample().
+        """
+        def sampler(hs, offset, is_end):
+            distances = self.adaptive_distances(hs, offset, max_error, min_step, max_step, is_end)
+            points, _, _ = hs.evaluate(distances)
+            return distances, points
+
+        return self._sample_stations(sampler)
+
+    def plot(self, path=Path(""), show=False, df=None):
+        """
+        :param df: already sampled alignment, otherwise the alignment is sampled with the default spacing
+        """
+        if df is None:
+            df = self.sample()
         self.__class__._plot(df, path, show, name=self.name)
 
     @staticmethod
-    def _plot(df : pandas.DataFrame, path, show, name):
+    def decimate(df: pandas.DataFrame, budget=PLOT_POINT_BUDGET):
+        """
+        Reduces a sampled alignment to roughly budget rows for plotting. The first and last row of every horizontal
+        and vertical segment are kept, so the coloured segments of the plots do not change.
+        """
+        if len(df) <= budget:
+            return df
+        keep = np.zeros(len(df), dtype=bool)
+        keep[np.linspace(0, len(df) - 1, budget).astype(np.int64)] = True
+        for column in ["segment_horizontal", "segment_vertical"]:
+            values = df[column].to_numpy()
+            change = np.flatnonzero(values[1:] != values[:-1])
+            keep[change] = True
+            keep[change + 1] = True
+        return df[keep]
+
+    @staticmethod
+    def _plot(df : pandas.DataFrame, path, show, name, budget=PLOT_POINT_BUDGET):
+        df = Alignment.decimate(df, budget)
         fig = px.line(df, x="x", y="y", color="segment_horizontal", hover_name="horizontal_type",
                       title=f"Horizontal Alignment {name}", line_shape="linear", render_mode="svg",
                       labels=dict(x="x [m]", y="y [m]", horizontal_type="IFC Name"))
@@ -143,6 +278,92 @@ class Alignment:
         with open(path, 'w') as fp:
             json.dump(self.__dict__, fp, indent=4, sort_keys=True, cls=AlignmentEncoder)
 
+    @staticmethod
+    def from_json(path):
+        """
+        Restores an alignment written by to_json, the analytic segments can be sampled again without the ifc.
+        """
+        with open(path, 'r') as fp:
+            data = json.load(fp, object_hook=AlignmentDecoder.decode)
+        return Alignment._from_parts(data["name"], data["horizontal"], data["vertical"], data.get("cant", []),
+                                     data.get("horizontal_mapping", {}), data.get("vertical_mapping", {}))
+
+    @staticmethod
+    def _from_parts(name, horizontal, vertical, cant, horizontal_mapping, vertical_mapping):
+        alignment = Alignment()
+        alignment.name = name
+        alignment.horizontal = horizontal
+        alignment.vertical = vertical
+        alignment.vertical_search = [vobject.start_distance_horizontal for vobject in vertical]
+        alignment.cant = cant
+        alignment.horizontal_mapping = dict(horizontal_mapping)
+        alignment.vertical_mapping = dict(vertical_mapping)
+        return alignment
+
+    def to_binary(self, path):
+        """
+        Compact binary counterpart of to_json: one parameter row per segment in a npz archive.
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        mappings = {"horizontal_mapping": self.horizontal_mapping, "vertical_mapping": self.vertical_mapping}
+        with open(path, "wb") as f:
+            np.savez_compressed(f, name=np.array(self.name if self.name is not None else ""),
+                                mappings=np.array(json.dumps(mappings)),
+                                **encode_segments(self.horizontal, HORIZONTAL_FIELDS, "horizontal"),
+                                **encode_segments(self.vertical, VERTICAL_FIELDS, "vertical"))
+
+    @staticmethod
+    def from_binary(path):
+        with np.load(path) as data:
+            arrays = {key: data[key] for key in data.files}
+        mappings = json.loads(str(arrays["mappings"]))
+        return Alignment._from_parts(str(arrays["name"]),
+                                     decode_segments(arrays, HORIZONTAL_FIELDS, "horizontal"),
+                                     decode_segments(arrays, VERTICAL_FIELDS, "vertical"), [],
+                                     mappings["horizontal_mapping"], mappings["vertical_mapping"])
+
+    @staticmethod
+    def binary_path(folder, name):
+        """The binary alignment does not depend on the sampling, so it is stored once per alignment"""
+        return Path(folder) / ("#{}".format(name).replace(".", "m") + BINARY_SUFFIX)
+
+
+    @staticmethod
+    def to_arrow(df: pandas.DataFrame, path):
+        """
+        Writes a sampled alignment as typed, uncompressed arrow ipc (feather v2) file, which can be memory mapped.
+        """
+        table = pyarrow.Table.from_pandas(df.astype(SAMPLE_DTYPES), preserve_index=False)
+        pyarrow.feather.write_feather(table, str(path), compression="uncompressed")
+
+    @staticmethod
+    def from_arrow(input_path, columns=None):
+        table = pyarrow.feather.read_table(str(input_path), columns=columns, memory_map=True)
+        return table.to_pandas(split_blocks=True)
+
+    @staticmethod
+    def read_samples(input_path, columns=None):
+        """
+        Reads a sampled alignment from the binary store or a csv export.
+        """
+        if Path(input_path).suffix in [SAMPLE_SUFFIX, COMBINED_SAMPLE_SUFFIX]:
+            return Alignment.from_arrow(input_path, columns)
+        samples = Alignment.from_csv(input_path)
+        return samples[columns] if columns else samples
+
+    @staticmethod
+    def sample_paths(folder, pattern="*"):
+        """
+        Sampled alignments in a folder, the binary store is preferred over csv exports.
+        Combined files, local (shifted) copies and the global position are skipped.
+        """
+        def is_sample(path):
+            return not path.stem.endswith("_local") and path.name != "global_position.csv"
+
+        paths = [p for p in Path(folder).glob(pattern + SAMPLE_SUFFIX) if is_sample(p)]
+        known = {p.with_suffix("") for p in paths}
+        paths += [p for p in Path(folder).glob(pattern + ".csv") if is_sample(p) and p.with_suffix("") not in known]
+        return sorted(paths)
 
     @staticmethod
     def from_csv(input_path):
@@ -156,3 +377,13 @@ class Alignment:
                                       "horizontal_type": np.float64,
                                       "segment_vertical": np.float64,
                                       "segment_type": str})
+
+
+def plot_alignments(jobs, show=False, budget=PLOT_POINT_BUDGET):
+    """
+    Renders the plots of already sampled alignments. All figures are rendered in the calling process, so kaleido is
+    only started once. Meant to run in a background process next to the model preparation.
+    :param jobs: list of (sample path, plot path, name)
+    """
+    for sample_path, plot_path, name in jobs:
+        Alignment._plot(Alignment.read_samples(sample_path), path=Path(plot_path), show=show, name=name, budget=budget)
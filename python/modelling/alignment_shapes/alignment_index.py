@@ -0,0 +1,159 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+from pathlib import Path
+
+import numpy as np
+from pandas import DataFrame
+from scipy.spatial import cKDTree
+
+
+class AlignmentIndex:
+    """
+    Station query engine for a parsed alignment.
+    Forward queries (station -> x, y, z, heading, curvature) resolve the horizontal segment with a sorted search and
+    evaluate the analytic segments. Inverse queries (xyz -> station, lateral offset, height) use a kd-tree over a
+    polyline, whose chords deviate less than max_error from the alignment, and are refined on the analytic geometry.
+    A loaded index without alignment answers both queries on the polyline (accuracy: max_error).
+    """
+
+    def __init__(self, name, segment_starts, table, max_error, alignment=None):
+        self.name = name
+        self.segment_starts = segment_starts
+        self.table = table
+        self.max_error = max_error
+        self.alignment = alignment
+        self._tree = cKDTree(np.column_stack((table["x"], table["y"])))
+
+    @classmethod
+    def from_alignment(cls, alignment, max_error=0.001, max_step=5.0):
+        """
+        :param alignment: parsed Alignment
+        :param max_error: maximal deviation of the polyline chords from the alignment [m]
+        :param max_step: maximal distance between two polyline vertices [m]
+        """
+        lengths = np.array([hs.segment_length for hs in alignment.horizontal], dtype=np.float64)
+        segment_starts = np.concatenate(([0.0], np.cumsum(lengths)))
+
+        stations, points, heading, curvature = [], [], [], []
+        for hs_count, hs in enumerate(alignment.horizontal):
+            distances = alignment.adaptive_distances(hs, segment_starts[hs_count], max_error, min(0.1, max_step), max_step,
+                                                     is_end=hs_count == len(alignment.horizontal) - 1)
+            _points, _heading, _curvature = hs.evaluate(distances)
+            stations.append(distances + segment_starts[hs_count])
+            points.append(_points)
+            heading.append(_heading)
+            curvature.append(_curvature)
+
+        stations = np.concatenate(stations)
+        points = np.concatenate(points, axis=1)
+        _, _, z = alignment.vertical_profile(stations)
+        table = {"station": stations, "x": points[0], "y": points[1], "z": z,
+                 "heading": np.unwrap(np.concatenate(heading)), "curvature": np.concatenate(curvature)}
+        return cls(alignment.name, segment_starts, table, max_error, alignment)
+
+    @property
+    def length(self):
+        return self.segment_starts[-1]
+
+    def segment_of(self, stations):
+        """Index of the horizontal segment for every station"""
+        idx = np.searchsorted(self.segment_starts, stations, side="right") - 1
+        return np.clip(idx, 0, len(self.segment_starts) - 2)
+
+    def _interpolate(self, stations, key):
+        return np.interp(stations, self.table["station"], self.table[key])
+
+    def pose(self, stations):
+        """
+        Forward query.
+        :param stations: horizontal distances along the alignment
+        :return: DataFrame with station, x, y, z, heading and curvature (horizontal) per station
+        """
+        stations = np.atleast_1d(np.asarray(stations, dtype=np.float64))
+        if self.alignment is None:
+            columns = {key: self._interpolate(stations, key) for key in ["x", "y", "z", "heading", "curvature"]}
+            return DataFrame({"station": stations, **columns})
+
+        x, y = np.empty_like(stations), np.empty_like(stations)
+        heading, curvature = np.empty_like(stations), np.empty_like(stations)
+        segments = self.segment_of(stations)
+        for seg_idx in np.unique(segments):
+            group = segments == seg_idx
+            points, heading[group], curvature[group] = \
+                self.alignment.horizontal[seg_idx].evaluate(stations[group] - self.segment_starts[seg_idx])
+            x[group], y[group] = points
+        _, _, z = self.alignment.vertical_profile(stations)
+        return DataFrame({"station": stations, "x": x, "y": y, "z": z, "heading": heading, "curvature": curvature})
+
+    def _project_polyline(self, xy_points, candidates):
+        """Station of the closest point on the polyline chords adjacent to the nearest vertices"""
+        x, y, station = self.table["x"], self.table["y"], self.table["station"]
+        _, nearest = self._tree.query(xy_points, k=candidates)
+        nearest = nearest.reshape(len(xy_points), -1)
+        chords = np.clip(np.concatenate((nearest - 1, nearest), axis=1), 0, len(x) - 2)
+
+        ax, ay = x[chords], y[chords]
+        abx, aby = x[chords + 1] - ax, y[chords + 1] - ay
+        apx, apy = xy_points[:, 0, None] - ax, xy_points[:, 1, None] - ay
+        t = np.clip((apx * abx + apy * aby) / np.maximum(abx * abx + aby * aby, 1e-12), 0, 1)
+        distance = (apx - t * abx) ** 2 + (apy - t * aby) ** 2
+
+        best = np.argmin(distance, axis=1)
+        rows = np.arange(len(xy_points))
+        chord, t = chords[rows, best], t[rows, best]
+        return station[chord] + t * (station[chord + 1] - station[chord])
+
+    def project(self, points, candidates=2, iterations=2, chunk_size=1 << 18):
+        """
+        Inverse query, projects points perpendicular onto the horizontal alignment.
+        :param points: (n, 3) or (n, 2) array of coordinates
+        :param candidates: number of nearest polyline vertices whose adjacent chords are tested
+        :param iterations: newton iterations on the analytic geometry (only with alignment)
+        :param chunk_size: number of points processed at once
+        :return: DataFrame with station, offset (lateral, positive to the left) and height (above the alignment)
+        """
+        points = np.atleast_2d(np.asarray(points, dtype=np.float64))
+        candidates = min(candidates, len(self.table["x"]))
+        stations = np.concatenate([self._project_polyline(points[i:i + chunk_size, :2], candidates)
+                                   for i in range(0, len(points), chunk_size)] or [np.empty(0)])
+
+        for _ in range(iterations if self.alignment is not None else 0):
+            pose = self.pose(stations)
+            dx, dy = points[:, 0] - pose["x"].to_numpy(), points[:, 1] - pose["y"].to_numpy()
+            cos_h, sin_h = np.cos(pose["heading"].to_numpy()), np.sin(pose["heading"].to_numpy())
+            along = dx * cos_h + dy * sin_h
+            across = -dx * sin_h + dy * cos_h
+            stations = np.clip(stations + along / (1 - pose["curvature"].to_numpy() * across), 0, self.length)
+
+        pose = self.pose(stations)
+        heading = pose["heading"].to_numpy()
+        offset = -(points[:, 0] - pose["x"].to_numpy()) * np.sin(heading) + (points[:, 1] - pose["y"].to_numpy()) * np.cos(heading)
+        height = points[:, 2] - pose["z"].to_numpy() if points.shape[1] > 2 else np.zeros_like(stations)
+        return DataFrame({"station": stations, "offset": offset, "height": height})
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez_compressed(f, name=np.array(self.name if self.name is not None else ""),
+                                segment_starts=self.segment_starts, max_error=np.array(self.max_error),
+                                **{f"table_{key}": value for key, value in self.table.items()})
+
+    @classmethod
+    def load(cls, path, alignment=None):
+        """
+        :param path: path of a saved index
+        :param alignment: parsed alignment to answer queries on the analytic geometry, otherwise the polyline is used
+        """
+        with np.load(path) as data:
+            table = {key[len("table_"):]: data[key] for key in data.files if key.startswith("table_")}
+            return cls(str(data["name"]), data["segment_starts"], table, float(data["max_error"]), alignment)
+
+    @staticmethod
+    def index_path(alignment_json_path):
+        """The index is stored next to the alignment json"""
+        path = Path(alignment_json_path)
+        return path.with_name(f"{path.stem}.index.npz")
@@ -0,0 +1,87 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+import numpy as np
+
+# Overhead lines (german := "Fahrdraht") exported from ProVI are one mesh of contact wire, droppers and messenger wire.
+CONTACT_WIRE, DROPPER, MESSENGER_WIRE = 0, 1, 2
+PART_NAMES = {CONTACT_WIRE: "Fahrdraht", DROPPER: "Hänger", MESSENGER_WIRE: "Tragseil"}
+WIRE_THRESHOLD = 0.044  # height band of the wires in the plane of the catenary [m]
+
+
+def _segments(counts):
+    """Start offsets and segment id per entry for consecutive segments of the given lengths"""
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    return offsets, np.repeat(np.arange(len(counts)), counts)
+
+
+def classify_catenaries(meshes, threshold=WIRE_THRESHOLD):
+    """
+    Classifies the faces of a batch of catenary meshes.
+    The vertices are projected onto the second principal axis of each mesh (the vertical of the catenary plane).
+    Faces with all vertices in the lowest band are contact wire, in the highest band messenger wire, the rest droppers.
+    :param meshes: list of (vertices (n, 3), faces (m, 3))
+    :return: list of part per face (CONTACT_WIRE, DROPPER, MESSENGER_WIRE)
+    """
+    if not meshes:
+        return []
+    vertex_counts = np.array([len(v) for v, _ in meshes])
+    face_counts = np.array([len(f) for _, f in meshes])
+    vertex_offsets, vertex_mesh = _segments(vertex_counts)
+    face_offsets, face_mesh = _segments(face_counts)
+    vertices = np.concatenate([np.asarray(v, dtype=np.float64).reshape(-1, 3) for v, _ in meshes])
+    faces = np.concatenate([np.asarray(f, dtype=np.int64).reshape(-1, 3) for _, f in meshes]) + vertex_offsets[face_mesh, None]
+
+    # principal axes per mesh from the 3x3 scatter matrices (same axes as the svd of the centered vertices)
+    def sum_per_mesh(values):
+        return np.bincount(vertex_mesh, weights=values, minlength=len(meshes))
+
+    means = np.stack([sum_per_mesh(vertices[:, k]) for k in range(3)], axis=1) / np.maximum(vertex_counts, 1)[:, None]
+    centered = vertices - means[vertex_mesh]
+    scatter = np.stack([np.stack([sum_per_mesh(centered[:, i] * centered[:, j]) for j in range(3)], axis=1)
+                        for i in range(3)], axis=1)
+    _, _, axes = np.linalg.svd(scatter)
+    # orientation: the components of each axis sum up positive, this makes the result independent of the svd signs
+    axis = axes[:, 1, :] * np.sign(axes[:, 1, :].sum(axis=1))[:, None]
+    heights = np.einsum("nk,nk->n", centered, axis[vertex_mesh])[faces]
+
+    # faces are stored consecutively per mesh
+    lowest = np.full(len(meshes), np.inf)
+    highest = np.full(len(meshes), -np.inf)
+    filled = face_counts > 0
+    if np.any(filled):
+        lowest[filled] = np.minimum.reduceat(heights.min(axis=1), face_offsets[:-1][filled])
+        highest[filled] = np.maximum.reduceat(heights.max(axis=1), face_offsets[:-1][filled])
+    tags = (heights > (highest - threshold)[face_mesh, None]).astype(np.int64) - \
+           (heights < (lowest + threshold)[face_mesh, None]).astype(np.int64)
+    face_value = tags.sum(axis=1)
+
+    parts = np.full(len(faces), DROPPER, dtype=np.int64)
+    parts[face_value == -3] = CONTACT_WIRE
+    parts[face_value == 3] = MESSENGER_WIRE
+    return np.split(parts, face_offsets[1:-1])
+
+
+def split_mesh(vertices, faces, parts):
+    """
+    Separates a mesh into its parts, every part only keeps its own vertices.
+    :return: list of (part, vertices, faces), empty parts are skipped
+    """
+    result = []
+    for part in np.unique(parts):
+        part_faces = faces[parts == part]
+        used, remapped = np.unique(part_faces, return_inverse=True)
+        result.append((int(part), vertices[used], remapped.reshape(-1, 3)))
+    return result
+
+
+def split_catenaries(meshes, threshold=WIRE_THRESHOLD):
+    """
+    :param meshes: list of (vertices (n, 3), faces (m, 3))
+    :return: list of [(part, vertices, faces), ...] per mesh, ordered contact wire, dropper, messenger wire
+    """
+    return [split_mesh(np.asarray(v), np.asarray(f), parts)
+            for (v, f), parts in zip(meshes, classify_catenaries(meshes, threshold))]
+
@@ -0,0 +1,211 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+import json
+from fnmatch import fnmatchcase
+from pathlib import Path
+
+import ifcopenshell
+import numpy as np
+from scipy.spatial import cKDTree
+
+from python.modelling.obj_writer import ObjWriter, read_obj
+
+# The error bound grows linearly with the distance to the track. The point spacing of a scanner grows the same way
+# (angular resolution ~0.6 mrad), half of it is not visible in the simulated point cloud.
+DEFAULT_RULE = {"min_error": 0.0, "error_per_m": 0.0005, "max_error": 0.05, "keep": False}
+BASE_CELL = 0.001  # [m] finest clustering cell, vertices with a smaller error bound are not moved
+ALIGNMENT_SPACING = 1.0  # [m] densification of the sampled alignment for the distance queries
+
+
+class DecimationConfig:
+    """
+    Decimation rules per IFC class and name. The first rule whose patterns (fnmatch, case sensitive) match the class and
+    the name of an element is used, its values override the default rule. Example:
+    {
+        "default": {"error_per_m": 0.0005, "max_error": 0.05},
+        "rules": [
+            {"class": "IfcRail*", "keep": true},
+            {"name": "*Gelaender*", "error_per_m": 0.002, "max_error": 0.1}
+        ]
+    }
+    """
+
+    def __init__(self, rules=(), default=None):
+        self.default = {**DEFAULT_RULE, **(default or {})}
+        self.rules = list(rules)
+
+    @classmethod
+    def read(cls, path):
+        if path is None:
+            return cls()
+        with open(path, "r") as f:
+            data = json.load(f)
+        return cls(data.get("rules", []), data.get("default"))
+
+    @property
+    def key(self):
+        """Description of the config, the decimation of a container is repeated if it changes"""
+        return json.dumps([self.default, self.rules], sort_keys=True)
+
+    def rule(self, ifc_class, name):
+        """
+        :param ifc_class: class of the element, None if unknown (obj without class in its mapping), then only rules without
+                          class match
+        """
+        for rule in self.rules:
+            if "class" in rule and (ifc_class is None or not fnmatchcase(ifc_class, rule["class"])):
+                continue
+            if "name" in rule and not fnmatchcase(name or "", rule["name"]):
+                continue
+            return {**self.default, **rule}
+        return self.default
+
+
+def alignment_tree(samples, spacing=ALIGNMENT_SPACING):
+    """
+    Kd-tree over the sampled alignments, densified to the given spacing (the adaptive sampling may be much coarser).
+    :param samples: list of (n, 3) arrays
+    """
+    points = []
+    for xyz in samples:
+        xyz = np.asarray(xyz, dtype=np.float64)
+        if len(xyz) < 2:
+            points.append(xyz)
+            continue
+        lengths = np.concatenate(([0.0], np.cumsum(np.linalg.norm(np.diff(xyz, axis=0), axis=1))))
+        stations = np.linspace(0.0, lengths[-1], max(2, int(np.ceil(lengths[-1] / spacing)) + 1))
+        points.append(np.column_stack([np.interp(stations, lengths, xyz[:, k]) for k in range(3)]))
+    return cKDTree(np.concatenate(points))
+
+
+def error_bound(rule, distances):
+    """:return: maximal displacement of the vertices [m] at the given distances from the alignment"""
+    if rule["keep"]:
+        return np.zeros_like(distances)
+    return np.clip(rule["min_error"] + rule["error_per_m"] * distances, 0.0, rule["max_error"])
+
+
+def cluster_vertices(vertices, faces, errors, base_cell=BASE_CELL):
+    """
+    Vertex clustering with a per vertex error bound. Each vertex falls into a grid cell of the largest power of two
+    multiple of base_cell, whose diagonal stays within its error bound. The vertices of a cell are merged into their
+    mean, collapsed and duplicate triangles are removed.
+    :param errors: (n,) maximal displacement per vertex [m]
+    :return: vertices (k, 3), faces (l, 3)
+    """
+    cells = errors / np.sqrt(3)
+    with np.errstate(divide="ignore"):
+        levels = np.floor(np.log2(cells / base_cell))
+    movable = np.isfinite(levels) & (levels >= 0)
+    levels = np.where(movable, levels, 0).astype(np.int64)
+    keys = np.empty((len(vertices), 4), dtype=np.int64)
+    keys[:, 0] = np.where(movable, levels, -1)
+    keys[:, 1:] = np.floor(vertices / (base_cell * np.exp2(levels))[:, None])
+    # vertices below the finest cell are their own cluster
+    keys[~movable, 1] = np.arange(np.count_nonzero(~movable))
+    keys[~movable, 2:] = 0
+
+    _, cluster, counts = np.unique(keys, axis=0, return_inverse=True, return_counts=True)
+    cluster = cluster.reshape(-1)
+    merged = np.stack([np.bincount(cluster, weights=vertices[:, k]) for k in range(3)], axis=1) / counts[:, None]
+
+    new_faces = cluster[faces]
+    valid = (new_faces[:, 0] != new_faces[:, 1]) & (new_faces[:, 1] != new_faces[:, 2]) & (new_faces[:, 0] != new_faces[:, 2])
+    new_faces = new_faces[valid]
+    # duplicates independent of the orientation, the first triangle is kept
+    _, first = np.unique(np.sort(new_faces, axis=1), axis=0, return_index=True)
+    new_faces = new_faces[np.sort(first)]
+    used, remapped = np.unique(new_faces, return_inverse=True)
+    return merged[used], remapped.reshape(-1, 3)
+
+
+def decimate_mesh(vertices, faces, tree, rule):
+    """
+    :return: vertices, faces; the input if nothing would be left (tiny elements far away are still hit by the scanner)
+    """
+    if rule["keep"] or len(faces) == 0:
+        return vertices, faces
+    distances, _ = tree.query(vertices)
+    new_vertices, new_faces = cluster_vertices(vertices, faces, error_bound(rule, distances))
+    if len(new_faces) == 0:
+        return vertices, faces
+    return new_vertices, new_faces
+
+
+def decimate_ifc(path, tree, config):
+    """
+    Decimates the triangulated face sets of a container written by extract_areas (world coordinates) in place.
+    :return: number of triangles before and after
+    """
+    ifc_file = ifcopenshell.open(str(path))
+    before, after = 0, 0
+    for product in ifc_file.by_type("IfcProduct"):
+        if product.Representation is None:
+            continue
+        rule = config.rule(product.is_a(), product.Name)
+        for representation in product.Representation.Representations:
+            for item in representation.Items:
+                if not item.is_a("IfcTriangulatedFaceSet") or item.PnIndex:
+                    continue
+                vertices = np.array(item.Coordinates.CoordList, dtype=np.float64)
+                faces = np.array(item.CoordIndex, dtype=np.int64) - 1
+                new_vertices, new_faces = decimate_mesh(vertices, faces, tree, rule)
+                before += len(faces)
+                after += len(new_faces)
+                if new_faces is faces:
+                    continue
+                item.Coordinates.CoordList = new_vertices.tolist()
+                if item.Coordinates.TagList:
+                    item.Coordinates.TagList = [str(i) for i in range(1, len(new_vertices) + 1)]
+                item.CoordIndex = (new_faces + 1).tolist()
+                item.Normals = None
+    ifc_file.write(str(path))
+    return before, after
+
+
+def decimate_obj(path, tree, config, names=None, ifc_classes=None):
+    """
+    Decimates an obj written by ObjWriter in place, the mtl is kept.
+    :param names: dict of object name (expanded GlobalId) -> element name, e.g. from the class mapping
+    :param ifc_classes: dict of object name -> IFC class, e.g. from the class mapping
+    :return: number of triangles before and after
+    """
+    names = names or {}
+    ifc_classes = ifc_classes or {}
+    objects = read_obj(path)
+    before, after = 0, 0
+    with ObjWriter(path, write_mtl=False) as writer:
+        for name, vertices, faces in objects:
+            new_vertices, new_faces = decimate_mesh(vertices, faces, tree, config.rule(ifc_classes.get(name), names.get(name)))
+            before += len(faces)
+            after += len(new_faces)
+            writer.add(name, new_vertices, new_faces)
+    return before, after
+
+
+def decimate_container(path, tree, config, names=None, ifc_classes=None):
+    """
+    Decimates a container (ifc or obj) once. A record next to it skips the container in later runs, unless it was
+    rewritten (e.g. by an incremental extract_areas) or the config changed. Decimating twice would add up the errors.
+    :return: number of triangles before and after, None if skipped
+    """
+    path = Path(path)
+    record_path = path.with_name(f"{path.stem}{path.suffix.replace('.', '_')}_decimation.json")
+    if record_path.exists():
+        with open(record_path, "r") as f:
+            record = json.load(f)
+        stat = path.stat()
+        if record == {"config": config.key, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}:
+            return None
+
+    if path.suffix == ".obj":
+        result = decimate_obj(path, tree, config, names, ifc_classes)
+    else:
+        result = decimate_ifc(path, tree, config)
+    stat = path.stat()
+    with open(record_path, "w") as f:
+        json.dump({"config": config.key, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}, f)
+    return result
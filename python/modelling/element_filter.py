@@ -0,0 +1,91 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+import json
+from fnmatch import fnmatchcase
+
+import ifcopenshell.util.element
+
+
+class ElementFilter:
+    """
+    Declarative selection of the elements of extract_areas, evaluated before the geometry iterator runs.
+    A rule matches an element if all of its conditions match:
+        "class": IFC class, subtypes included (e.g. "IfcBuildingElement")
+        "name": fnmatch pattern of the Name (case sensitive)
+        "properties": {"Pset.Property": value}, strings are fnmatch patterns (psets of the type are inherited)
+    An element is kept if it matches one of the include rules (or there are none) and none of the exclude rules.
+    Example:
+    {
+        "include": [{"class": "IfcElement"}],
+        "exclude": [
+            {"class": "IfcSpace"}, {"class": "IfcAnnotation"},
+            {"class": "IfcBuildingElementProxy", "properties": {"Pset_Visualisierung.Sichtbar": false}},
+            {"class": "IfcDistributionElement", "name": "*Kabel*"}
+        ]
+    }
+    """
+
+    def __init__(self, include=(), exclude=()):
+        self.include = list(include)
+        self.exclude = list(exclude)
+        self._decisions = {}  # instance id -> kept, the filter is applied to the same products several times
+
+    @classmethod
+    def read(cls, path):
+        if path is None:
+            return cls()
+        with open(path, "r") as f:
+            data = json.load(f)
+        return cls(data.get("include", []), data.get("exclude", []))
+
+    @property
+    def key(self):
+        """Description of the filter, the incremental manifest is not valid after it changed"""
+        return json.dumps([self.include, self.exclude], sort_keys=True)
+
+    def __bool__(self):
+        return bool(self.include or self.exclude)
+
+    @staticmethod
+    def _property_matches(psets, name, expected):
+        pset_name, _, property_name = name.partition(".")
+        value = psets.get(pset_name, {}).get(property_name)
+        if isinstance(expected, str) and isinstance(value, str):
+            return fnmatchcase(value, expected)
+        return value == expected
+
+    def matches(self, rule, element, cache=None):
+        """
+        :param cache: dict per element, the property sets are only read once and only if a rule needs them
+        """
+        if "class" in rule and not element.is_a(rule["class"]):
+            return False
+        if "name" in rule and not fnmatchcase(element.Name or "", rule["name"]):
+            return False
+        if "properties" in rule:
+            cache = {} if cache is None else cache
+            if "psets" not in cache:
+                cache["psets"] = ifcopenshell.util.element.get_psets(element)
+            return all(self._property_matches(cache["psets"], name, expected)
+                       for name, expected in rule["properties"].items())
+        return True
+
+    def keep(self, element):
+        key = element.id()
+        if key not in self._decisions:
+            cache = {}
+            self._decisions[key] = (not self.include or any(self.matches(rule, element, cache) for rule in self.include)) \
+                and not any(self.matches(rule, element, cache) for rule in self.exclude)
+        return self._decisions[key]
+
+    def split(self, products):
+        """
+        :return: kept products and filtered products (to exclude from the geometry iterator)
+        """
+        kept, filtered = [], []
+        for product in products:
+            (kept if not self or self.keep(product) else filtered).append(product)
+        return kept, filtered
@@ -0,0 +1,230 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+import ifcopenshell
+import ifcopenshell.geom
+import ifcopenshell.util.placement
+import ifcopenshell.util.unit
+import numpy as np
+
+# Repeated geometry (sleepers, fastenings, masts, signs) is exported as IfcMappedItem of one IfcRepresentationMap.
+# The mapped representation is triangulated once and placed per instance with its 4x4 transformation.
+INSTANCE_BATCH = 4096  # instances transformed at once
+
+
+def _unit(vector):
+    return vector / np.linalg.norm(vector)
+
+
+def transformation_operator(operator):
+    """
+    4x4 matrix of an IfcCartesianTransformationOperator3D (the axes are derived like the IFC BaseAxis function,
+    non-uniform scales of IfcCartesianTransformationOperator3DnonUniform are supported).
+    """
+    z = _unit(np.array(operator.Axis3.DirectionRatios, dtype=np.float64)) if operator.Axis3 else np.array([0.0, 0.0, 1.0])
+    if operator.Axis1:
+        x = np.array(operator.Axis1.DirectionRatios, dtype=np.float64)
+    else:
+        # FirstProjAxis: the default x axis of a z axis along x is the global z axis
+        x = np.array([1.0, 0.0, 0.0]) if abs(z[0]) < 1 - 1e-9 else np.array([0.0, 0.0, 1.0])
+    x = _unit(x - x.dot(z) * z)
+    # the second axis is projected, not the cross product, the operator may mirror
+    y = np.array(operator.Axis2.DirectionRatios, dtype=np.float64) if operator.Axis2 else np.array([0.0, 1.0, 0.0])
+    y = y - y.dot(x) * x - y.dot(z) * z
+    # the default y axis is degenerated for a z axis along y
+    y = _unit(y) if np.linalg.norm(y) > 1e-9 else np.cross(z, x)
+    scale = operator.Scale if operator.Scale is not None else 1.0
+    scales = [scale, scale, scale]
+    if operator.is_a("IfcCartesianTransformationOperator3DnonUniform"):
+        scales = [scale, operator.Scale2 if operator.Scale2 is not None else scale,
+                  operator.Scale3 if operator.Scale3 is not None else scale]
+    matrix = np.eye(4)
+    matrix[:3, 0], matrix[:3, 1], matrix[:3, 2] = x * scales[0], y * scales[1], z * scales[2]
+    matrix[:3, 3] = operator.LocalOrigin.Coordinates
+    return matrix
+
+
+def mapped_items(product):
+    """
+    :return: the IfcMappedItem of a product, whose only shape representation consists of mapped items, otherwise None
+    """
+    if product.Representation is None or len(product.Representation.Representations) != 1:
+        return None
+    # openings are cut by the geometry iterator
+    if getattr(product, "HasOpenings", None):
+        return None
+    items = product.Representation.Representations[0].Items
+    if not items or not all(item.is_a("IfcMappedItem") for item in items):
+        return None
+    return items
+
+
+def mapped_item_matrix(product, item):
+    """
+    Transformation (file units) from the coordinate system of the mapped representation into world coordinates:
+    object placement, mapping target and mapping origin.
+    """
+    placement = ifcopenshell.util.placement.get_local_placement(product.ObjectPlacement)
+    origin = ifcopenshell.util.placement.get_axis2placement(item.MappingSource.MappingOrigin)
+    return placement @ transformation_operator(item.MappingTarget) @ origin
+
+
+def orthogonal_axes(matrix, tolerance=1e-6):
+    """
+    :return: scales (3,) and unit axes (3, 3) of a 4x4 matrix, None if the axes are not orthogonal (sheared)
+    """
+    scales = np.linalg.norm(matrix[:3, :3], axis=0)
+    axes = matrix[:3, :3] / scales
+    if np.abs(axes.T @ axes - np.eye(3)).max() > tolerance:
+        return None
+    return scales, axes
+
+
+def transformation_entity(ifc_file, matrix, tolerance=1e-6):
+    """
+    IfcCartesianTransformationOperator3D (or 3DnonUniform) of a 4x4 matrix.
+    :return: None if the axes are not orthogonal, a sheared instance cannot be represented
+    """
+    decomposed = orthogonal_axes(matrix, tolerance)
+    if decomposed is None:
+        return None
+    scales, axes = decomposed
+
+    def direction(vector):
+        return ifc_file.create_entity("IfcDirection", DirectionRatios=[float(v) for v in vector])
+
+    attributes = {"Axis1": direction(axes[:, 0]), "Axis2": direction(axes[:, 1]), "Axis3": direction(axes[:, 2]),
+                  "LocalOrigin": ifc_file.create_entity("IfcCartesianPoint", Coordinates=[float(v) for v in matrix[:3, 3]]),
+                  "Scale": float(scales[0])}
+    if np.allclose(scales, scales[0], rtol=tolerance):
+        return ifc_file.create_entity("IfcCartesianTransformationOperator3D", **attributes)
+    return ifc_file.create_entity("IfcCartesianTransformationOperator3DnonUniform",
+                                  Scale2=float(scales[1]), Scale3=float(scales[2]), **attributes)
+
+
+class InstancedTessellation:
+    """
+    Triangulates the products of a file, which only consist of mapped items. Every mapped representation is
+    triangulated once (in its own coordinate system), the instances are placed with batched matrix products.
+    """
+
+    def __init__(self, ifc_file, settings, unit_scale=None):
+        """
+        :param settings: geometry settings, the triangulation of a representation is always local
+        :param unit_scale: length unit of the file in m, calculated if not given
+        """
+        self.ifc_file = ifc_file
+        self.settings = settings
+        self.unit_scale = ifcopenshell.util.unit.calculate_unit_scale(ifc_file) if unit_scale is None else unit_scale
+        self.meshes = {}
+        # product GlobalId -> [(representation map id, 4x4 matrix in m), ...]
+        self.instances = {}
+        # (id of the target file, representation map id) -> triangulated representation map, see representation
+        self.representation_maps = {}
+
+    def mesh(self, representation_map):
+        """
+        :return: vertices (n, 3) [m] and faces (m, 3) of a mapped representation, None if it cannot be triangulated
+        """
+        key = representation_map.id()
+        if key not in self.meshes:
+            try:
+                shape = ifcopenshell.geom.create_shape(self.settings, representation_map.MappedRepresentation)
+                geometry = getattr(shape, "geometry", shape)
+                self.meshes[key] = (np.reshape(np.array(geometry.verts, dtype=np.float64), (-1, 3)),
+                                    np.reshape(np.array(geometry.faces, dtype=np.int64), (-1, 3)))
+            except RuntimeError:
+                self.meshes[key] = None
+        return self.meshes[key]
+
+    def split(self, products):
+        """
+        :return: products, which can be instanced and the remaining products (for the geometry iterator)
+        """
+        instanced, remaining = [], []
+        for product in products:
+            items = mapped_items(product)
+            if items is not None and all(self.mesh(item.MappingSource) is not None for item in items):
+                instanced.append(product)
+            else:
+                remaining.append(product)
+        return instanced, remaining
+
+    def shapes(self, products):
+        """
+        Places the mapped representations of the products. The instances of one representation map are transformed
+        together, a product with several mapped items is merged into one mesh.
+        The placements are read immediately, the returned generator only uses numpy.
+        :return: generator of (guid, vertices (n, 3), faces (m, 3)) in world coordinates [m]
+        """
+        parts = {}
+        by_map = {}
+        for product in products:
+            items = mapped_items(product)
+            parts[product.GlobalId] = [None] * len(items)
+            for item_idx, item in enumerate(items):
+                matrix = mapped_item_matrix(product, item)
+                # mesh and translation in m, the rotation and scale are unit free
+                matrix[:3, 3] *= self.unit_scale
+                by_map.setdefault(item.MappingSource.id(), []).append((product.GlobalId, item_idx, matrix))
+                self.instances.setdefault(product.GlobalId, []).append((item.MappingSource.id(), matrix))
+        return self._place(by_map, parts)
+
+    def _place(self, by_map, parts):
+        for map_id, instances in by_map.items():
+            vertices, faces = self.meshes[map_id]
+            for start in range(0, len(instances), INSTANCE_BATCH):
+                batch = instances[start:start + INSTANCE_BATCH]
+                matrices = np.stack([matrix for _, _, matrix in batch])
+                placed = np.einsum("kij,nj->kni", matrices[:, :3, :3], vertices) + matrices[:, None, :3, 3]
+                for (guid, item_idx, _), instance_vertices in zip(batch, placed):
+                    product_parts = parts[guid]
+                    product_parts[item_idx] = (instance_vertices, faces)
+                    # a product with several mapped items is complete, when its last item was placed
+                    if all(part is not None for part in product_parts):
+                        del parts[guid]
+                        offsets = np.cumsum([0] + [len(v) for v, _ in product_parts[:-1]])
+                        yield (guid, np.concatenate([v for v, _ in product_parts]),
+                               np.concatenate([f + offset for (_, f), offset in zip(product_parts, offsets)]))
+
+    def instance(self, guid):
+        """
+        :return: (representation map id, 4x4 matrix [m]) of a product, which can stay a mapped item, None if it has
+                 several mapped items or a sheared transformation
+        """
+        instances = self.instances.get(guid)
+        if instances is None or len(instances) != 1 or orthogonal_axes(instances[0][1]) is None:
+            return None
+        return instances[0]
+
+    def representation(self, instance, ifc_file, context):
+        """
+        Shape representation of an instance in the target file (e.g. a container), which keeps the instancing: the
+        triangulated representation map (created once per target file) placed with the world transformation [m].
+        The source file is not modified.
+        :param instance: see instance
+        :param context: representation context of the target file
+        :return: IfcShapeRepresentation
+        """
+        map_id, matrix = instance
+        # the target files live as long as the tessellation
+        key = (id(ifc_file), map_id)
+        if key not in self.representation_maps:
+            vertices, faces = self.meshes[map_id]
+            point_list = ifc_file.create_entity("IfcCartesianPointList3D", vertices.tolist())
+            # the triangulation of a map is not known to be closed
+            face_set = ifc_file.create_entity("IfcTriangulatedFaceSet", Coordinates=point_list,
+                                              CoordIndex=(faces + 1).tolist())
+            origin = ifc_file.create_entity("IfcAxis2Placement3D",
+                                            Location=ifc_file.create_entity("IfcCartesianPoint", Coordinates=[0.0, 0.0, 0.0]))
+            self.representation_maps[key] = ifc_file.create_entity(
+                "IfcRepresentationMap", MappingOrigin=origin,
+                MappedRepresentation=ifc_file.create_entity("IfcShapeRepresentation", ContextOfItems=context,
+                                                            RepresentationIdentifier="Body",
+                                                            RepresentationType="Tesselation", Items=[face_set]))
+        item = ifc_file.create_entity("IfcMappedItem", MappingSource=self.representation_maps[key],
+                                      MappingTarget=transformation_entity(ifc_file, matrix))
+        return ifc_file.create_entity("IfcShapeRepresentation", ContextOfItems=context, RepresentationIdentifier="Body",
+                                      RepresentationType="MappedRepresentation", Items=[item])
@@ -0,0 +1,90 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from python.modelling.openshell_helpers import content_hash
+
+
+class ElementManifest:
+    """
+    Record of the elements of one ifc file processed by extract_areas: per GlobalId the content hash, the containers it
+    was written to and its output GlobalIds (split elements have several). A rerun compares the hashes and only has to
+    rebuild the containers of new, changed or removed elements.
+    """
+    IGNORED_TYPES = ("IfcOwnerHistory",)  # changes with every export
+
+    def __init__(self, path, settings_key):
+        """
+        :param path: json file next to the container ifc
+        :param settings_key: description of all settings that influence the containers (areas, resolution, ...).
+                             If it changed, the previous record is not valid for an incremental run.
+        """
+        self.path = Path(path)
+        self.settings_key = settings_key
+        self.previous = {}
+        self.valid = False
+        if self.path.exists():
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self.previous = data.get("elements", {})
+            self.valid = data.get("settings") == settings_key
+        self.elements = {}
+        self._hashes = {}
+
+    def element_hash(self, element):
+        """Hash of everything extract_areas reads of an element: class, name, geometry, placement, styles and psets"""
+        content = [element.is_a(), repr(element.Name)]
+        for value in (element.Representation, element.ObjectPlacement):
+            content.append(content_hash(value, self._hashes, self.IGNORED_TYPES))
+        for representation in element.Representation.Representations:
+            for item in representation.Items:
+                for styled_item in item.StyledByItem:
+                    content.append(content_hash(styled_item.Styles, self._hashes, self.IGNORED_TYPES))
+        for relation in element.IsDefinedBy:
+            if relation.is_a("IfcRelDefinesByProperties"):
+                content.append(content_hash(relation.RelatingPropertyDefinition, self._hashes, self.IGNORED_TYPES))
+        return hashlib.sha1("|".join(content).encode()).hexdigest()
+
+    def hashes(self, ifc_file):
+        """
+        :return: dict of GlobalId -> hash of all products with a representation
+        """
+        return {product.GlobalId: self.element_hash(product) for product in ifc_file.by_type("IfcProduct")
+                if product.Representation}
+
+    def changed(self, hashes):
+        """GlobalIds of new or changed elements"""
+        return {guid for guid, value in hashes.items() if guid not in self.previous or self.previous[guid]["hash"] != value}
+
+    def removed(self, hashes):
+        """GlobalIds of elements of the previous run, which do not exist anymore"""
+        return {guid for guid in self.previous if guid not in hashes}
+
+    def containers(self, guids):
+        """Containers the given elements were written to in the previous run"""
+        return {name for guid in guids if guid in self.previous for name in self.previous[guid]["containers"]}
+
+    def outputs(self, guids):
+        """Output GlobalIds (expanded) of the given elements in the previous run"""
+        return {output for guid in guids if guid in self.previous for output in self.previous[guid]["outputs"]}
+
+    def record(self, guid, value, containers, outputs):
+        self.elements[guid] = {"hash": value, "containers": sorted(containers), "outputs": list(outputs)}
+
+    def keep(self, guid):
+        """Takes over the record of an element, which was not processed again"""
+        self.elements[guid] = self.previous[guid]
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        handle, tmp_path = tempfile.mkstemp(suffix=".json", dir=self.path.parent)
+        with os.fdopen(handle, "w") as f:
+            json.dump({"settings": self.settings_key, "elements": self.elements}, f)
+        os.replace(tmp_path, self.path)
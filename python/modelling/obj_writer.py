@@ -0,0 +1,109 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+from pathlib import Path
+
+import numpy as np
+
+from python.modelling.openshell_helpers import flatten_styles
+
+DEFAULT_COLOUR = (0.8, 0.8, 0.8)
+
+
+def style_colour(styles):
+    """
+    Diffuse colour and opacity of the first surface shading of the given presentation styles.
+    :return: ((r, g, b), alpha)
+    """
+    for style in flatten_styles(styles):
+        if not style.is_a("IfcSurfaceStyle"):
+            continue
+        for element in style.Styles:
+            if element.is_a("IfcSurfaceStyleShading") and element.SurfaceColour.is_a("IfcColourRgb"):
+                colour = element.SurfaceColour
+                transparency = getattr(element, "Transparency", None) or 0.0
+                return (colour.Red, colour.Green, colour.Blue), 1.0 - transparency
+    return DEFAULT_COLOUR, 1.0
+
+
+def read_obj(path):
+    """
+    Reads an obj written by ObjWriter (objects of triangles, no texture coordinates or normals).
+    :return: list of (name, vertices (n, 3), faces (m, 3) with indices from 0 per object)
+    """
+    objects = []
+    name, vertices, faces, offset = None, [], [], 1
+
+    def finish():
+        object_vertices = np.array(" ".join(vertices).split(), dtype=np.float64).reshape(-1, 3)
+        object_faces = np.array(" ".join(faces).split(), dtype=np.int64).reshape(-1, 3) - offset
+        objects.append((name, object_vertices, object_faces))
+        return offset + len(object_vertices)
+
+    with open(path, "r") as f:
+        for line in f:
+            if line.startswith("v "):
+                vertices.append(line[2:])
+            elif line.startswith("f "):
+                faces.append(line[2:])
+            elif line.startswith("o "):
+                if name is not None:
+                    offset = finish()
+                name, vertices, faces = line[2:].strip(), [], []
+    if name is not None:
+        finish()
+    return objects
+
+
+class ObjWriter:
+    """
+    Streams triangulated elements (world or shifted coordinates) into a wavefront obj. Every element is its own object with its own
+    material, named after the element. The materials are written to the mtl when the writer is closed.
+    """
+
+    def __init__(self, path, write_mtl=True):
+        """
+        :param path: path of the obj, the mtl is written next to it
+        :param write_mtl: False keeps an existing mtl (e.g. rewriting the geometry of an obj)
+        """
+        self.path = Path(path).with_suffix(".obj")
+        self.write_mtl = write_mtl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.materials = {}
+        self.vertex_count = 0
+        self._file = open(self.path, "w")
+        self._file.write(f"mtllib {self.path.with_suffix('.mtl').name}\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def add(self, name, vertices, faces, colour=DEFAULT_COLOUR, alpha=1.0):
+        """
+        :param name: object and material name (the expanded GlobalId for helios_prep)
+        :param vertices: (n, 3) vertices
+        :param faces: (m, 3) vertex indices of the triangles, starting at 0
+        """
+        vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+        faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3) + (self.vertex_count + 1)
+        self.materials[name] = (colour, alpha)
+        self._file.write(f"o {name}\n")
+        # one format operation per block, this is much faster than formatting the lines one by one
+        self._file.write(("v %.6f %.6f %.6f\n" * len(vertices)) % tuple(vertices.ravel()))
+        self._file.write(f"usemtl {name}\n")
+        self._file.write(("f %d %d %d\n" * len(faces)) % tuple(faces.ravel()))
+        self.vertex_count += len(vertices)
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.close()
+        if not self.write_mtl:
+            return
+        with open(self.path.with_suffix(".mtl"), "w") as mtl:
+            for name, ((r, g, b), alpha) in self.materials.items():
+                mtl.write(f"newmtl {name}\nKa 1.0 1.0 1.0\nKd {r:.6f} {g:.6f} {b:.6f}\nKs 0.0 0.0 0.0\nd {alpha:.6f}\nillum 1\n\n")
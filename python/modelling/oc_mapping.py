@@ -32,11 +32,16 @@ class OCMapping:
         self.reverse_classes = {}
         self.idx2class = {}
 
-    def add_entity(self, guid: str, nclass: str, src: str):
+    def add_entity(self, guid: str, nclass: str, src: str, ifc_class: str = None):
+        """
+        :param ifc_class: IFC class of the element (optional), the classes of the mapping are the element names
+        """
         debug = False
         if guid not in self.data["entities"]:
             debug = True
-            local_id = len(self.data["entities"])
+            # indices of removed entities are not reused
+            local_id = self.data["metadata"].get("next_idx", len(self.data["entities"]))
+            self.data["metadata"]["next_idx"] = local_id + 1
             class_idx = self.add_class(nclass)
             source_idx = self.add_source(src)
 
@@ -45,6 +50,8 @@ class OCMapping:
                 "class_idx": class_idx,
                 "source_idx": source_idx
             }
+            if ifc_class is not None:
+                self.data["entities"][guid]["ifc_class"] = ifc_class
             self.data["metadata"]["number_of_entities"] += 1
             self.data["metadata"]["distribution"][nclass] += 1
             self.idx2class[local_id] = self.data["entities"][guid]
@@ -54,6 +61,18 @@ class OCMapping:
         # print(f"{nclass} \t -- \t {guid} \t\t was_new : {'yes' if debug else 'no'}")
         return local_id
 
+    def remove_entity(self, guid: str):
+        """
+        Removes an entity (e.g. deleted or changed in an updated ifc), its index is not reused.
+        """
+        if guid not in self.data["entities"]:
+            return
+        self.data["metadata"].setdefault("next_idx", len(self.data["entities"]))
+        entity = self.data["entities"].pop(guid)
+        self.data["metadata"]["number_of_entities"] -= 1
+        self.data["metadata"]["distribution"][self.reverse_classes[entity["class_idx"]]] -= 1
+        self.idx2class.pop(entity["idx"], None)
+
     def add_source(self, src):
         if src not in self.data["sources"]:
             this_src_idx = len(self.data["sources"])
@@ -99,5 +118,6 @@ class OCMapping:
         for guid, entity in mapping.data["entities"].items():
             entity_class = mapping.reverse_classes[entity["class_idx"]]
             entity_source = mapping.reverse_sources[entity["source_idx"]]
+            # the IFC class stays in the container mapping, the entities of the global mapping are unpacked as 3 values
             this_id = self.add_entity(guid, entity_class, entity_source)
         return self
\ No newline at end of file
@@ -3,40 +3,178 @@
 #              felix.eickeler@tum.de       
 # ----------------------------------------------------------------------------------------------------------------------------------
 
+import hashlib
 import time
 import ifcopenshell
 from python.modelling.oc_mapping import OCMapping
-from toposort import toposort_flatten as toposort
+from python.modelling.step_writer import StepStreamWriter, references
+
+
+def content_hash(value, memo, ignore=()):
+    """
+    Merkle hash of an attribute value or entity with its forward subgraph. Instance ids are not part of the hash, so
+    entities with the same content hash equal.
+    :param memo: dict of instance id -> hash, subgraphs shared between calls are hashed once per file
+    :param ignore: entity types, which are not part of the hash (e.g. IfcOwnerHistory). Use one memo per ignore.
+    """
+    if isinstance(value, ifcopenshell.entity_instance):
+        if value.id() == 0:
+            # express simple types (IfcLabel, IfcLengthMeasure, ...) are wrapped values without identity
+            return f"{value.is_a()}({content_hash(value[0], memo, ignore)})"
+        key = value.id()
+        if key not in memo:
+            if any(value.is_a(t) for t in ignore):
+                memo[key] = "*"
+            else:
+                content = value.is_a() + "(" + ",".join(content_hash(attribute, memo, ignore) for attribute in value) + ")"
+                memo[key] = hashlib.sha1(content.encode()).hexdigest()
+        return memo[key]
+    if isinstance(value, (list, tuple)):
+        return "(" + ",".join(content_hash(v, memo, ignore) for v in value) + ")"
+    return repr(value)
+
+
+def flatten_styles(styles):
+    """
+    :param styles: IfcPresentationStyleAssignments or IfcPresentationStyles (IfcStyledItem.Styles)
+    :return: generator of the IfcPresentationStyles
+    """
+    for style in styles:
+        if style.is_a("IfcPresentationStyleAssignment"):
+            yield from style.Styles
+        else:
+            yield style
 
-def clone_into(dst, src, _entity):
-    if isinstance(_entity, (list, tuple)):
-        return [clone_into(dst, src, e) for e in _entity]
-    # build tree
-    entity_tree = {}
-    for child in src.traverse(_entity):
-        warning = set(i.id() for i in src.traverse(child)[1:] if i.id())
-        entity_tree[child.id()] = warning
 
-    # taken from https://academy.ifcopenshell.org/posts/ifcopenshell-optimizer-tutorial/
-    entity_tracker = {}
+def presentation_styles(representation_item):
+    """
+    :return: the presentation styles (IfcPresentationStyleAssignment or IfcPresentationStyle) of a representation item
+    """
+    if representation_item.is_a("IfcMappedItem"):
+        representation_item = representation_item.MappingSource.MappedRepresentation.Items[0]
+    if not representation_item.StyledByItem:
+        raise NotImplementedError("This Representations Style is not implemented put here to do so !")
+    return representation_item.StyledByItem[0].Styles
 
+def clone_into(dst, src, _entity):
+    """
+    Clones the entity (or list of entities) with its subgraph from src into dst, shareable entities are reused.
+    Use one IfcCloner for repeated clones, it caches the traversal and the copied shared entities.
+    """
+    return IfcCloner(dst, src).clone(_entity)
+
+
+def copy_product(dst, product, representation, **attributes):
+    """
+    Copy of a product of another file with a new shape representation, the file of the product is only read.
+    The referenced entities (placement, owner history, ...) are added to dst once.
+    :param representation: IfcShapeRepresentation in dst
+    :param attributes: attributes replacing the ones of the product (e.g. GlobalId and Name of a part)
+    """
     def map_value(v):
         if isinstance(v, (list, tuple)):
-            # lists are recursively traversed
             return type(v)(map(map_value, v))
-        elif isinstance(v, ifcopenshell.entity_instance):
-            if v.id() == 0:
-                # express simple types are not part of the toposort and just copied
-                return dst.create_entity(v.is_a(), v[0])
-            return entity_tracker[v.id()]
-        else:
-            # a plain python value can just be returned
-            return v
-
-    for entity_id in toposort(entity_tree):
-        entity = src[entity_id]
-        entity_tracker[entity_id] = dst.create_entity(entity.is_a(), *map(map_value, entity))
-    return entity_tracker[_entity.id()]
+        if isinstance(v, ifcopenshell.entity_instance):
+            # express simple types are not part of the graph and just copied
+            return dst.create_entity(v.is_a(), v[0]) if v.id() == 0 else dst.add(v)
+        return v
+
+    values = product.get_info(include_identifier=False, recursive=False)
+    del values["type"]
+    # the source representation is not copied
+    values = {name: map_value(value) for name, value in values.items() if name not in attributes and name != "Representation"}
+    values.update(attributes)
+    values["Representation"] = dst.create_entity("IfcProductDefinitionShape", Representations=[representation])
+    return dst.create_entity(product.is_a(), **values)
+
+
+class IfcCloner:
+    """
+    Clones entities with their forward subgraph from src into dst.
+    The topological order of the subgraph is cached per source entity, so it must not be changed between clones.
+    Entities that are never modified after cloning (owner history, contexts, placements, colours, ...) are shared:
+    within the same file they are reused, into another file they are copied once (src -> dst identity map).
+    """
+    SHAREABLE_TYPES = ("IfcOwnerHistory", "IfcRepresentationContext", "IfcObjectPlacement", "IfcPlacement",
+                       "IfcCartesianPoint", "IfcDirection", "IfcColourSpecification", "IfcSurfaceStyleShading")
+
+    def __init__(self, dst, src=None):
+        self.dst = dst
+        self.src = dst if src is None else src
+        self._orders = {}
+        self._identity = {}
+        self._shareable = {}
+
+    def is_shared(self, entity, share=()):
+        key = (entity.is_a(), share)
+        if key not in self._shareable:
+            self._shareable[key] = any(entity.is_a(t) for t in self.SHAREABLE_TYPES + share)
+        return self._shareable[key]
+
+    def _order(self, entity, share):
+        """Ids of the subgraph to copy (children first), the traversal stops at shared entities"""
+        key = (entity.id(), share)
+        if key not in self._orders:
+            order, seen = [], set()
+            stack = [(entity, False)]
+            while stack:
+                current, expanded = stack.pop()
+                if expanded:
+                    order.append(current.id())
+                    continue
+                if current.id() in seen:
+                    continue
+                seen.add(current.id())
+                stack.append((current, True))
+                for child in references(list(current)):
+                    if child.id() not in seen and not self.is_shared(child, share):
+                        stack.append((child, False))
+            self._orders[key] = order
+        return self._orders[key]
+
+    def _shared(self, entity):
+        if self.dst is self.src:
+            return entity
+        if entity.id() not in self._identity:
+            self._identity[entity.id()] = self._copy(entity, ())
+        return self._identity[entity.id()]
+
+    def _copy(self, entity, share):
+        copies = {}
+
+        def map_value(v):
+            if isinstance(v, (list, tuple)):
+                # lists are recursively traversed
+                return type(v)(map(map_value, v))
+            elif isinstance(v, ifcopenshell.entity_instance):
+                if v.id() == 0:
+                    # express simple types are not part of the graph and just copied
+                    return self.dst.create_entity(v.is_a(), v[0])
+                if v.id() in copies:
+                    return copies[v.id()]
+                return self._shared(v)
+            else:
+                # a plain python value can just be returned
+                return v
+
+        for entity_id in self._order(entity, share):
+            source = self.src[entity_id]
+            copies[entity_id] = self.dst.create_entity(source.is_a(), *map(map_value, source))
+        return copies[entity.id()]
+
+    def clone(self, entity, share=()):
+        """
+        :param entity: entity or list of entities of src
+        :param share: additional types, which are referenced instead of copied for this call
+                      (e.g. IfcGeometricRepresentationItem for a cloned IfcStyledItem)
+        :return: the copy (or list of copies) in dst
+        """
+        share = tuple(share)
+        if isinstance(entity, (list, tuple)):
+            return [self.clone(e, share) for e in entity]
+        if self.is_shared(entity):
+            return self._shared(entity)
+        return self._copy(entity, share)
 
 
 def clear(file, entity):
@@ -90,6 +228,51 @@ def replace(file, before, after):
     # save_delete(file, before)
 
 
+def remove_subgraph(file, entity, keep_ids=()):
+    """
+    Removes the entity and every entity of its forward subgraph, which is not referenced anymore.
+    Shareable entities (see IfcCloner) and the given ids are kept.
+    :return: number of removed entities
+    """
+    removed = set()
+    stack = [(entity.id(), entity)]
+    while stack:
+        current_id, current = stack.pop()
+        if current_id in removed or current_id in keep_ids or file.get_total_inverses(current) > 0:
+            continue
+        if any(current.is_a(t) for t in IfcCloner.SHAREABLE_TYPES):
+            continue
+        children = [(child.id(), child) for child in references(list(current))]
+        file.remove(current)
+        removed.add(current_id)
+        stack.extend(children)
+    return len(removed)
+
+
+def drop_representation(file, product, detached=(), keep_ids=()):
+    """
+    Removes the representation of a processed product with its items and their styles. Entities still used by other
+    products (e.g. the mapped representations of types) are kept.
+    :param detached: shape representations, which were replaced before (they are not referenced by the product anymore)
+    """
+    representations = list(detached)
+    if product.Representation is not None:
+        shape = product.Representation
+        product.Representation = None
+        if file.get_total_inverses(shape) == 0:
+            representations.extend(shape.Representations)
+            file.remove(shape)
+    for representation in representations:
+        if file.get_total_inverses(representation) > 0:
+            continue
+        for item in representation.Items:
+            # the styled items are the only other references of an item, which belongs to this representation only
+            if file.get_total_inverses(item) == 1 + len(item.StyledByItem):
+                for styled_item in item.StyledByItem:
+                    remove_subgraph(file, styled_item, keep_ids)
+        remove_subgraph(file, representation, keep_ids)
+
+
 class IfcFileContainer:
 
     def __init__(self, name, path, bounding_box, template):
@@ -98,6 +281,10 @@ class IfcFileContainer:
         self.bounding_box = bounding_box
         self.property_sets = {}
         self.class_mapping = OCMapping()
+        # interned style entities of this file by content hash, see add_styled_item
+        self.styles = {}
+        self._style_hashes = {}
+        self.writer = None
 
         new_file = ifcopenshell.file(schema='IFC4X1')
         m_project = template.by_type("IfcProject")
@@ -234,7 +421,62 @@ class IfcFileContainer:
                 "RelatedObjects": [to_product],
                 "RelatingPropertyDefinition": self.property_sets[IfcRelDefinesProperties.GlobalId]
             }
-            self.ifc_file.create_entity("IfcRelDefinesByProperties", **props)
+            return self.ifc_file.create_entity("IfcRelDefinesByProperties", **props)
+
+    def _intern(self, style):
+        key = content_hash(style, self._style_hashes)
+        if key not in self.styles:
+            self.styles[key] = self.ifc_file.add(style)
+        return self.styles[key]
+
+    def add_styled_item(self, item, styles, name):
+        """
+        Styles a representation item of this file with the styles of the template. Identical style subgraphs (colours,
+        renderings, ...) are added once and reused. Only a thin IfcSurfaceStyle with the given name is created per call,
+        the materials of the converted obj are named after it.
+        :param item: representation item in this file
+        :param styles: IfcPresentationStyleAssignments or IfcPresentationStyles of the template
+        :param name: name of the surface styles (the expanded GlobalId of the element for helios_prep)
+        """
+        styles_of_item = []
+        for presentation_style in flatten_styles(styles):
+            if presentation_style.is_a("IfcSurfaceStyle"):
+                styles_of_item.append(self.ifc_file.create_entity(
+                    "IfcSurfaceStyle", Name=name, Side=presentation_style.Side,
+                    Styles=[self._intern(s) for s in presentation_style.Styles]))
+            else:
+                styles_of_item.append(self._intern(presentation_style))
+        return self.ifc_file.create_entity("IfcStyledItem", Item=item, Styles=styles_of_item, Name=None)
+
+    def stream(self):
+        """
+        Streaming mode: the container is written incrementally with flush instead of ifc_file.write at the end.
+        """
+        self.writer = StepStreamWriter(self.ifc_file, self.path.with_suffix(".ifc"))
+
+    def flush(self, roots):
+        """
+        Streaming mode: writes all new entities of the file and removes the geometry of the roots (products, styled
+        items, relations) from memory. Products, placements, property sets, interned styles and representation maps stay, later
+        entities refer to them.
+        """
+        self.writer.flush([root for root in roots if root is not None])
+        keep = {e.id() for e in self.styles.values()} | {e.id() for e in self.property_sets.values()} | \
+            {e.id() for e in self.ifc_file.by_type("IfcRepresentationMap")}
+        # styled items first, they reference the representation items
+        for root in roots:
+            if root is not None and root.is_a("IfcStyledItem"):
+                remove_subgraph(self.ifc_file, root, keep)
+        for root in roots:
+            if root is not None and root.is_a("IfcProduct"):
+                drop_representation(self.ifc_file, root, keep_ids=keep)
+
+    def close(self):
+        """
+        Streaming mode: links the products to the site and finishes the file.
+        """
+        self.writer.flush([self.link_products_to_site()])
+        self.writer.close()
 
     # RelAggregates Link IfcSite to IfcProducts
     def link_products_to_site(self):
@@ -0,0 +1,90 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+import queue
+import threading
+import time
+
+_END, _ERROR = object(), object()
+
+
+class Pipeline:
+    """
+    Runs a generator (e.g. tessellate) in a producer thread and hands its items over in a bounded queue.
+    The geometry iterator keeps triangulating while the consumer assembles the containers, the queue depth bounds the
+    number of triangulated elements held in memory.
+    The wait times tell which side is the bottleneck: the producer waits on a full queue if the consumer is slower,
+    the consumer waits on an empty queue if the producer is slower.
+    """
+
+    def __init__(self, source, depth=8):
+        """
+        :param source: iterable, it is iterated completely in the producer thread. The consumer must not modify a file
+                       the source reads (e.g. the geometry iterator of tessellate), ifcopenshell files are not thread
+                       safe. tessellate reads all python entities before it returns its generator.
+        :param depth: maximal number of items in the queue
+        """
+        self.source = source
+        self.depth = depth
+        self.queue = queue.Queue(maxsize=depth)
+        self.items = 0
+        self.producer_wait = 0.0  # [s] blocked by a full queue
+        self.consumer_wait = 0.0  # [s] blocked by an empty queue
+        self.depth_sum = 0
+        self.max_depth = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._produce, name="pipeline-producer", daemon=True)
+
+    def _put(self, item):
+        start = time.perf_counter()
+        # the timeout lets the producer notice a consumer which stopped early
+        while not self._stop.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        self.producer_wait += time.perf_counter() - start
+
+    def _produce(self):
+        try:
+            for item in self.source:
+                if self._stop.is_set():
+                    break
+                self._put(item)
+        except BaseException as e:
+            self._put((_ERROR, e))
+            return
+        finally:
+            if hasattr(self.source, "close"):
+                self.source.close()
+        self._put((_END, None))
+
+    def __iter__(self):
+        self._thread.start()
+        try:
+            while True:
+                depth = self.queue.qsize()
+                self.depth_sum += depth
+                self.max_depth = max(self.max_depth, depth)
+                start = time.perf_counter()
+                item = self.queue.get()
+                self.consumer_wait += time.perf_counter() - start
+                if isinstance(item, tuple) and len(item) == 2:
+                    if item[0] is _END:
+                        return
+                    if item[0] is _ERROR:
+                        raise item[1]
+                self.items += 1
+                yield item
+        finally:
+            self._stop.set()
+            self._thread.join()
+
+    def summary(self):
+        mean_depth = self.depth_sum / max(self.items, 1)
+        return (f"Pipeline: {self.items} items, queue depth mean {mean_depth:.1f} / max {self.max_depth} of {self.depth}, "
+                f"producer waited {self.producer_wait:.2f} s (consumer bound), "
+                f"consumer waited {self.consumer_wait:.2f} s (producer bound)")
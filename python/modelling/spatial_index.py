@@ -0,0 +1,151 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+import numpy as np
+
+
+class ContainerIndex:
+    """
+    Uniform grid over the (x, y) extents of the container bounding boxes.
+    An element is queried with its axis aligned bounding box, only the containers registered in the overlapped cells
+    are tested exactly against the vertices (x, y and z).
+    """
+
+    def __init__(self, bounding_boxes, cell_size=None):
+        """
+        :param bounding_boxes: list of ((x_min, y_min, z_min), (x_max, y_max, z_max))
+        :param cell_size: edge length of the grid cells, defaults to the median extent of the boxes
+        """
+        boxes = np.asarray(bounding_boxes, dtype=np.float64).reshape(-1, 2, 3)
+        self.lower = boxes[:, 0]
+        self.upper = boxes[:, 1]
+        if cell_size is None:
+            extents = (self.upper - self.lower)[:, :2]
+            cell_size = float(np.median(extents.max(axis=1))) if len(boxes) else 1.0
+        self.cell_size = max(cell_size, 1e-6)
+        self.origin = self.lower[:, :2].min(axis=0) if len(boxes) else np.zeros(2)
+
+        self.cells = {}
+        for box_idx, (lo, hi) in enumerate(zip(self._cell(self.lower), self._cell(self.upper))):
+            for i in range(lo[0], hi[0] + 1):
+                for j in range(lo[1], hi[1] + 1):
+                    self.cells.setdefault((i, j), []).append(box_idx)
+
+    def __len__(self):
+        return len(self.lower)
+
+    def _cell(self, points):
+        return np.floor((np.atleast_2d(points)[:, :2] - self.origin) / self.cell_size).astype(np.int64)
+
+    def candidates(self, aabb_min, aabb_max):
+        """
+        Containers whose bounding box overlaps the given box.
+        :return: sorted array of container indices
+        """
+        (lo,), (hi,) = self._cell(aabb_min), self._cell(aabb_max)
+        found = set()
+        for i in range(lo[0], hi[0] + 1):
+            for j in range(lo[1], hi[1] + 1):
+                found.update(self.cells.get((i, j), ()))
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        found = np.fromiter(sorted(found), dtype=np.int64)
+        overlap = np.all((self.lower[found] < aabb_max) & (self.upper[found] > aabb_min), axis=1)
+        return found[overlap]
+
+    def query(self, vertices):
+        """
+        Containers which the element falls into: per axis, at least one vertex lies within the container bounds.
+        :param vertices: (n, 3) vertices of the element
+        :return: sorted array of container indices
+        """
+        found = self.candidates(vertices.min(axis=0), vertices.max(axis=0))
+        if len(found) == 0:
+            return found
+        inside = (vertices[None, :, :] > self.lower[found, None, :]) & (vertices[None, :, :] < self.upper[found, None, :])
+        return found[np.all(np.any(inside, axis=1), axis=1)]
+
+
+class AlignmentCorridor:
+    """
+    Corridor of a given width around alignment polylines in the (x, y) plane.
+    The polyline segments are registered in a uniform grid, an element is tested exactly against the segments of the
+    cells overlapped by its bounding box (grown by the width).
+    """
+
+    def __init__(self, polylines, width, cell_size=None):
+        """
+        :param polylines: list of (n, 2+) arrays of consecutive alignment samples
+        :param width: maximal distance of an element to the alignment (half the corridor width) [m]
+        :param cell_size: edge length of the grid cells, defaults to twice the width
+        """
+        self.width = float(width)
+        self.cell_size = float(cell_size) if cell_size else max(2 * self.width, 1.0)
+        polylines = [np.asarray(p, dtype=np.float64)[:, :2] for p in polylines if len(p) > 0]
+        # a single sample is treated as a segment of zero length
+        self.starts = np.concatenate([p[:-1] if len(p) > 1 else p for p in polylines]) if polylines else np.empty((0, 2))
+        self.ends = np.concatenate([p[1:] if len(p) > 1 else p for p in polylines]) if polylines else np.empty((0, 2))
+
+        lo = self._cell(np.minimum(self.starts, self.ends) - self.width)
+        hi = self._cell(np.maximum(self.starts, self.ends) + self.width)
+        cell_ids, segment_ids = [], []
+        span = hi - lo
+        for di in range(int(span[:, 0].max(initial=0)) + 1):
+            for dj in range(int(span[:, 1].max(initial=0)) + 1):
+                mask = (span[:, 0] >= di) & (span[:, 1] >= dj)
+                cell_ids.append(self._key(lo[mask, 0] + di, lo[mask, 1] + dj))
+                segment_ids.append(np.flatnonzero(mask))
+        cell_ids = np.concatenate(cell_ids) if cell_ids else np.empty(0, dtype=np.int64)
+        order = np.argsort(cell_ids, kind="stable")
+        self.cell_ids = cell_ids[order]
+        self.segment_ids = np.concatenate(segment_ids)[order] if segment_ids else np.empty(0, dtype=np.int64)
+
+    def _cell(self, points):
+        return np.floor(np.atleast_2d(points)[:, :2] / self.cell_size).astype(np.int64)
+
+    @staticmethod
+    def _key(i, j):
+        return (i + (1 << 31)) * (1 << 32) + (j + (1 << 31))
+
+    def candidates(self, aabb_min, aabb_max):
+        """Segments registered in the cells overlapped by the given (x, y) box"""
+        (lo,), (hi,) = self._cell(aabb_min), self._cell(aabb_max)
+        i, j = np.meshgrid(np.arange(lo[0], hi[0] + 1), np.arange(lo[1], hi[1] + 1), indexing="ij")
+        keys = self._key(i.ravel(), j.ravel())
+        first = np.searchsorted(self.cell_ids, keys, side="left")
+        last = np.searchsorted(self.cell_ids, keys, side="right")
+        hits = last > first
+        if not np.any(hits):
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate([self.segment_ids[f:l] for f, l in zip(first[hits], last[hits])]))
+
+    def distance(self, vertices, segments):
+        """(n_vertices, n_segments) distances in the (x, y) plane"""
+        a, b = self.starts[segments], self.ends[segments]
+        ab = b - a
+        ap = vertices[:, None, :2] - a[None, :, :]
+        t = np.clip(np.einsum("vsk,sk->vs", ap, ab) / np.maximum(np.einsum("sk,sk->s", ab, ab), 1e-12), 0, 1)
+        return np.linalg.norm(ap - t[:, :, None] * ab[None, :, :], axis=2)
+
+    def contains(self, vertices, chunk_size=1 << 20):
+        """
+        :param vertices: (n, 2+) vertices of an element
+        :return: True, if at least one vertex lies within the corridor. Elements larger than the corridor (e.g. terrain)
+                 are also kept, if the alignment passes through their bounding box, as their faces may span the corridor.
+        """
+        vertices = np.atleast_2d(vertices)
+        aabb_min, aabb_max = vertices[:, :2].min(axis=0), vertices[:, :2].max(axis=0)
+        segments = self.candidates(aabb_min, aabb_max)
+        if len(segments) == 0:
+            return False
+        if np.any(aabb_max - aabb_min > 2 * self.width):
+            starts = self.starts[segments]
+            if np.any(np.all((starts >= aabb_min) & (starts <= aabb_max), axis=1)):
+                return True
+        step = max(1, chunk_size // len(segments))
+        for i in range(0, len(vertices), step):
+            if np.any(self.distance(vertices[i:i + step], segments) <= self.width):
+                return True
+        return False
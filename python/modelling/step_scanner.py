@@ -0,0 +1,160 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+import mmap
+import os
+import re
+import tempfile
+from pathlib import Path
+
+import ifcopenshell
+
+_record_end = re.compile(rb"'(?:[^']|'')*'|;")
+_strings = re.compile(rb"'(?:[^']|'')*'")
+_references = re.compile(rb"#(\d+)")
+_record_start = re.compile(rb"(?:^|[\n;])\s*#(\d+)\s*=")
+
+
+def _type_pattern(entity_type):
+    """Start of the records of a type, whitespace is allowed around the equal sign and before the parenthesis"""
+    return re.compile(rb"#(\d+)\s*=\s*" + re.escape(entity_type.upper().encode()) + rb"\s*\(")
+
+
+class StepScanner:
+    """
+    Reads single records of an ifc (STEP physical file) without parsing the whole model.
+    Records are located by a binary search over the memory mapped file, as exporters write the instance ids in
+    ascending order. If a record cannot be found that way, a full index of the record offsets is built once.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        data_section = self.data.find(b"DATA;")
+        if data_section == -1:
+            raise ValueError(f"{self.path} is not a STEP physical file")
+        self.header = self.data[:data_section + len(b"DATA;")]
+        self.data_start = data_section + len(b"DATA;")
+        self.data_end = self.data.rfind(b"ENDSEC;")
+        self._index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.data.close()
+        self._file.close()
+
+    def _next_record(self, pos, end=None):
+        """Start of the first record beginning at or after pos"""
+        end = self.data_end if end is None else end
+        found = self.data.find(b"\n#", max(pos - 1, 0), end)
+        return -1 if found == -1 else found + 1
+
+    def _id_at(self, pos):
+        end = self.data.find(b"=", pos, pos + 32)
+        return int(self.data[pos + 1:end])
+
+    def _search(self, instance_id):
+        lo, hi = self.data_start, self.data_end
+        while hi - lo > 4096:
+            mid = (lo + hi) // 2
+            pos = self._next_record(mid, hi)
+            if pos == -1:
+                hi = mid
+                continue
+            record_id = self._id_at(pos)
+            if record_id == instance_id:
+                return pos
+            if record_id < instance_id:
+                lo = pos + 1
+            else:
+                hi = mid
+
+        pos = self._next_record(lo)
+        while pos != -1:
+            record_id = self._id_at(pos)
+            if record_id == instance_id:
+                return pos
+            if record_id > instance_id:
+                break
+            pos = self._next_record(pos + 1)
+        return -1
+
+    def _build_index(self):
+        self._index = {int(m.group(1)): m.end(1) - len(m.group(1)) - 1
+                       for m in _record_start.finditer(self.data, self.data_start, self.data_end)}
+
+    def record(self, instance_id):
+        """
+        :return: the raw record "#id=IFCTYPE(...);" of the instance
+        """
+        pos = self._search(instance_id) if self._index is None else -1
+        if pos == -1:
+            if self._index is None:
+                self._build_index()
+            if instance_id not in self._index:
+                raise KeyError(f"#{instance_id} was not found in {self.path}")
+            pos = self._index[instance_id]
+
+        end = pos
+        while True:
+            match = _record_end.search(self.data, end, self.data_end)
+            if match is None:
+                raise ValueError(f"#{instance_id} is not terminated in {self.path}")
+            end = match.end()
+            if match.group(0) == b";":
+                return self.data[pos:end]
+
+    def find_type(self, entity_type):
+        """
+        Ids of all instances of exactly this type (no subtypes), found by a byte search over the records.
+        """
+        return [int(m.group(1)) for m in _type_pattern(entity_type).finditer(self.data, self.data_start, self.data_end)]
+
+    def closure(self, instance_ids):
+        """
+        All records reachable from the given instances through forward references.
+        :return: dict of instance id -> raw record
+        """
+        records = {}
+        stack = list(instance_ids)
+        while stack:
+            instance_id = stack.pop()
+            if instance_id in records:
+                continue
+            record = self.record(instance_id)
+            records[instance_id] = record
+            body = _strings.sub(b"''", record[record.find(b"=") + 1:])
+            stack.extend(int(r) for r in _references.findall(body) if int(r) not in records)
+        return records
+
+    def subgraph(self, entity_type):
+        """
+        :return: ifcopenshell file, which only contains the instances of entity_type and everything they reference
+        """
+        records = self.closure(self.find_type(entity_type))
+        content = b"\n".join([self.header] + [records[i] for i in sorted(records)] + [b"ENDSEC;", b"END-ISO-10303-21;", b""])
+
+        handle, tmp_path = tempfile.mkstemp(suffix=".ifc")
+        try:
+            with os.fdopen(handle, "wb") as tmp:
+                tmp.write(content)
+            return ifcopenshell.open(tmp_path)
+        finally:
+            os.remove(tmp_path)
+
+
+def open_alignment_subgraph(path):
+    """
+    Opens only the IfcAlignment instances of an ifc file and their referenced entities (axis, alignment curve,
+    horizontal and vertical segments, ...). Geometry of other products is never parsed.
+    """
+    with StepScanner(path) as scanner:
+        return scanner.subgraph("IfcAlignment")
@@ -0,0 +1,124 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+import os
+import time
+from pathlib import Path
+
+import ifcopenshell
+
+
+def references(value):
+    """
+    :return: generator of the instances referenced by an attribute value (or list of attribute values)
+    """
+    if isinstance(value, (list, tuple)):
+        for v in value:
+            yield from references(v)
+    elif isinstance(value, ifcopenshell.entity_instance) and value.id():
+        yield value
+
+
+def step_record(entity):
+    """
+    :return: the record "#id=IFCTYPE(...)" of an instance, as ifc_file.write serializes it
+    """
+    if hasattr(entity, "to_string"):
+        # ifcopenshell >= 0.8
+        return entity.to_string()
+    # in 0.7 the repr (and toString) of an instance writes the CamelCase type name, ifc_file.write the upper case one
+    head, separator, arguments = entity.wrapped_data.toString().partition("(")
+    return head.upper() + separator + arguments
+
+
+def max_id(ifc_file):
+    """
+    :return: highest instance id of the file
+    """
+    return ifc_file.get_max_id() if hasattr(ifc_file, "get_max_id") else ifc_file.wrapped_data.getMaxId()
+
+
+class StepStreamWriter:
+    """
+    Writes the instances of an ifc file incrementally to a STEP physical file. Every flush appends the instances, which
+    are not written yet, the written ones may then be removed from the file to free memory.
+    The ids of the written instances are tracked. Instance ids are never reused by ifcopenshell, so every instance
+    created since the last flush has an id above the highest id of that flush.
+    """
+
+    def __init__(self, ifc_file, path):
+        """
+        :param ifc_file: file the instances are created in, everything it already contains is written immediately
+        :param path: path of the ifc, it is written as *.part and renamed when the writer is closed
+        """
+        self.ifc_file = ifc_file
+        self.path = Path(path)
+        self._tmp_path = self.path.with_name(self.path.name + ".part")
+        self._file = open(self._tmp_path, "w")
+        self._file.write("ISO-10303-21;\nHEADER;\n"
+                         "FILE_DESCRIPTION(('ViewDefinition [CoordinationView]'),'2;1');\n"
+                         f"FILE_NAME('{self.path.name}','{time.strftime('%Y-%m-%dT%H:%M:%S')}',(''),(''),"
+                         "'RailtwinVirtualizerAi','RailtwinVirtualizerAi','');\n"
+                         f"FILE_SCHEMA(('{ifc_file.schema}'));\nENDSEC;\nDATA;\n")
+        self.written = set()
+        self._scanned = 0  # highest id of the file at the last flush
+        self.count = 0
+        self.flush()
+
+    def _created(self):
+        """
+        :return: instances created since the last flush, which still exist
+        """
+        last, self._scanned = self._scanned, max_id(self.ifc_file)
+        for instance_id in range(last + 1, self._scanned + 1):
+            try:
+                yield self.ifc_file.by_id(instance_id)
+            except RuntimeError:
+                # created and removed again
+                continue
+
+    def flush(self, roots=()):
+        """
+        Writes every instance created since the last flush and the subgraphs of roots, which are not written yet.
+        :param roots: instances to write with the instances they reference
+        :return: number of written instances
+        """
+        found = {}
+        stack = list(roots) + list(self._created())
+        while stack:
+            current = stack.pop()
+            current_id = current.id()
+            if current_id in self.written or current_id in found:
+                continue
+            record = step_record(current)
+            if not self._contains(current_id, record):
+                # instance of another file assigned to an attribute, ifc_file.write leaves this reference dangling too
+                continue
+            found[current_id] = record
+            stack.extend(references(list(current)))
+        for instance_id in sorted(found):
+            self._file.write(found[instance_id] + ";\n")
+        self.written.update(found)
+        self.count += len(found)
+        return len(found)
+
+    def _contains(self, instance_id, record):
+        try:
+            return step_record(self.ifc_file.by_id(instance_id)) == record
+        except RuntimeError:
+            return False
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.write("ENDSEC;\nEND-ISO-10303-21;\n")
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def discard(self):
+        """Closes and removes the partial file"""
+        if not self._file.closed:
+            self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
@@ -0,0 +1,75 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+import uuid
+
+import ifcopenshell
+import ifcopenshell.geom
+import ifcopenshell.util.placement
+import ifcopenshell.util.unit
+import numpy as np
+
+# Switches (german := "Weiche") exported from ProVI are one entity with one IfcTriangulatedFaceSet per sleeper / rail.
+SLEEPER_TRIANGLES = 12  # sleepers are boxes
+HERZ_SLEEPER_WIDTH = 2.61  # sleepers of the frog (Herz) are wider than the ones under the switch blades (Becken)
+
+
+def classify_part(face_set):
+    """
+    :return: class name of one face set of a switch
+    """
+    if face_set.is_a("IfcTriangulatedFaceSet") and len(face_set.CoordIndex) == SLEEPER_TRIANGLES:
+        coordinates = np.array(face_set.Coordinates[0])
+        sleeper_width = np.linalg.norm(coordinates[1] - coordinates[0])
+        return "Schwelle_Weiche_Becken" if sleeper_width < HERZ_SLEEPER_WIDTH else "Schwelle_Weiche_Herz"
+    return "Schiene_Weiche"
+
+
+def face_set_mesh(face_set):
+    """
+    :return: vertices (n, 3) in the coordinate system of the representation and faces (m, 3) with indices from 0
+    """
+    coordinates = np.array(face_set.Coordinates.CoordList, dtype=np.float64)
+    faces = np.array(face_set.CoordIndex, dtype=np.int64) - 1
+    if getattr(face_set, "PnIndex", None):
+        coordinates = coordinates[np.array(face_set.PnIndex, dtype=np.int64) - 1]
+    return coordinates, faces
+
+
+def decompose_switch(ifc_file, element, settings, unit_scale=None):
+    """
+    Splits a switch into one part per face set. The coordinates of all triangulated face sets are read directly and
+    placed in world coordinates [m] in one transformation. Other items are triangulated with create_shape.
+    The file is only read, the parts are created in the containers (see copy_product).
+    :param unit_scale: length unit of the file in m, calculated if not given
+    :return: lists of parts (attributes replacing the ones of the element, representation item), vertices (n, 3) and
+             faces (m, 3)
+    """
+    if unit_scale is None:
+        unit_scale = ifcopenshell.util.unit.calculate_unit_scale(ifc_file)
+    matrix = ifcopenshell.util.placement.get_local_placement(element.ObjectPlacement)
+
+    parts, obj_vertices, obj_faces = [], [], []
+    local_vertices = []
+    for item in element.Representation.Representations[0].Items:
+        parts.append(({"GlobalId": ifcopenshell.guid.compress(uuid.uuid1().hex), "Name": classify_part(item)}, item))
+        if item.is_a("IfcTriangulatedFaceSet"):
+            vertices, faces = face_set_mesh(item)
+        else:
+            print(f"The representation of Weiche was not a IfcTriangulatedFaceSet, Type : {item.is_a()}")
+            print(f"In SourceElement : {element.GlobalId}")
+            # the triangulation of an item is local, but already in m
+            shape = ifcopenshell.geom.create_shape(settings, item)
+            geometry = getattr(shape, "geometry", shape)
+            vertices = np.reshape(np.array(geometry.verts), (-1, 3)) / unit_scale
+            faces = np.reshape(np.array(geometry.faces, dtype=int), (-1, 3))
+        local_vertices.append(vertices)
+        obj_faces.append(faces)
+
+    if local_vertices:
+        stacked = np.concatenate(local_vertices)
+        world = (stacked @ matrix[:3, :3].T + matrix[:3, 3]) * unit_scale
+        obj_vertices = np.split(world, np.cumsum([len(v) for v in local_vertices])[:-1])
+    return parts, obj_vertices, obj_faces
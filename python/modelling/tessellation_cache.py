@@ -0,0 +1,143 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+import ifcopenshell
+import ifcopenshell.geom
+import numpy as np
+
+from python.modelling.openshell_helpers import content_hash
+
+
+class TessellationCache:
+    """
+    On-disk cache of triangulated elements (vertices and faces in world coordinates).
+    The key is a content hash of the representation and placement subgraph of the element, of its openings, of the
+    units and of the geometry settings.
+    It does not depend on instance ids, GlobalIds or names, so it survives re-exports and parameter sweeps that do not
+    touch the geometry.
+    """
+
+    def __init__(self, path, settings_key=""):
+        """
+        :param path: cache folder, may be shared between runs and ifc files
+        :param settings_key: description of all geometry settings that influence the triangulation
+        """
+        self.path = Path(path)
+        self.settings_key = f"{settings_key};ifcopenshell={ifcopenshell.version}"
+        self._hashes = {}
+        self.hits = 0
+        self.misses = 0
+
+    def units(self, ifc_file):
+        """:return: content hash of the unit assignment of the project, the triangulation is in m"""
+        projects = ifc_file.by_type("IfcProject")
+        return content_hash(projects[0].UnitsInContext, self._hashes) if projects else ""
+
+    def key(self, element, units=""):
+        """
+        :param units: see units
+        """
+        content = [self.settings_key, units, content_hash(element.Representation, self._hashes),
+                   content_hash(element.ObjectPlacement, self._hashes)]
+        # the geometry iterator subtracts the openings, their order in the inverse attribute is arbitrary
+        openings = [rel.RelatedOpeningElement for rel in getattr(element, "HasOpenings", None) or ()]
+        content += sorted(content_hash(opening.Representation, self._hashes) +
+                          content_hash(opening.ObjectPlacement, self._hashes) for opening in openings)
+        return hashlib.sha1("|".join(content).encode()).hexdigest()
+
+    def file(self, key):
+        return self.path / key[:2] / f"{key}.npz"
+
+    def load(self, key):
+        """
+        :return: (vertices (n, 3), faces (m, 3)) or None
+        """
+        path = self.file(key)
+        if not path.exists():
+            return None
+        with np.load(path) as data:
+            return data["vertices"], data["faces"]
+
+    def store(self, key, vertices, faces):
+        path = self.file(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # write and rename, parallel workers may store the same element
+        handle, tmp_path = tempfile.mkstemp(suffix=".npz", dir=path.parent)
+        with os.fdopen(handle, "wb") as f:
+            np.savez_compressed(f, vertices=vertices, faces=faces)
+        os.replace(tmp_path, path)
+
+
+def tessellate(ifc_file, settings, threads=1, cache=None, products=None, instancing=None, element_filter=None):
+    """
+    Shape source of extract_areas, yields every triangulated product of the file.
+    Elements found in the cache are excluded from the geometry iterator, the new ones are stored.
+    All entities are read here (filter, instancing, cache keys, placements), the returned generator only drives the
+    geometry iterator and numpy. It may run in another thread than the one which modifies the file (see Pipeline).
+    :param products: only triangulate these products instead of all
+    :param instancing: InstancedTessellation, products of mapped items are placed instances of their representation map
+    :param element_filter: ElementFilter, the filtered products are excluded from the geometry iterator
+    :return: generator of (guid, vertices (n, 3), faces (m, 3))
+    """
+    candidates = ifc_file.by_type("IfcProduct") if products is None else products
+    instanced, filtered = [], []
+    if element_filter:
+        candidates, filtered = element_filter.split(candidates)
+    if instancing is not None:
+        instanced, candidates = instancing.split(candidates)
+    # all keys are computed upfront, the consumer modifies the representations of the yielded elements
+    keys = {}
+    cached = []
+    if cache is not None:
+        units = cache.units(ifc_file)
+        keys = {product.GlobalId: cache.key(product, units) for product in candidates if product.Representation}
+        cached = [product for product in candidates if product.GlobalId in keys and
+                  cache.file(keys[product.GlobalId]).exists()]
+        cache.hits += len(cached)
+        cache.misses += len(keys) - len(cached)
+
+    # initialized before anything is yielded, so products created by the consumer are not picked up
+    iterator = None
+    if products is None:
+        excluded = cached + instanced + filtered
+        iterator = ifcopenshell.geom.iterator(settings, ifc_file, threads, exclude=excluded if excluded else None)
+    else:
+        # include and exclude cannot be combined, an empty include would triangulate everything
+        cached_ids = {product.id() for product in cached}
+        include = [product for product in candidates if product.id() not in cached_ids]
+        if include:
+            iterator = ifcopenshell.geom.iterator(settings, ifc_file, threads, include=include)
+    if iterator is not None and not iterator.initialize():
+        iterator = None
+
+    placed = instancing.shapes(instanced) if instanced else ()
+    return _shapes([(product.GlobalId, keys[product.GlobalId]) for product in cached], placed, iterator, cache, keys)
+
+
+def _shapes(cached, placed, iterator, cache, keys):
+    """
+    :param cached: [(guid, cache key), ...]
+    :param placed: generator of the instanced shapes
+    """
+    for guid, key in cached:
+        yield (guid, *cache.load(key))
+
+    yield from placed
+
+    if iterator is not None:
+        while True:
+            shape = iterator.get()
+            vertices = np.reshape(np.array(shape.geometry.verts), (-1, 3))  # X Y Z of vert [flat representation]
+            faces = np.reshape(np.array(shape.geometry.faces, dtype=int), (-1, 3))  # Indices of vertices per triangle face
+            if shape.guid in keys:
+                cache.store(keys[shape.guid], vertices, faces)
+            yield shape.guid, vertices, faces
+            if not iterator.next():
+                break
@@ -3,6 +3,7 @@
 #              felix.eickeler@tum.de       
 # ----------------------------------------------------------------------------------------------------------------------------------
 
+import functools
 import json
 import multiprocessing
 import os
@@ -13,24 +14,42 @@ from pathlib import Path
 
 import ifcopenshell
 import ifcopenshell.geom
+import ifcopenshell.util.unit
 import numpy as np
 import pandas
 import spdlog as spd
 
 from python.modelling.oc_mapping import OCMapping
-from python.modelling.openshell_helpers import IfcFileContainer, clone_into
+from python.modelling.openshell_helpers import IfcFileContainer, copy_product, presentation_styles, drop_representation
 from .common.docker_helpers import docker_run, create_docker
-from .modelling.alignment_shapes.alignment import Alignment
+from .modelling.alignment_shapes.alignment import Alignment, SAMPLE_SUFFIX, COMBINED_SAMPLE_SUFFIX, plot_alignments
+from .modelling.alignment_shapes.alignment_index import AlignmentIndex
 from .modelling.blender.texture_modifier import create_augmentations
+from .modelling.spatial_index import ContainerIndex, AlignmentCorridor
+from .modelling.step_scanner import open_alignment_subgraph
+from .modelling.catenary import split_catenaries, PART_NAMES as CATENARY_PART_NAMES
+from .modelling.manifest import ElementManifest
+from .modelling.obj_writer import ObjWriter, style_colour
+from .modelling.switches import decompose_switch
+from .modelling.tessellation_cache import TessellationCache, tessellate
+from .modelling.pipeline import Pipeline
+from .modelling.decimation import DecimationConfig, alignment_tree, decimate_container
+from .modelling.instancing import InstancedTessellation
+from .modelling.element_filter import ElementFilter
 
 # Global Variables
 ONLY_CREATE_ONE_MODEL_MULTI_TRACKS = False
+CONTAINER_PER_ALIGNMENT = False  # one model per alignment instead of one per ifc file
 MAX_CPU_COUNT = 8
 BLENDER_VOXEL_SIZE = 0.16
+FAST_ALIGNMENT_SCAN = True  # only read the entities referenced by IfcAlignment for extract_alignment
+INCREMENTAL_LIMIT = 0.5  # share of changed elements, above which an incremental run rebuilds everything
+CATENARY_BATCH = 64  # catenaries, which are separated into their parts at once
+_WORKER_LOGGER = None
 
 
 class PrepareModels:
-    _steps = ["extract_alignment", "extract_areas", "convert", "helios_prep", "model_evaluation"]
+    _steps = ["extract_alignment", "plot_alignments", "extract_areas", "decimate", "convert", "helios_prep", "model_evaluation"]
 
     def __init__(self, _project):
         self.project = _project
@@ -38,6 +57,28 @@ class PrepareModels:
         self.plot = self.project.plot if hasattr(_project, "plot") else True
         self.show_plot = self.project.show_plot if hasattr(_project, "show_plot") else False
         self.resolution = self.project.trajectory_resolution if hasattr(_project, "trajectory_resolution") else 1  # in m
+        # curvature adaptive sampling, the resolution is then used as minimal step
+        self.max_chord_error = self.project.max_chord_error if hasattr(_project, "max_chord_error") else None  # in m
+        self.max_step = self.project.max_step if hasattr(_project, "max_step") else 50  # in m
+        # csv exports of the sampled alignments next to the binary store
+        self.alignment_csv = not self.project.no_alignment_csv if hasattr(_project, "no_alignment_csv") else True
+        self.alignment_workers = self.project.alignment_workers if hasattr(_project, "alignment_workers") else 1
+        self.reuse_alignments = self.project.reuse_alignments if hasattr(_project, "reuse_alignments") else False
+        # station index (AlignmentIndex) of the alignments with this maximal chord error, only built if given
+        self.alignment_index_error = self.project.alignment_index_error if hasattr(_project, "alignment_index_error") else None  # in m
+        self.corridor_width = self.project.corridor_width if hasattr(_project, "corridor_width") else None  # in m
+        self.area_workers = self.project.area_workers if hasattr(_project, "area_workers") else 1
+        self.tessellation_cache = self.project.tessellation_cache if hasattr(_project, "tessellation_cache") else None
+        self.direct_obj = self.project.direct_obj if hasattr(_project, "direct_obj") else False
+        self.incremental = self.project.incremental if hasattr(_project, "incremental") else False
+        self.stream_containers = self.project.stream_containers if hasattr(_project, "stream_containers") else False
+        self.pipeline_depth = self.project.pipeline_depth if hasattr(_project, "pipeline_depth") else 0
+        if self.pipeline_depth and self.stream_containers:
+            raise ValueError("--pipeline_depth cannot be combined with --stream_containers")
+        self.decimation_config = self.project.decimation_config if hasattr(_project, "decimation_config") else None
+        self.keep_instancing = self.project.keep_instancing if hasattr(_project, "keep_instancing") else False
+        self.element_filter = self.project.element_filter if hasattr(_project, "element_filter") else None
+        self.core_budget = self.project.core_budget if hasattr(_project, "core_budget") and self.project.core_budget else multiprocessing.cpu_count()
 
         ifc_input_path = self.project.ifc_input_path.expanduser()
 
@@ -78,81 +119,45 @@ class PrepareModels:
 
         if "extract_alignment" in steps:
             self.project.logger.info("Extracting Alignments !")
-            for process_file_count, ifc_file_path in enumerate(self.inputs):
-                discrete_alignments_paths = []
-                ifc_file = ifcopenshell.open(ifc_file_path)
-                self.project.logger.info(f"Processing IFC-Files: {ifc_file_path.name}")
-                ifc_alignments = ifc_file.by_type('IfcAlignment')
-                collection = []
-                for align in ifc_alignments:
-                    _alignment = Alignment()
-                    if not _alignment.parse(align.Axis): continue
-                    collection.append(_alignment)
-                self.project.logger.trace(f"Alignments collected. Found: {len(collection)}")
-                clean_collection = {}
-                for a in collection:
-                    if a.name not in clean_collection and a.name is not None:
-                        clean_collection[a.name] = a
-                self.project.logger.trace(f"Alignments cleaned! LeftOvers: {clean_collection}")
-
-                data = {
-                    "horizontal_mapping": {},
-                    "vertical_mapping": {}
-                }
-                collector = []
-                folder_path = _outpath = self.output / f"{ifc_file_path.stem}"
-                for a in clean_collection.values():
-                    a.horizontal_mapping = data["horizontal_mapping"]
-                    a.vertical_mapping = data["vertical_mapping"]
-                    _outpath = folder_path / ("#{}_{:3.2f}".format(a.name, self.project.trajectory_resolution)).replace(".", "m")
-                    _outpath.parent.mkdir(parents=True, exist_ok=True)
-
-                    if self.plot:
-                        self.project.logger.trace(f"Plotting: {a.name}")
-                        a.plot(path=_outpath.with_suffix(".svg"), show=self.show_plot)
-                    self.project.logger.trace(f"Sampling: {a.name}")
-                    points = a.sample(self.project.trajectory_resolution)
-                    _outpath = _outpath.with_suffix(".csv")
-                    points.to_csv(_outpath, index=False)
-                    discrete_alignments_paths.append(_outpath)
-                    collector.append(points)
-
-                    # ensure consecutive type naming
-                    data["horizontal_mapping"] = a.horizontal_mapping
-                    data["vertical_mapping"] = a.vertical_mapping
-                    a.to_json(_outpath.with_suffix(".json"))
-
-                with open(folder_path / f"{ifc_file_path.stem}_metadata.json", "w") as f:
-                    json.dump(data, f, ensure_ascii=False, indent=4)
-
-                if collector:
-                    pointer_hseg = 0
-                    pointer_vseg = 0
-
-                    for df in collector:
-                        df["segment_horizontal"] += pointer_hseg
-                        df["segment_vertical"] += pointer_vseg
-                        pointer_hseg = df["segment_horizontal"].max()
-                        pointer_vseg = df["segment_vertical"].max()
-
-                    combined = pandas.concat(collector)
-                    combined_path = folder_path / f"combined_{ifc_file_path.stem}.ccsv"
-                    combined.to_csv(combined_path, index=False)
-                    # plot
-                    points = Alignment.from_csv(combined_path)
-                    comb_alignment_name = f"All Alignments {ifc_file_path.stem}"
-                    if self.plot:
-                        self.project.logger.trace(f"Plotting: {comb_alignment_name}")
-                        Alignment._plot(df=points, path=combined_path.with_suffix(".svg"), show=self.show_plot, name=comb_alignment_name)
-
-                del _outpath
-                del ifc_alignments
-                del collection
-                del clean_collection
+            extract = functools.partial(extract_alignment_file, output=self.output,
+                                        resolution=self.project.trajectory_resolution,
+                                        max_chord_error=self.max_chord_error, max_step=self.max_step,
+                                        alignment_csv=self.alignment_csv, reuse_alignments=self.reuse_alignments,
+                                        alignment_index_error=self.alignment_index_error)
+            if self.alignment_workers > 1 and len(self.inputs) > 1:
+                self.project.logger.info(f"Using {self.alignment_workers} worker processes")
+                with multiprocessing.Pool(min(self.alignment_workers, len(self.inputs))) as pool:
+                    # imap keeps the order of the inputs
+                    file_mappings = list(pool.imap(extract, self.inputs))
+            else:
+                file_mappings = [extract(ifc_file_path, logger=self.project.logger) for ifc_file_path in self.inputs]
+
+            # merge the type mappings of all files, in the order of the inputs
+            merged = {"horizontal_mapping": {}, "vertical_mapping": {}, "files": {}}
+            for ifc_file_path, data in zip(self.inputs, file_mappings):
+                merged["files"][ifc_file_path.stem] = data
+                for key in ["horizontal_mapping", "vertical_mapping"]:
+                    for type_name in sorted(data[key], key=data[key].get):
+                        merged[key].setdefault(type_name, len(merged[key]))
+            with open(self.output / "alignment_metadata.json", "w") as f:
+                json.dump(merged, f, ensure_ascii=False, indent=4)
+
+        plot_process = None
+        if "plot_alignments" in steps and (self.plot or self.project.step == "plot_alignments"):
+            jobs = self.alignment_plot_jobs()
+            if self.show_plot:
+                self.project.logger.info("Plotting Alignments !")
+                plot_alignments(jobs, show=True)
+            else:
+                # rendering does not gate the model preparation, it is joined at the end of the run
+                self.project.logger.info("Plotting Alignments in the background !")
+                plot_process = multiprocessing.Process(target=plot_alignments, args=(jobs,))
+                plot_process.start()
+
         if "extract_areas" in steps:
             self.project.logger.info("Extracting IFC Areas / Content !")
             global_mapping = OCMapping.read(self.project.object_mapping)
-            discrete_alignments_paths = self.output.glob("**/*.csv")
+            discrete_alignments_paths = Alignment.sample_paths(self.output, "*/*")
             input_map = {ifc.stem: ifc for ifc in self.inputs}
 
             file_tree = {}
@@ -165,316 +170,52 @@ class PrepareModels:
                     except KeyError:
                         file_tree[ifc_file_stem] = [da]
 
-            for process_file_count, ifc_file_stem in enumerate(file_tree.keys()):
-                # self.project.logger.info(f"Separating different areas of: {ifc_file_stem}")
-                self.project.logger.info(f"Preparing the IFC-File for further processing: {ifc_file_stem}")
-
-                ifc_file_path = input_map[ifc_file_stem]
-                ifc_file = ifcopenshell.open(ifc_file_path)
-
-                # setup buckets for splits named IfcFileContainer
-                file_containers = []
-                samples = []
-                for current_alignment_path in file_tree[ifc_file_stem]:
-                    # name = current_alignment_path.stem.split("#")[-1].split("_")[0]
-                    samples.append(Alignment.from_csv(current_alignment_path))
-                samples = pandas.concat(samples)
-                folder = file_tree[ifc_file_stem][0].parent.stem
-                bounding_box = (
-                    (float(samples["x"].min() - 200), float(samples["y"].min() - 200), float(samples["z"].min() - 50)),
-                    (float(samples["x"].max() + 200), float(samples["y"].max() + 200), float(samples["z"].max() + 50))
-                )
-                file_containers.append(IfcFileContainer(name=ifc_file_stem,
-                                                        path=self.output / folder / f"{ifc_file_stem}.csv",
-                                                        bounding_box=bounding_box,
-                                                        template=ifc_file))
-
-                settings = ifcopenshell.geom.settings()
-                settings.set(settings.USE_WORLD_COORDS, True)
-                iterator = ifcopenshell.geom.iterator(settings, ifc_file, min(multiprocessing.cpu_count(), MAX_CPU_COUNT))
-                not_in_any_alignment_container = IfcFileContainer(name="NotInAlignment",
-                                                                  path=self.output / ("{}=>#{}_{:3.2f}".format(
-                                                                      ifc_file_path.stem, "NotAlignment",
-                                                                      self.project.trajectory_resolution)).replace(".", "m"),
-                                                                  bounding_box=((0, 0, 0), (0, 0, 0)),
-                                                                  template=ifc_file)
-
-                tmp_geo_repr_context = ifc_file.by_type("IfcGeometricRepresentationContext")
-                if len(tmp_geo_repr_context) == 1:
-                    geo_repr_context = tmp_geo_repr_context[0]
-                else:
-                    geo_repr_context = ifc_file.create_entity("IfcGeometricRepresentationContext")
-                    raise NotImplementedError("This is not done correctly !")
-                del tmp_geo_repr_context
-
-                # unwrap mapped items and convert breps
-                self.project.logger.info("TriangulSeperationAtion ...")
-
-                if iterator.initialize():
-                    while True:
-                        shape = iterator.get()
-                        source_element = ifc_file.by_guid(shape.guid)
-
-                        # This is very specific to the IFC-File we are working with that were exported from ProVI.
-                        # Sleepers in switches (german := "Weiche") are exported as one entity.
-                        # Therefore, we check the single entities and separate them.
-
-                        if source_element.Name == "Weiche":
-                            # count number of instances from the triangulated face list and clone them
-                            # remove other instances of the tf-faces
-                            # run create shapes to get the lists in global space
-                            # name after class of objects (maybe also get lenght for sleeper for grouping)
-                            tesselated_geometries = source_element.Representation.Representations[0].Items
-                            elements = []
-                            obj_vertices = []
-                            obj_faces = []
-                            for i, tfs in enumerate(tesselated_geometries):
-                                if not tfs.is_a('IfcTriangulatedFaceSet'):
-                                    print("The representation of Weiche was not a IfcTriangulatedFaceSet")
-                                    print(f"Type : {tfs.is_a()}")
-                                    print(f"In SourceElement : {source_element.GlobalId}, source_element.")
-
-                                # very wastefull, as this recreates the geometries n times for nothing.
-                                # However, recreating everything from scratch needs more care than I can give right now.
-                                copy = clone_into(ifc_file, ifc_file, source_element)
-                                for ctfs in copy.Representation.Representations[0].Items:
-                                    ifc_file.remove(ctfs)
-                                copy.Representation.Representations[0].Items = [tfs]
-                                if len(tfs.CoordIndex) == 12:
-                                    coordinates = np.array(tfs.Coordinates[0])
-                                    sleeper_width = np.linalg.norm(coordinates[1] - coordinates[0])
-                                    sleeper_length = np.linalg.norm(coordinates[2] - coordinates[1])
-                                    if sleeper_width < 2.61:
-                                        copy.Name = "Schwelle_Weiche_Becken"
-                                    else:
-                                        copy.Name = "Schwelle_Weiche_Herz"
-                                else:
-                                    copy.Name = "Schiene_Weiche"
-
-                                copy.GlobalId = ifcopenshell.guid.compress(uuid.uuid1().hex)
-
-                                shape = ifcopenshell.geom.create_shape(settings, copy)
-                                elements.append(copy)
-                                obj_vertices.append(np.reshape(np.array(shape.geometry.verts), (-1, 3)))
-                                obj_faces.append(np.reshape(np.array(shape.geometry.faces, dtype=int), (-1, 3)))
-                        else:
-                            verts = shape.geometry.verts  # X Y Z of vert [flat representation]
-                            np_verts = np.reshape(np.array(verts), (-1, 3))
-                            # materials = shape.geometry.materials  # Material names and colour style information that are relevant to this shape
-                            # material_ids = shape.geometry.material_ids  # Indices of material applied per triangle face e.g. [f1m, f2m, ...]
-                            flat_faces = shape.geometry.faces  # tuple of faces [flat representation]
-                            faces = np.reshape(np.array(flat_faces, dtype=int),
-                                               (-1, 3))  # Indices of vertices per triangle face e.g. [f1v1, f1v2, f1v3, f2v1, f2v2, f2v3, ...]
-
-                            if source_element.Name.find("Fahrdraht") != -1:
-                                # It's a Fahrdraht and needs to be changed.
-                                vertices = pandas.DataFrame(np_verts, columns=["x", "y", "z"])
-                                means = vertices.mean()
-                                vertices -= means
-                                U, s, V = np.linalg.svd(vertices)
-                                # constructor = source_element.__dict__
-                                # del constructor["type"]
-                                # ifc_file.create_entity("IfcBuildingElementProxy", **constructor)
-
-                                # # Debug and data stuff
-                                # linepts = V[0] * np.mgrid[-100:100:2j][:, np.newaxis]
-                                # # linepts += means
-                                #
-                                # linepts2 = V[1] * np.mgrid[-1:1:2j][:, np.newaxis]
-                                # # linepts2 += means
-                                #
-                                # import matplotlib.pyplot as plt
-                                # import mpl_toolkits.mplot3d as m3d
-                                #
-                                # ax = m3d.Axes3D(plt.figure())
-                                # ax.scatter3D(*vertices.to_numpy().T)
-                                # ax.plot3D(*linepts.T)
-                                # ax.plot3D(*linepts2.T, color='red')
-                                # plt.show()
-                                #
-                                v_diff = np.array([1, 1, 1]).dot(V.T)
-                                transformed_vertices = np.dot(vertices, np.sign(v_diff) * V.T)
-
-                                # get heights of vertices and apply thresholds, care ifc starts with 1 not 0
-                                # gfaces = faces
-                                # gverts = np_verts
-
-                                v2_heights = transformed_vertices[faces, 1]  # get the vertice v2 for each face
-                                tags = np.zeros_like(v2_heights)
-                                thr_cw = v2_heights.min() + 0.044  # contact_wire
-                                thr_mw = v2_heights.max() - 0.044  # messenger_wire (!sic)
-                                tags[v2_heights < thr_cw] = -1
-                                tags[v2_heights > thr_mw] = 1
-                                face_value = tags.sum(axis=1)  # which axis ?
-
-                                # place faces into new bins, could be numpy
-                                face_bins = [[], [], []]
-                                for i, face in enumerate(face_value):
-                                    if face == -3:
-                                        face_bins[0].append(i)
-                                    elif face == 3:
-                                        face_bins[2].append(i)
-                                    else:
-                                        face_bins[1].append(i)
-
-                                # cw, dropper, mw
-                                elements = [source_element, clone_into(ifc_file, ifc_file, source_element), clone_into(ifc_file, ifc_file, source_element)]
-
-                                # The fahrdraht will keep the name (as its actually correct, and also the ifc id)
-                                # elements[0].Name = source_element.Name # Fahrdraht is actually correct
-                                # elements[0].Name = source_element.GlobaId
-                                styles = elements[0].Representation.Representations[0].Items[0].StyledByItem
-
-                                elements[1].Name = source_element.Name.replace("Fahrdraht", "Hänger")
-                                elements[1].GlobalId = ifcopenshell.guid.compress(uuid.uuid1().hex)
-                                dropper_style = clone_into(ifc_file, ifc_file, styles)[0]
-                                dropper_style.Item = elements[1].Representation.Representations[0].Items[0]
-
-                                elements[2].Name = source_element.Name.replace("Fahrdraht", "Tragseil")
-                                elements[2].GlobalId = ifcopenshell.guid.compress(uuid.uuid1().hex)
-                                messenger_wire_style = clone_into(ifc_file, ifc_file, styles)[0]
-                                messenger_wire_style.Item = elements[2].Representation.Representations[0].Items[0]
-
-                                obj_faces = [[], [], []]
-                                obj_vertices = [[], [], []]
-                                # create new face and vertice groups
-                                for bin_idx, bin in enumerate(face_bins):
-                                    _bin_idx = np.array(bin)
-                                    obj_faces[bin_idx] = faces[_bin_idx]
-
-                                    original_index = np.unique(obj_faces[bin_idx])
-                                    # extract to new shape
-                                    obj_vertices[bin_idx] = np_verts[original_index]
-
-                                    # remap to new list (without "holes")
-                                    new = np.arange(0, len(original_index))
-                                    obj_faces[bin_idx] = np.searchsorted(original_index, obj_faces[bin_idx], sorter=new)
-
-                            else:
-                                elements = [source_element]
-                                obj_vertices = [np_verts]
-                                obj_faces = [faces]
-
-                        for idx, element in enumerate(elements):
-                            # create entities
-                            grouped_verts = (obj_vertices[idx]).tolist()
-                            grouped_faces = (obj_faces[idx] + 1).tolist()
-                            np_verts = obj_vertices[idx]
-
-                            # triangulate everything
-                            point_list = ifc_file.create_entity("IfcCartesianPointList3D", grouped_verts, [str(i) for i in range(1, np_verts.shape[0] + 1)])
-                            triangulated_faceset = ifc_file.create_entity("IfcTriangulatedFaceSet",
-                                                                          Coordinates=point_list, Normals=None, Closed=True,
-                                                                          CoordIndex=grouped_faces, PnIndex=None)
-                            shape_representation = ifc_file.create_entity("IfcShapeRepresentation",
-                                                                          ContextOfItems=geo_repr_context,
-                                                                          RepresentationIdentifier="Body",
-                                                                          RepresentationType="Tesselation",
-                                                                          Items=[triangulated_faceset])
-
-                            # extract IfcPresentationStyle
-                            try:
-                                representation_item = element.Representation.Representations[0].Items[0]
-                                if representation_item.is_a("IfcPolygonalFaceSet"):
-                                    styles = representation_item.StyledByItem
-                                    cloned_style = clone_into(ifc_file, ifc_file, styles)[0]
-                                    cloned_style.Name = ifcopenshell.guid.expand(element.GlobalId)
-
-                                else:
-                                    if representation_item.is_a("IfcMappedItem"):
-                                        styles = representation_item.MappingSource.MappedRepresentation.Items[0].StyledByItem[0].Styles
-                                        cloned_style = clone_into(ifc_file, ifc_file, styles)[0]
-
-                                    elif representation_item.StyledByItem:
-                                        styles = representation_item.StyledByItem[0].Styles
-                                        cloned_style = clone_into(ifc_file, ifc_file, styles)[0]
-                                    else:
-                                        raise NotImplementedError("This Representations Style is not implemented put here to do so !")
-
-                                    for psa in cloned_style:
-                                        for surface_style in psa:
-                                            try:
-                                                surface_style.Name = ifcopenshell.guid.expand(element.GlobalId)
-                                            except Exception:
-                                                raise ifcopenshell.Error("Fail to set Name of SurfaceStyle")
-
-                                styled_item = ifc_file.create_entity("IfcStyledItem",
-                                                                     Item=triangulated_faceset,
-                                                                     Styles=[cloned_style],
-                                                                     Name=None)
-                            except Exception as e:
-                                self.project.logger.warn("No representation item found for element: " + str(shape.guid))
-                                raise e
-                                # continue
-                            element.Representation.Representations = [shape_representation]
-
-                            # Now add elements to the correct file defined by the bounding box of the alignment
-                            element_found = False
-                            if len(file_containers) == 1:
-                                container = file_containers[0]
-                                new_element = container.ifc_file.add(element)
-                                new_styled_item = container.ifc_file.add(styled_item)
-                                container.class_mapping.add_entity(ifcopenshell.guid.expand(element.GlobalId), element.Name, container.path.name)
-                                container.transfer_property_set(element, new_element)
-                                # element_found = True
-                                # bb = None
-                            else:
-                                for containerCount, container in enumerate(file_containers):
-                                    bb = container.bounding_box
-                                    if np.any((np_verts[:, 0] > bb[0][0]) & (np_verts[:, 0] < bb[1][0])):
-                                        if np.any((np_verts[:, 1] > bb[0][1]) & (np_verts[:, 1] < bb[1][1])):
-                                            new_element = container.ifc_file.add(element)
-                                            new_styled_item = container.ifc_file.add(styled_item)
-                                            container.class_mapping.add_entity(ifcopenshell.guid.expand(element.GlobalId), element.Name, container.path.name)
-                                            container.transfer_property_set(element, new_element)
-                                            element_found = True
-                                            if ONLY_CREATE_ONE_MODEL_MULTI_TRACKS:
-                                                break
-                                if not element_found:
-                                    not_in_any_alignment_container.ifc_file.add(element)
-                                    not_in_any_alignment_container.ifc_file.add(styled_item)
-
-                        if not iterator.next():
-                            break
-
-                # monitor if something is out of scope
-                if len(not_in_any_alignment_container.ifc_file.by_type("IfcBuildingElement")) > 0:
-                    file_containers.append(not_in_any_alignment_container)
-                    self.project.logger.warn("Some shapes were not assigned to any alignment")
-
-                # finalize and save containers
-                for container in file_containers:
-                    self.project.logger.info(f"Writing output of {container.name}")
-                    container.link_products_to_site()
-                    container.ifc_file.write(str(container.path.with_suffix(".ifc")))
-                    container.class_mapping.save(container.path.parent / (container.path.stem + "_guid_mapping.json"))
-                    global_mapping.merge(container.class_mapping)
+            jobs = [(ifc, file_tree[ifc.stem]) for ifc in self.inputs if ifc.stem in file_tree]
+            workers = max(1, min(self.area_workers, len(jobs)))
+            # the core budget is split between the worker processes and the threads of their geometry iterators
+            iterator_threads = min(max(1, self.core_budget // workers), MAX_CPU_COUNT)
+            extract = functools.partial(extract_areas_file, output=self.output,
+                                        resolution=self.project.trajectory_resolution,
+                                        corridor_width=self.corridor_width, iterator_threads=iterator_threads,
+                                        tessellation_cache=self.tessellation_cache, direct_obj=self.direct_obj,
+                                        incremental=self.incremental, stream=self.stream_containers,
+                                        pipeline_depth=self.pipeline_depth, keep_instancing=self.keep_instancing,
+                                        element_filter=self.element_filter)
+            if workers > 1:
+                self.project.logger.info(f"Using {workers} worker processes with {iterator_threads} threads each")
+                # a fresh process per file releases the memory of the parsed ifc
+                with multiprocessing.Pool(workers, maxtasksperchild=1) as pool:
+                    file_mappings = pool.starmap(extract, jobs)
+            else:
+                file_mappings = (extract(*job, logger=self.project.logger) for job in jobs)
+
+            # merge in the order of the inputs, so the global indices are deterministic
+            for container_mappings, stale in file_mappings:
+                for guid in stale:
+                    global_mapping.remove_entity(guid)
+                for class_mapping in container_mappings:
+                    global_mapping.merge(class_mapping)
                 global_mapping.save()
+            if self.direct_obj:
+                # the global indices are known after the merge
+                self.project.logger.info("Adding the helios classification to the written MTL")
+                for ifc_file_path, _ in jobs:
+                    for mtl in (self.output / ifc_file_path.stem).glob("*.mtl"):
+                        helios_materials(mtl, global_mapping)
             self.project.logger.info("Done extracting areas")
-
-            # clean up
-            if True:
-                del bounding_box
-                del cloned_style
-                del element
-                del element_found
-                del faces
-                del geo_repr_context
-                del grouped_faces
-                del grouped_verts
-                del new_element
-                del new_styled_item
-                del np_verts
-                del point_list
-                del representation_item
-                del shape_representation
-                del surface_style
-                del triangulated_faceset
-                del verts
-                del global_mapping
-                del file_containers
-
-        if "convert" in steps:
+            del global_mapping
+
+        # decimation is part of all_steps only with a config, it changes the geometry of the containers
+        if "decimate" in steps and (self.decimation_config is not None or self.project.step == "decimate"):
+            self.project.logger.info("Decimating the extracted areas !")
+            self.decimate()
+
+        if "convert" in steps and self.direct_obj:
+            self.project.logger.info("OBJ + MTL were written by extract_areas, only exporting the trajectories")
+            self.trajectories_to_csv()
+            # the obj are written in the shifted frame of global_position.csv like the output of blender
+            self.local_trajectories()
+        elif "convert" in steps:
             self.project.logger.info("Converting the IFC-Files to OBJ + MTL !")
             if create_docker(self.output, self.output, "blender").returncode == 0:
                 texture_path = Path(__file__).parent / "modelling" / "blender" / "textures"
@@ -487,17 +228,7 @@ class PrepareModels:
                 # start docker & execute conductor 1
                 self.project.logger.info("Staring up docker for blender processing")
                 docker_run_blender(self.output, BLENDER_VOXEL_SIZE)
-
-                for gp in self.output.glob("*/global_position.csv"):
-                    shift = np.genfromtxt(gp, delimiter=',')
-                    for _csv in gp.parent.glob("*.csv"):
-                        if _csv.name == "global_position.csv" or _csv.name.endswith("_local.csv"):
-                            continue
-                        current_alignment = Alignment.from_csv(_csv)
-                        current_alignment["x"] -= shift[0]
-                        current_alignment["y"] -= shift[1]
-                        current_alignment["z"] -= shift[2]
-                        current_alignment.to_csv(_csv.parent / f"{_csv.stem}_local.csv", index=False)
+                self.local_trajectories()
             else:
                 self.project.logger.warn(f"Could not start blender docker, fallback to ifc convert instead")
 
@@ -537,6 +268,8 @@ class PrepareModels:
                     import subprocess
                     status = subprocess.run([convert_executable, current_filepaths_path, current_filepaths_path.with_suffix(".obj")])  # "--sew-shells"
                 del ifc_files
+
+                self.trajectories_to_csv()
                 del convert_executable
 
         if "model_evaluation" in steps:
@@ -598,43 +331,16 @@ class PrepareModels:
             global_mapping = OCMapping.read(self.project.object_mapping)
             mtl_files = self.output.glob("**/*.mtl")
             for mtl in mtl_files:
-                class_tmp_path = mtl.with_suffix(".class_tmp")
-                guid_tmp_path = mtl.with_suffix(".guid_tmp")
-
                 # saveguard against old files
                 if mtl.with_suffix(".obj").stat().st_size < 50000:
                     continue
-
-                # saveguard against rerunning
-                if mtl.with_suffix(".original_mtl").exists():
-                    shutil.move(mtl.with_suffix(".original_mtl"), mtl)
-
-                with open(mtl, "r") as src, open(guid_tmp_path, "w") as guid_dst, open(class_tmp_path, "w") as class_dst:
-                    # first_line = next(src)
-                    # guid_dst.write(first_line)
-                    # class_dst.write(first_line)
-                    next_guid = None
-
-                    for line in src:
-                        if line.strip():
-                            if line.startswith("newmtl"):
-                                if next_guid:
-                                    idx, class_idx, source_idx = global_mapping.data["entities"][next_guid].values()
-                                    guid_dst.write(f"helios_classification {idx}\n\n")
-                                    class_dst.write(f"helios_classification {class_idx}\n\n")
-                                next_guid = line[7:].split("-")[-1].strip()
-
-                            guid_dst.write(line)
-                            class_dst.write(line)
-                    idx, class_idx, source_idx = global_mapping.data["entities"][next_guid].values()
-                    guid_dst.write(f"helios_classification {idx}\n")
-                    class_dst.write(f"helios_classification {class_idx}\n")
-
-                shutil.move(mtl, mtl.with_suffix(".original_mtl"))
-                shutil.move(class_tmp_path, mtl.with_suffix(".class_mtl"))
-                shutil.move(guid_tmp_path, mtl.with_suffix(".mtl"))
+                helios_materials(mtl, global_mapping)
             self.project.logger.info("*.mtl files modified")
 
+        if plot_process is not None:
+            self.project.logger.info("Waiting for the alignment plots")
+            plot_process.join()
+
     @staticmethod
     def add_parser_options(subparser):
         pmo_parser = subparser.add_parser("prepare_models")
@@ -644,16 +350,657 @@ class PrepareModels:
                                 dest="model_output_path")
         pmo_parser.add_argument('--object_mapping', type=Path, required=False, default=None)
 
-        pmo_parser.add_argument('--step', choices=PrepareModels._steps + ["all_steps"], help='[extract_alignment, extract_areas, convert, helios_prep]',
+        pmo_parser.add_argument('--step', choices=PrepareModels._steps + ["all_steps"], help='[extract_alignment, plot_alignments, extract_areas, decimate, convert, helios_prep]',
                                 required=True, dest="secondary")
 
         pmo_parser.add_argument('--plot', type=bool, required=False, default=False)
         pmo_parser.add_argument('--show_plot', type=bool, required=False, default=False)
         pmo_parser.add_argument('--resolution', dest="trajectory_resolution", type=float, help="sampling space in [m]", required=False, default=1)
+        pmo_parser.add_argument('--max_chord_error', type=float, required=False, default=None,
+                                help="enables curvature adaptive sampling of the alignment with this maximal sagitta in [m]")
+        pmo_parser.add_argument('--max_step', type=float, required=False, default=50,
+                                help="maximal sampling space of the adaptive sampling in [m]")
+        pmo_parser.add_argument('--no_alignment_csv', action="store_true",
+                                help="only write the binary alignment store (*.arrow) and skip the csv exports")
+        pmo_parser.add_argument('--alignment_workers', type=int, required=False, default=1,
+                                help="number of processes extracting the alignments of different ifc files")
+        pmo_parser.add_argument('--reuse_alignments', action="store_true",
+                                help="resample the stored alignments (*.alignment.npz) of a previous run instead of parsing the ifc")
+        pmo_parser.add_argument('--alignment_index_error', type=float, required=False, default=None,
+                                help="stores a station index (*.index.npz) of every alignment, whose polyline deviates at most this much in [m]")
+        pmo_parser.add_argument('--corridor_width', type=float, required=False, default=None,
+                                help="only keep elements within this distance [m] of the alignments instead of the whole bounding box")
+        pmo_parser.add_argument('--area_workers', type=int, required=False, default=1,
+                                help="number of processes extracting the areas of different ifc files")
+        pmo_parser.add_argument('--core_budget', type=int, required=False, default=None,
+                                help="cores shared by the area workers and their geometry iterator threads (default: all)")
+        pmo_parser.add_argument('--tessellation_cache', type=Path, required=False, default=None,
+                                help="folder to cache the triangulated elements between runs")
+        pmo_parser.add_argument('--direct_obj', action="store_true",
+                                help="write obj + mtl directly in extract_areas, convert then skips blender / IfcConvert")
+        pmo_parser.add_argument('--incremental', action="store_true",
+                                help="only rebuild the containers of elements changed since the last incremental extract_areas")
+        pmo_parser.add_argument('--stream_containers', action="store_true",
+                                help="write the containers element by element, memory stays proportional to the largest element")
+        pmo_parser.add_argument('--pipeline_depth', type=int, required=False, default=0,
+                                help="triangulate ahead in a producer thread, queue of this many shapes (0: lock-step), "
+                                     "not with --stream_containers")
+        pmo_parser.add_argument('--decimation_config', type=Path, required=False, default=None,
+                                help="json with decimation rules per ifc class / name, enables decimate in all_steps")
+        pmo_parser.add_argument('--keep_instancing', action="store_true",
+                                help="write instances of IfcMappedItem as mapped items of one triangulated map (ifc containers)")
+        pmo_parser.add_argument('--element_filter', type=Path, required=False, default=None,
+                                help="json with include / exclude rules by ifc class, name and pset values for extract_areas")
+
+    def trajectories_to_csv(self):
+        # helios reads the trajectories as csv
+        for sample_path in Alignment.sample_paths(self.output, "*/*"):
+            if not sample_path.with_suffix(".csv").exists():
+                Alignment.read_samples(sample_path).to_csv(sample_path.with_suffix(".csv"), index=False)
+
+    def local_trajectories(self):
+        # the models are shifted by global_position.csv, helios needs the trajectories in the same frame
+        for gp in self.output.glob("*/global_position.csv"):
+            shift = np.genfromtxt(gp, delimiter=',')
+            for sample_path in Alignment.sample_paths(gp.parent):
+                current_alignment = Alignment.read_samples(sample_path)
+                current_alignment["x"] -= shift[0]
+                current_alignment["y"] -= shift[1]
+                current_alignment["z"] -= shift[2]
+                current_alignment.to_csv(sample_path.parent / f"{sample_path.stem}_local.csv", index=False)
+
+    def decimate(self):
+        """
+        Simplifies the containers of extract_areas (ifc or direct obj), the error bound grows with the distance to the
+        alignments of their ifc file.
+        """
+        config = DecimationConfig.read(self.decimation_config)
+        for ifc_file_path in self.inputs:
+            folder = self.output / ifc_file_path.stem
+            sample_paths = Alignment.sample_paths(folder)
+            if not sample_paths:
+                continue
+            samples = [Alignment.read_samples(path, ["x", "y", "z"]).to_numpy() for path in sample_paths]
+            tree = alignment_tree(samples)
+            container_paths = sorted(folder.glob("*.obj" if self.direct_obj else "*.ifc"))
+            container_paths += sorted(self.output.glob(f"{ifc_file_path.stem}=>*.ifc"))
+            local_tree = None
+            if (folder / "global_position.csv").exists():
+                # the direct obj are written in the shifted frame
+                shift = np.genfromtxt(folder / "global_position.csv", delimiter=',')
+                local_tree = alignment_tree([xyz - shift for xyz in samples])
+            for container_path in container_paths:
+                names, ifc_classes = None, None
+                container_tree = tree
+                if container_path.suffix == ".obj":
+                    container_tree = local_tree if local_tree is not None else tree
+                    # the objects are named after the expanded GlobalId, the mapping knows their element name and class
+                    mapping = OCMapping.read(container_path.with_name(container_path.stem + "_guid_mapping.json"))
+                    names = {guid: mapping.reverse_classes[entity["class_idx"]] for guid, entity in mapping.data["entities"].items()}
+                    ifc_classes = {guid: entity["ifc_class"] for guid, entity in mapping.data["entities"].items() if "ifc_class" in entity}
+                    if len(ifc_classes) < len(names) and any("class" in rule for rule in config.rules):
+                        self.project.logger.warn(f"{container_path.name}: {len(names) - len(ifc_classes)} objects have no IFC class "
+                                                 f"in the mapping (written by an older version), the class rules are not applied to them")
+                result = decimate_container(container_path, container_tree, config, names, ifc_classes)
+                if result is None:
+                    self.project.logger.info(f"{container_path.name} is already decimated")
+                else:
+                    self.project.logger.info(f"{container_path.name}: {result[0]} -> {result[1]} triangles")
 
     def get_steps(self):
         return list(self._steps)
 
+    def alignment_plot_jobs(self):
+        """
+        Plots of the stored alignment samples: one per alignment and one combined plot per ifc file.
+        """
+        jobs = []
+        for ifc_file_path in self.inputs:
+            folder_path = self.output / ifc_file_path.stem
+            for sample_path in Alignment.sample_paths(folder_path):
+                name = sample_path.stem[1:].rsplit("_", 1)[0]
+                jobs.append((sample_path, sample_path.with_suffix(".svg"), name))
+            combined_path = folder_path / f"combined_{ifc_file_path.stem}{COMBINED_SAMPLE_SUFFIX}"
+            if combined_path.exists():
+                jobs.append((combined_path, combined_path.with_suffix(".svg"), f"All Alignments {ifc_file_path.stem}"))
+        return jobs
+
+
+def local_shift(samples):
+    """
+    Origin of the local frame of the direct obj containers (whole metres below the sampled alignments), the world
+    coordinates are too large for the single precision of helios and blender.
+    :param samples: list of DataFrames with x, y, z
+    :return: (3,) shift
+    """
+    return np.floor(np.min([s[["x", "y", "z"]].to_numpy().min(axis=0) for s in samples], axis=0))
+
+
+def helios_materials(mtl, global_mapping):
+    """
+    Adds the helios classification of the global mapping to the materials (named after the GlobalId) of a mtl.
+    Writes the mtl with the entity indices, the *.class_mtl with the class indices and keeps the *.original_mtl.
+    """
+    class_tmp_path = mtl.with_suffix(".class_tmp")
+    guid_tmp_path = mtl.with_suffix(".guid_tmp")
+
+    # saveguard against rerunning
+    if mtl.with_suffix(".original_mtl").exists():
+        shutil.move(mtl.with_suffix(".original_mtl"), mtl)
+
+    with open(mtl, "r") as src, open(guid_tmp_path, "w") as guid_dst, open(class_tmp_path, "w") as class_dst:
+        # first_line = next(src)
+        # guid_dst.write(first_line)
+        # class_dst.write(first_line)
+        next_guid = None
+
+        for line in src:
+            if line.strip():
+                if line.startswith("newmtl"):
+                    if next_guid:
+                        idx, class_idx, source_idx = global_mapping.data["entities"][next_guid].values()
+                        guid_dst.write(f"helios_classification {idx}\n\n")
+                        class_dst.write(f"helios_classification {class_idx}\n\n")
+                    next_guid = line[7:].split("-")[-1].strip()
+
+                guid_dst.write(line)
+                class_dst.write(line)
+        if next_guid:
+            idx, class_idx, source_idx = global_mapping.data["entities"][next_guid].values()
+            guid_dst.write(f"helios_classification {idx}\n")
+            class_dst.write(f"helios_classification {class_idx}\n")
+
+    shutil.move(mtl, mtl.with_suffix(".original_mtl"))
+    shutil.move(class_tmp_path, mtl.with_suffix(".class_mtl"))
+    shutil.move(guid_tmp_path, mtl.with_suffix(".mtl"))
+
+
+def _worker_logger():
+    global _WORKER_LOGGER
+    if _WORKER_LOGGER is None:
+        _WORKER_LOGGER = spd.ConsoleLogger(f"RailTwin-{os.getpid()}", False, True, True)
+        _WORKER_LOGGER.set_level(spd.LogLevel.INFO)
+    return _WORKER_LOGGER
+
+
+def extract_areas_file(ifc_file_path, alignment_paths, output, resolution, corridor_width=None,
+                       iterator_threads=MAX_CPU_COUNT, tessellation_cache=None, direct_obj=False, incremental=False,
+                       stream=False, pipeline_depth=0, keep_instancing=False, element_filter=None, logger=None):
+    """
+    Triangulates, splits and writes the elements of one ifc file into its area containers. Module level, so it can run
+    in a worker process.
+    :param alignment_paths: sampled alignments of this ifc file
+    :param iterator_threads: threads of the geometry iterator
+    :param tessellation_cache: folder of the tessellation cache, unchanged elements are not triangulated again
+    :param direct_obj: write obj + mtl of the containers directly from the triangulation instead of ifc
+    :param incremental: only rebuild the containers of elements changed since the last (incremental) run
+    :param stream: write the container ifc element by element and drop processed geometry, the memory stays bounded
+    :param pipeline_depth: triangulate in a producer thread with a queue of this many shapes (0: lock-step). The file is
+                           only read while the pipeline runs, it cannot be combined with stream.
+    :param keep_instancing: instances of representation maps stay mapped items in the container ifc
+    :param element_filter: json with include / exclude rules (class, name, pset values), see ElementFilter
+    :return: class mappings of the containers, output GlobalIds of the previous run to remove from the global mapping
+    """
+    logger = logger if logger is not None else _worker_logger()
+    if pipeline_depth and stream:
+        # the geometry iterator of the pipeline reads the file, the streaming mode removes the processed geometry from it
+        raise ValueError("pipeline_depth cannot be combined with stream")
+    ifc_file_stem = ifc_file_path.stem
+    logger.info(f"Preparing the IFC-File for further processing: {ifc_file_stem}")
+
+    ifc_file = ifcopenshell.open(ifc_file_path)
+
+    # setup buckets for splits named IfcFileContainer
+    file_containers = []
+    samples = []
+    for current_alignment_path in alignment_paths:
+        # name = current_alignment_path.stem.split("#")[-1].split("_")[0]
+        samples.append(Alignment.read_samples(current_alignment_path, columns=["x", "y", "z"]))
+    folder = alignment_paths[0].parent.stem
+    # direct mode: the obj are written in a local frame like the blender conversion, the shift is stored next to them
+    shift = np.zeros(3)
+    if direct_obj:
+        shift = local_shift(samples)
+        (output / folder).mkdir(parents=True, exist_ok=True)
+        with open(output / folder / "global_position.csv", "w") as out:
+            out.write(f"{shift[0]},{shift[1]},{shift[2]}")
+    if CONTAINER_PER_ALIGNMENT:
+        areas = [(path.stem, path.stem, s) for path, s in zip(alignment_paths, samples)]
+    else:
+        areas = [(ifc_file_stem, ifc_file_stem, pandas.concat(samples))]
+    for name, stem, area_samples in areas:
+        bounding_box = (
+            (float(area_samples["x"].min() - 200), float(area_samples["y"].min() - 200), float(area_samples["z"].min() - 50)),
+            (float(area_samples["x"].max() + 200), float(area_samples["y"].max() + 200), float(area_samples["z"].max() + 50))
+        )
+        file_containers.append(IfcFileContainer(name=name,
+                                                path=output / folder / f"{stem}.csv",
+                                                bounding_box=bounding_box,
+                                                template=ifc_file))
+    container_index = ContainerIndex([container.bounding_box for container in file_containers])
+
+    # corridor mode: elements further away from the alignments than the corridor width are dropped
+    corridor, container_corridors, clipped = None, None, 0
+    if corridor_width:
+        polylines = [s[["x", "y"]].to_numpy() for s in samples]
+        corridor = AlignmentCorridor(polylines, corridor_width)
+        if CONTAINER_PER_ALIGNMENT:
+            container_corridors = [AlignmentCorridor([p], corridor_width) for p in polylines]
+
+    settings = ifcopenshell.geom.settings()
+    settings.set(settings.USE_WORLD_COORDS, True)
+    unit_scale = ifcopenshell.util.unit.calculate_unit_scale(ifc_file)
+    cache = TessellationCache(tessellation_cache, settings_key="USE_WORLD_COORDS=True") if tessellation_cache else None
+    # declarative selection, the filtered elements are excluded from the geometry iterator
+    selection = ElementFilter.read(element_filter)
+    if selection:
+        excluded = selection.split(ifc_file.by_type("IfcProduct"))[1]
+        logger.info(f"Element filter: {len(excluded)} elements are excluded")
+    # repeated geometry (mapped items) is triangulated once per representation map
+    instancing = InstancedTessellation(ifc_file, settings, unit_scale)
+    not_in_any_alignment_container = IfcFileContainer(name="NotInAlignment",
+                                                      path=output / ("{}=>#{}_{:3.2f}".format(
+                                                          ifc_file_path.stem, "NotAlignment",
+                                                          resolution)).replace(".", "m"),
+                                                      bounding_box=((0, 0, 0), (0, 0, 0)),
+                                                      template=ifc_file)
+
+    def assign(vertices):
+        """Indices of the containers an element falls into, the containers are defined by the bounding box of the alignment"""
+        if len(file_containers) == 1:
+            return [0]
+        # only the containers overlapping the bounding box of the element are tested
+        found = [containerCount for containerCount in container_index.query(vertices)
+                 if container_corridors is None or container_corridors[containerCount].contains(vertices)]
+        return found[:1] if ONLY_CREATE_ONE_MODEL_MULTI_TRACKS else found
+
+    def container_names(targets):
+        return [file_containers[t].name for t in targets] if targets else [not_in_any_alignment_container.name]
+
+    # incremental mode: only the containers of new, changed or removed elements are rebuilt
+    manifest, hashes, changed, removed, rebuilt, affected, shapes = None, {}, set(), set(), set(), None, None
+    if incremental:
+        # every option, which changes the output (format, representation, selection, containers), invalidates the manifest
+        settings_key = json.dumps([resolution, corridor_width, "obj" if direct_obj else "ifc", shift.tolist(),
+                                   keep_instancing, stream, CONTAINER_PER_ALIGNMENT, ONLY_CREATE_ONE_MODEL_MULTI_TRACKS, selection.key,
+                                   [(container.name, container.bounding_box) for container in file_containers]])
+        manifest = ElementManifest(output / folder / f"{ifc_file_stem}_manifest.json", settings_key)
+        hashes = {guid: value for guid, value in manifest.hashes(ifc_file).items()
+                  if not selection or selection.keep(ifc_file.by_guid(guid))}
+        changed, removed = manifest.changed(hashes), manifest.removed(hashes)
+        rebuilt = set(hashes) - changed
+        if manifest.valid and len(changed) <= INCREMENTAL_LIMIT * len(hashes):
+            affected = manifest.containers(changed | removed)
+            affected.update(container.name for container in file_containers
+                            if not (container.path.parent / (container.path.stem + "_guid_mapping.json")).exists())
+            # the containers of new (or moved) elements are only known after the triangulation. The meshes are not
+            # kept, the changed elements are triangulated again (or loaded from the tessellation cache) below.
+            for guid, shape_vertices, _ in tessellate(ifc_file, settings, iterator_threads, cache,
+                                                      products=[ifc_file.by_guid(guid) for guid in sorted(changed)],
+                                                      instancing=instancing, element_filter=selection):
+                if corridor is None or corridor.contains(shape_vertices):
+                    affected.update(container_names(assign(shape_vertices)))
+            rebuilt = {guid for guid in rebuilt if manifest.containers([guid]) & affected}
+            for guid in set(hashes) - changed - rebuilt:
+                manifest.keep(guid)
+            logger.info(f"Incremental: {len(changed)} new or changed and {len(removed)} removed elements, "
+                        f"rebuilding {len(affected)} containers")
+            shapes = tessellate(ifc_file, settings, iterator_threads, cache,
+                                products=[ifc_file.by_guid(guid) for guid in sorted(changed | rebuilt)],
+                                instancing=instancing, element_filter=selection)
+    if shapes is None:
+        shapes = tessellate(ifc_file, settings, iterator_threads, cache, instancing=instancing, element_filter=selection)
+    # pipelined mode: the iterator triangulates ahead into a bounded queue while the containers are assembled
+    pipeline = None
+    if pipeline_depth:
+        pipeline = Pipeline(shapes, pipeline_depth)
+        shapes = iter(pipeline)
+
+    # direct mode: obj + mtl per container are streamed instead of the container ifc (the unassigned elements are kept as ifc)
+    obj_writers = [ObjWriter(container.path.with_suffix(".obj")) if affected is None or container.name in affected else None
+                   for container in file_containers] if direct_obj else None
+
+    # streaming mode: the containers are written element by element, processed geometry is removed from memory
+    if stream:
+        for container in file_containers + [not_in_any_alignment_container]:
+            if (obj_writers is None or container is not_in_any_alignment_container) and \
+                    (affected is None or container.name in affected):
+                container.stream()
+
+    tmp_geo_repr_context = ifc_file.by_type("IfcGeometricRepresentationContext")
+    if len(tmp_geo_repr_context) == 1:
+        geo_repr_context = tmp_geo_repr_context[0]
+    else:
+        geo_repr_context = ifc_file.create_entity("IfcGeometricRepresentationContext")
+        raise NotImplementedError("This is not done correctly !")
+    del tmp_geo_repr_context
+
+    def add_element(target_file, source_element, attributes, vertices, faces, instance):
+        """
+        Creates a processed element in a container file. The source file is only read, the geometry iterator may still
+        run on it in the pipeline thread.
+        :param attributes: attributes replacing the ones of the source element (GlobalId and Name of parts)
+        :param instance: see InstancedTessellation.instance, the element gets a mapped item instead of a face set
+        :return: the new element and its representation item (to be styled)
+        """
+        context = target_file.add(geo_repr_context)
+        if instance is None:
+            # triangulate everything
+            point_list = target_file.create_entity("IfcCartesianPointList3D", vertices.tolist(),
+                                                   [str(i) for i in range(1, vertices.shape[0] + 1)])
+            triangulated_faceset = target_file.create_entity("IfcTriangulatedFaceSet",
+                                                             Coordinates=point_list, Normals=None, Closed=True,
+                                                             CoordIndex=(faces + 1).tolist(), PnIndex=None)
+            shape_representation = target_file.create_entity("IfcShapeRepresentation",
+                                                             ContextOfItems=context,
+                                                             RepresentationIdentifier="Body",
+                                                             RepresentationType="Tesselation",
+                                                             Items=[triangulated_faceset])
+        else:
+            shape_representation = instancing.representation(instance, target_file, context)
+        new_element = copy_product(target_file, source_element, shape_representation, **attributes)
+        return new_element, shape_representation.Items[0]
+
+    def split_catenary_shapes(shapes):
+        """
+        Passes the shapes through, catenaries (german := "Fahrdraht") are buffered and separated into contact wire,
+        droppers and messenger wire in batches of CATENARY_BATCH.
+        :return: generator of (guid, vertices, faces, [(part, vertices, faces), ...] of a catenary or None)
+        """
+        def split(batch):
+            catenaries = split_catenaries([(vertices, faces) for _, vertices, faces in batch])
+            return [(*shape, catenary) for shape, catenary in zip(batch, catenaries)]
+
+        batch = []
+        for guid, vertices, faces in shapes:
+            if "Fahrdraht" not in (ifc_file.by_guid(guid).Name or ""):
+                yield guid, vertices, faces, None
+                continue
+            batch.append((guid, vertices, faces))
+            if len(batch) == CATENARY_BATCH:
+                yield from split(batch)
+                batch = []
+        yield from split(batch)
+
+    # unwrap mapped items and convert breps
+    logger.info("TriangulSeperationAtion ...")
+
+    for guid, shape_vertices, shape_faces, catenary_parts in split_catenary_shapes(shapes):
+        if corridor is not None and not corridor.contains(shape_vertices):
+            clipped += 1
+            if manifest is not None:
+                manifest.record(guid, hashes[guid], [], [])
+            if stream:
+                drop_representation(ifc_file, ifc_file.by_guid(guid))
+            continue
+        source_element = ifc_file.by_guid(guid)
+
+        # This is very specific to the IFC-File we are working with that were exported from ProVI.
+        # Sleepers in switches (german := "Weiche") are exported as one entity.
+        # Therefore, we check the single entities and separate them.
+
+        # extract IfcPresentationStyle, the styles are added to the containers with the elements
+        try:
+            source_styles = presentation_styles(source_element.Representation.Representations[0].Items[0])
+        except Exception as e:
+            logger.warn("No representation item found for element: " + str(guid))
+            raise e
+
+        # every part of the element is described by the attributes replacing the ones of the source element
+        if source_element.Name == "Weiche":
+            # one lightweight product per face set (sleepers and rails), the coordinates are read and placed directly
+            parts, obj_vertices, obj_faces = decompose_switch(ifc_file, source_element, settings, unit_scale)
+            # every part keeps the style of its face set
+            element_styles = [presentation_styles(item) for _, item in parts]
+            parts = [attributes for attributes, _ in parts]
+        elif catenary_parts is not None:
+            # It's a Fahrdraht and is separated into contact wire, droppers and messenger wire.
+            name = source_element.Name
+            parts, obj_vertices, obj_faces = [], [], []
+            for part, part_vertices, part_faces in catenary_parts:
+                # the first part keeps the GlobalId of the source element
+                attributes = {"Name": name.replace("Fahrdraht", CATENARY_PART_NAMES[part])}
+                if parts:
+                    attributes["GlobalId"] = ifcopenshell.guid.compress(uuid.uuid1().hex)
+                parts.append(attributes)
+                obj_vertices.append(part_vertices)
+                obj_faces.append(part_faces)
+            element_styles = [source_styles] * len(parts)
+        else:
+            parts = [{}]
+            obj_vertices = [shape_vertices]
+            obj_faces = [shape_faces]
+            element_styles = [source_styles]
+
+        element_containers, element_outputs = set(), []
+        for idx, attributes in enumerate(parts):
+            np_verts = obj_vertices[idx]
+            element_name = attributes.get("Name", source_element.Name)
+            # the surface styles are named after the element, the materials of the obj are named after them
+            style_name = ifcopenshell.guid.expand(attributes.get("GlobalId", source_element.GlobalId))
+            styles = element_styles[idx]
+
+            targets = assign(np_verts)
+            element_containers.update(container_names(targets))
+            element_outputs.append(style_name)
+            # containers, which are not rebuilt, keep their content
+            write_targets = targets if affected is None else [t for t in targets if file_containers[t].name in affected]
+            unassigned = not targets and (affected is None or not_in_any_alignment_container.name in affected)
+
+            if obj_writers is not None and targets:
+                # the elements are written to the obj directly, no ifc entities are needed
+                colour, alpha = style_colour(styles)
+                for containerCount in write_targets:
+                    container = file_containers[containerCount]
+                    obj_writers[containerCount].add(style_name, np_verts - shift, obj_faces[idx], colour, alpha)
+                    # the obj does not know the IFC class of its objects, it is needed by the decimation rules
+                    container.class_mapping.add_entity(style_name, element_name, container.path.name, source_element.is_a())
+                continue
+
+            # instances of a representation map keep referencing the (triangulated) map, which is created in the
+            # containers, the styles go to the mapped item
+            instance = instancing.instance(guid) if keep_instancing and parts == [{}] else None
+
+            # Now add elements to the correct file
+            for containerCount in write_targets:
+                container = file_containers[containerCount]
+                new_element, item = add_element(container.ifc_file, source_element, attributes, np_verts, obj_faces[idx], instance)
+                styled_item = container.add_styled_item(item, styles, style_name)
+                container.class_mapping.add_entity(style_name, element_name, container.path.name)
+                relation = container.transfer_property_set(source_element, new_element)
+                if container.writer is not None:
+                    container.flush([new_element, styled_item, relation])
+            if unassigned:
+                new_element, item = add_element(not_in_any_alignment_container.ifc_file, source_element, attributes,
+                                                np_verts, obj_faces[idx], instance)
+                styled_item = not_in_any_alignment_container.add_styled_item(item, styles, style_name)
+                if not_in_any_alignment_container.writer is not None:
+                    not_in_any_alignment_container.flush([new_element, styled_item])
+        if manifest is not None:
+            manifest.record(guid, hashes[guid], element_containers, element_outputs)
+        if stream:
+            # the source representation of the processed element is not needed anymore
+            drop_representation(ifc_file, source_element)
+
+    if manifest is not None:
+        # elements without a triangulation (the geometry iterator failed on them) are not tried again before they change
+        for guid in set(hashes) - set(manifest.elements):
+            manifest.record(guid, hashes[guid], [], [])
+    if cache is not None:
+        logger.info(f"Tessellation cache: {cache.hits} elements reused, {cache.misses} triangulated")
+    if instancing.instances:
+        logger.info(f"Instancing: {len(instancing.instances)} elements placed from {len(instancing.meshes)} representation maps")
+    if pipeline is not None:
+        logger.info(pipeline.summary())
+    if corridor is not None:
+        logger.info(f"{clipped} elements outside of the {corridor_width} m corridor were dropped")
+
+    # monitor if something is out of scope
+    if len(not_in_any_alignment_container.ifc_file.by_type("IfcBuildingElement")) > 0:
+        file_containers.append(not_in_any_alignment_container)
+        logger.warn("Some shapes were not assigned to any alignment")
+    else:
+        if not_in_any_alignment_container.writer is not None:
+            not_in_any_alignment_container.writer.discard()
+        if affected is not None and not_in_any_alignment_container.name in affected:
+            # all elements of a previous run are assigned now
+            not_in_any_alignment_container.path.with_suffix(".ifc").unlink(missing_ok=True)
+
+    # finalize and save containers
+    if obj_writers is not None:
+        for writer in obj_writers:
+            if writer is not None:
+                writer.close()
+    mappings = []
+    for container in file_containers:
+        mapping_path = container.path.parent / (container.path.stem + "_guid_mapping.json")
+        if affected is not None and container.name not in affected:
+            # unchanged container of a previous run
+            mappings.append(OCMapping.read(mapping_path))
+            continue
+        logger.info(f"Writing output of {container.name}")
+        if container.writer is not None:
+            container.close()
+        elif obj_writers is None or container is not_in_any_alignment_container:
+            container.link_products_to_site()
+            container.ifc_file.write(str(container.path.with_suffix(".ifc")))
+        container.class_mapping.save(mapping_path)
+        mappings.append(container.class_mapping)
+
+    # outputs of the previous run, which do not exist anymore or belong to changed elements (new indices)
+    stale = []
+    if manifest is not None:
+        outputs = {output for record in manifest.elements.values() for output in record["outputs"]}
+        stale = sorted(manifest.outputs(changed | removed) | (manifest.outputs(rebuilt) - outputs))
+        manifest.save()
+    return mappings, stale
+
+
+def read_alignments(ifc_file_path, logger):
+    """
+    Parses the alignments of an ifc file.
+    :return: dict of alignment name -> Alignment, in the order of the file
+    """
+    ifc_file = None
+    if FAST_ALIGNMENT_SCAN:
+        try:
+            ifc_file = open_alignment_subgraph(ifc_file_path)
+        except (ValueError, KeyError, RuntimeError) as e:
+            logger.warn(f"Fast alignment scan failed for {ifc_file_path.name} ({e}), opening the complete file.")
+        if ifc_file is not None and not ifc_file.by_type("IfcAlignment"):
+            logger.warn(f"Fast alignment scan found no alignment in {ifc_file_path.name}, opening the complete file.")
+            ifc_file = None
+    if ifc_file is None:
+        ifc_file = ifcopenshell.open(ifc_file_path)
+    logger.info(f"Processing IFC-Files: {ifc_file_path.name}")
+    ifc_alignments = ifc_file.by_type('IfcAlignment')
+    collection = []
+    for align in ifc_alignments:
+        _alignment = Alignment()
+        if not _alignment.parse(align.Axis): continue
+        collection.append(_alignment)
+    logger.trace(f"Alignments collected. Found: {len(collection)}")
+    clean_collection = {}
+    for a in collection:
+        if a.name not in clean_collection and a.name is not None:
+            clean_collection[a.name] = a
+    logger.trace(f"Alignments cleaned! LeftOvers: {clean_collection}")
+    return clean_collection
+
+
+def stored_alignments(ifc_file_path, output):
+    """
+    Alignments of a previous extraction (binary store), if they are newer than the ifc file.
+    :return: list of Alignment in the original order or None
+    """
+    folder_path = output / f"{ifc_file_path.stem}"
+    metadata_path = folder_path / f"{ifc_file_path.stem}_metadata.json"
+    if not metadata_path.exists():
+        return None
+    with open(metadata_path, "r") as f:
+        names = json.load(f).get("alignments")
+    if names is None:
+        return None
+    paths = [Alignment.binary_path(folder_path, name) for name in names]
+    if not all(p.exists() and p.stat().st_mtime >= ifc_file_path.stat().st_mtime for p in paths):
+        return None
+    return [Alignment.from_binary(p) for p in paths]
+
+
+def extract_alignment_file(ifc_file_path, output, resolution, max_chord_error=None, max_step=50, alignment_csv=True,
+                           reuse_alignments=False, alignment_index_error=None, logger=None):
+    """
+    Extracts, samples and stores all alignments of one ifc file. Module level, so it can run in a worker process.
+    :param reuse_alignments: resample the stored analytic alignments of a previous run instead of reading the ifc
+    :param alignment_index_error: maximal chord error of the station index (AlignmentIndex) of every alignment, no index
+                                  is built if None
+    :return: type mappings (horizontal_mapping, vertical_mapping) of this file
+    """
+    logger = logger if logger is not None else _worker_logger()
+    discrete_alignments_paths = []
+    stored = stored_alignments(ifc_file_path, output) if reuse_alignments else None
+    if stored is not None:
+        logger.info(f"Reusing stored alignments of {ifc_file_path.name}")
+        clean_collection = {a.name: a for a in stored}
+    else:
+        clean_collection = read_alignments(ifc_file_path, logger)
+
+    data = {
+        "horizontal_mapping": {},
+        "vertical_mapping": {},
+        "alignments": list(clean_collection)
+    }
+    collector = []
+    folder_path = _outpath = output / f"{ifc_file_path.stem}"
+    for a in clean_collection.values():
+        a.horizontal_mapping = data["horizontal_mapping"]
+        a.vertical_mapping = data["vertical_mapping"]
+        _outpath = folder_path / ("#{}_{:3.2f}".format(a.name, resolution)).replace(".", "m")
+        _outpath.parent.mkdir(parents=True, exist_ok=True)
+
+        logger.trace(f"Sampling: {a.name}")
+        if max_chord_error:
+            points = a.sample_adaptive(max_error=max_chord_error, min_step=resolution,
+                                       max_step=max_step)
+        else:
+            points = a.sample(resolution)
+        _outpath = _outpath.with_suffix(SAMPLE_SUFFIX)
+        Alignment.to_arrow(points, _outpath)
+        if alignment_csv:
+            points.to_csv(_outpath.with_suffix(".csv"), index=False)
+        discrete_alignments_paths.append(_outpath)
+        collector.append(points)
+
+        # ensure consecutive type naming
+        data["horizontal_mapping"] = a.horizontal_mapping
+        data["vertical_mapping"] = a.vertical_mapping
+        a.to_json(_outpath.with_suffix(".json"))
+        a.to_binary(Alignment.binary_path(folder_path, a.name))
+        if alignment_index_error:
+            AlignmentIndex.from_alignment(a, max_error=alignment_index_error).save(
+                AlignmentIndex.index_path(_outpath.with_suffix(".json")))
+
+    with open(folder_path / f"{ifc_file_path.stem}_metadata.json", "w") as f:
+        json.dump(data, f, ensure_ascii=False, indent=4)
+
+    if collector:
+        pointer_hseg = 0
+        pointer_vseg = 0
+
+        for df in collector:
+            df["segment_horizontal"] += pointer_hseg
+            df["segment_vertical"] += pointer_vseg
+            pointer_hseg = df["segment_horizontal"].max()
+            pointer_vseg = df["segment_vertical"].max()
+
+        combined = pandas.concat(collector, ignore_index=True)
+        combined_path = folder_path / f"combined_{ifc_file_path.stem}{COMBINED_SAMPLE_SUFFIX}"
+        Alignment.to_arrow(combined, combined_path)
+        if alignment_csv:
+            combined.to_csv(combined_path.with_suffix(".ccsv"), index=False)
+
+    return data
+
 
 def docker_run_blender(input_path, voxel_size):  # , outpath=False):
     """
@@ -29,6 +29,7 @@ from .common.shared.algorithms.track_divider import track_divider
 from .common.shared.common.io.io_options import IOOptions
 from .common.shared.common.io.read_router import read_ply
 from .modelling.oc_mapping import OCMapping
+from .modelling.alignment_shapes.alignment import Alignment, SAMPLE_SUFFIX
 from collections import OrderedDict
 
 logger = RailTwinLogger.create()
@@ -193,7 +194,7 @@ class PrepareLabels:
             for af in alignment_folder:
                 alignment_path = [p for p in af.glob("*_local.csv")]
                 if not alignment_path:
-                    alignment_path = [p for p in af.glob("*.csv")]
+                    alignment_path = Alignment.sample_paths(af)
 
                 ipaths = [i for i in af.glob("./labels/batches/*.*") if i.suffix in registered_reader]
                 if alignment_path:
@@ -524,7 +525,10 @@ class PrepareLabels:
         if mode != 0:
             refined_alignment = None
             if mode & 2:
-                alignment = pandas.read_csv(alignment_path)
+                if alignment_path.suffix == SAMPLE_SUFFIX:
+                    alignment = Alignment.from_arrow(alignment_path)
+                else:
+                    alignment = pandas.read_csv(alignment_path)
                 refined_alignment = refine_alignment(alignment, 100)  # resample 100 points per
 
             io_options = IOOptions.do_nothing()
@@ -0,0 +1,45 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+import numpy as np
+
+from python.modelling.alignment_shapes.alignment import Alignment
+from python.modelling.alignment_shapes.CircularArcSegment import CircularArc
+from python.modelling.alignment_shapes.HorizontalLineSegment import HorizontalLineSegment
+from python.modelling.alignment_shapes.TransitionCurveSegment import TransitionCurveSegment
+from python.modelling.alignment_shapes.VerticalCircularArcSegment import VerticalCircularArcSegment
+from python.modelling.alignment_shapes.VerticalLineSegment import VerticalLineSegment
+from python.modelling.alignment_shapes.VerticalParabolicArcSegment import VerticalParabolicArcSegment
+
+
+def vertical(segment_type, start, length, height, gradient, **attributes):
+    segment = segment_type()
+    segment.start_distance_horizontal = start
+    segment.horizontal_length = length
+    segment.start_height = height
+    segment.start_gradient = gradient
+    for name, value in attributes.items():
+        setattr(segment, name, value)
+    return segment
+
+
+def build_alignment(name="T"):
+    """
+    Alignment of every segment type in world coordinates, 300 m: line, clothoid, arc (R 400) and line; line, parabolic
+    arc, circular arc and line in the profile
+    """
+    alignment = Alignment()
+    alignment.name = name
+    line = HorizontalLineSegment(100.0, 0.3, np.array([4521330.5, 5332110.25]))
+    clothoid = TransitionCurveSegment(60.0, 0.3, line.evaluate(100.0)[0][:, 0], 0, False, 400.0, True, "CLOTHOIDCURVE")
+    arc = CircularArc(400.0, True, 60.0, 0.3 + 60.0 / 800.0, clothoid.evaluate(60.0)[0][:, 0])
+    alignment.horizontal = [line, clothoid, arc, HorizontalLineSegment(80.0, 0.3 + 60.0 / 800.0 + 60.0 / 400.0,
+                                                                       arc.evaluate(60.0)[0][:, 0])]
+    alignment.vertical = [vertical(VerticalLineSegment, 0.0, 100.0, 500.0, 0.01),
+                          vertical(VerticalParabolicArcSegment, 100.0, 60.0, 501.0, 0.01, parabola_constant=4000.0, is_convex=True),
+                          vertical(VerticalCircularArcSegment, 160.0, 60.0, 501.15, -0.005, radius=6000.0, is_convex=False),
+                          vertical(VerticalLineSegment, 220.0, 80.0, 501.15, 0.005)]
+    alignment.vertical_search = [segment.start_distance_horizontal for segment in alignment.vertical]
+    return alignment
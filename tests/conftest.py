@@ -0,0 +1,13 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+import pytest
+
+from tests.ifc_models import build_model
+
+
+@pytest.fixture
+def model():
+    return build_model()
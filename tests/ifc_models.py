@@ -0,0 +1,71 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+import ifcopenshell
+import ifcopenshell.guid
+
+
+def placement(ifc_file, xyz, relative_to=None):
+    return ifc_file.create_entity("IfcLocalPlacement", PlacementRelTo=relative_to, RelativePlacement=ifc_file.create_entity(
+        "IfcAxis2Placement3D", Location=ifc_file.create_entity("IfcCartesianPoint", Coordinates=[float(v) for v in xyz])))
+
+
+def tetrahedron(ifc_file, context, size=1.0, style=None):
+    """Body representation of a tetrahedron at the origin"""
+    points = ifc_file.create_entity("IfcCartesianPointList3D", [(0.0, 0.0, 0.0), (size, 0.0, 0.0), (0.0, size, 0.0),
+                                                                 (0.0, 0.0, size)])
+    face_set = ifc_file.create_entity("IfcTriangulatedFaceSet", Coordinates=points, Closed=True,
+                                      CoordIndex=[(1, 3, 2), (1, 2, 4), (2, 3, 4), (3, 1, 4)])
+    if style is not None:
+        ifc_file.create_entity("IfcStyledItem", Item=face_set, Styles=[style])
+    return ifc_file.create_entity("IfcShapeRepresentation", ContextOfItems=context, RepresentationIdentifier="Body",
+                                  RepresentationType="Tessellation", Items=[face_set])
+
+
+def build_model(count=3, spacing=10.0, schema="IFC4"):
+    """
+    Model in m: project (with owner history), site and building with count styled tetrahedra along x
+    (IfcBuildingElementProxy "E<i>" with the property set "Pset_Test" of its "Index")
+    """
+    ifc_file = ifcopenshell.file(schema=schema)
+    context = ifc_file.create_entity("IfcGeometricRepresentationContext", ContextType="Model", CoordinateSpaceDimension=3,
+                                     Precision=1e-5, WorldCoordinateSystem=ifc_file.create_entity(
+                                         "IfcAxis2Placement3D", Location=ifc_file.create_entity("IfcCartesianPoint",
+                                                                                               Coordinates=[0.0, 0.0, 0.0])))
+    units = ifc_file.create_entity("IfcUnitAssignment", Units=[
+        ifc_file.create_entity("IfcSIUnit", UnitType="LENGTHUNIT", Name="METRE")])
+    organization = ifc_file.create_entity("IfcOrganization", Name="Tests")
+    owner_history = ifc_file.create_entity(
+        "IfcOwnerHistory", OwningUser=ifc_file.create_entity("IfcPersonAndOrganization", ThePerson=ifc_file.create_entity(
+            "IfcPerson", FamilyName="Tests"), TheOrganization=organization),
+        OwningApplication=ifc_file.create_entity("IfcApplication", ApplicationDeveloper=organization, Version="1",
+                                                 ApplicationFullName="tests", ApplicationIdentifier="tests"),
+        ChangeAction="ADDED", CreationDate=0)
+    project = ifc_file.create_entity("IfcProject", GlobalId=ifcopenshell.guid.new(), OwnerHistory=owner_history, Name="Project",
+                                     RepresentationContexts=[context], UnitsInContext=units)
+    site = ifc_file.create_entity("IfcSite", GlobalId=ifcopenshell.guid.new(), Name="Site",
+                                  ObjectPlacement=placement(ifc_file, (0, 0, 0)))
+    building = ifc_file.create_entity("IfcBuilding", GlobalId=ifcopenshell.guid.new(), Name="Building",
+                                      ObjectPlacement=placement(ifc_file, (0, 0, 0), site.ObjectPlacement))
+    ifc_file.create_entity("IfcRelAggregates", GlobalId=ifcopenshell.guid.new(), RelatingObject=project, RelatedObjects=[site])
+    ifc_file.create_entity("IfcRelAggregates", GlobalId=ifcopenshell.guid.new(), RelatingObject=site, RelatedObjects=[building])
+    style = ifc_file.create_entity("IfcSurfaceStyle", Name="red", Side="BOTH", Styles=[
+        ifc_file.create_entity("IfcSurfaceStyleShading", SurfaceColour=ifc_file.create_entity(
+            "IfcColourRgb", Red=1.0, Green=0.0, Blue=0.0))])
+    products = []
+    for i in range(count):
+        products.append(ifc_file.create_entity(
+            "IfcBuildingElementProxy", GlobalId=ifcopenshell.guid.new(), Name=f"E{i}",
+            ObjectPlacement=placement(ifc_file, (spacing * i, 0, 0), building.ObjectPlacement),
+            Representation=ifc_file.create_entity("IfcProductDefinitionShape",
+                                                  Representations=[tetrahedron(ifc_file, context, style=style)])))
+        ifc_file.create_entity("IfcRelDefinesByProperties", GlobalId=ifcopenshell.guid.new(), RelatedObjects=[products[-1]],
+                               RelatingPropertyDefinition=ifc_file.create_entity(
+                                   "IfcPropertySet", GlobalId=ifcopenshell.guid.new(), Name="Pset_Test", HasProperties=[
+                                       ifc_file.create_entity("IfcPropertySingleValue", Name="Index",
+                                                              NominalValue=ifc_file.create_entity("IfcInteger", i))]))
+    ifc_file.create_entity("IfcRelContainedInSpatialStructure", GlobalId=ifcopenshell.guid.new(),
+                           RelatedElements=products, RelatingStructure=building)
+    return ifc_file
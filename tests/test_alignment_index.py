@@ -0,0 +1,72 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+import numpy as np
+import pytest
+
+from python.modelling.alignment_shapes.alignment import Alignment
+from python.modelling.alignment_shapes.alignment_index import AlignmentIndex
+from python.modelling.alignment_shapes.HorizontalLineSegment import HorizontalLineSegment
+from python.modelling.alignment_shapes.TransitionCurveSegment import TransitionCurveSegment
+from python.modelling.alignment_shapes.VerticalLineSegment import VerticalLineSegment
+
+
+def vertical_line(start, length, height, gradient):
+    segment = VerticalLineSegment()
+    segment.start_distance_horizontal = start
+    segment.horizontal_length = length
+    segment.start_height = height
+    segment.start_gradient = gradient
+    return segment
+
+
+@pytest.fixture
+def alignment():
+    """line, clothoid (R 400) and line with two gradients, 240 m"""
+    alignment = Alignment()
+    alignment.name = "T"
+    line = HorizontalLineSegment(100.0, 0.3, np.array([4521330.5, 5332110.25]))
+    clothoid = TransitionCurveSegment(60.0, 0.3, line.evaluate(100.0)[0][:, 0], 0, False, 400.0, True, "CLOTHOIDCURVE")
+    alignment.horizontal = [line, clothoid, HorizontalLineSegment(80.0, 0.3 + 60.0 / 800.0, clothoid.evaluate(60.0)[0][:, 0])]
+    alignment.vertical = [vertical_line(0.0, 120.0, 500.0, 0.01), vertical_line(120.0, 120.0, 501.2, -0.005)]
+    alignment.vertical_search = [segment.start_distance_horizontal for segment in alignment.vertical]
+    return alignment
+
+
+def test_pose_equals_sampling(alignment):
+    index = AlignmentIndex.from_alignment(alignment)
+    samples = alignment.sample(0.5)
+    pose = index.pose(samples["horizontal_distance"].to_numpy())
+    assert np.hypot(pose["x"] - samples["x"], pose["y"] - samples["y"]).max() < 1e-6
+    assert np.abs(pose["z"] - samples["z"]).max() < 1e-6
+
+
+@pytest.mark.parametrize("max_error", [0.01, 0.001])
+def test_project_recovers_station_offset_height(alignment, max_error):
+    index = AlignmentIndex.from_alignment(alignment, max_error=max_error)
+    rng = np.random.default_rng(0)
+    stations = rng.uniform(0, index.length, 2000)
+    offsets, heights = rng.uniform(-20, 20, len(stations)), rng.uniform(-2, 5, len(stations))
+    pose = index.pose(stations)
+    heading = pose["heading"].to_numpy()
+    points = np.column_stack((pose["x"] - offsets * np.sin(heading), pose["y"] + offsets * np.cos(heading), pose["z"] + heights))
+
+    result = index.project(points)
+    assert np.abs(result["station"] - stations).max() < 1e-6
+    assert np.abs(result["offset"] - offsets).max() < 1e-6
+    assert np.abs(result["height"] - heights).max() < 1e-6
+
+
+def test_saved_index_answers_on_the_polyline(alignment, tmp_path):
+    index = AlignmentIndex.from_alignment(alignment, max_error=0.001)
+    path = AlignmentIndex.index_path(tmp_path / "#T_1m00.json")
+    index.save(path)
+    loaded = AlignmentIndex.load(path)
+    assert path.name == "#T_1m00.index.npz" and loaded.name == "T"
+
+    stations = np.linspace(0, index.length, 997)
+    exact, polyline = index.pose(stations), loaded.pose(stations)
+    assert np.hypot(exact["x"] - polyline["x"], exact["y"] - polyline["y"]).max() < 0.001
+    assert np.abs(loaded.project(exact[["x", "y", "z"]].to_numpy())["station"] - stations).max() < 0.01
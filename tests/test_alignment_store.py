@@ -0,0 +1,51 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+import pandas.testing
+
+from python.modelling.alignment_shapes.alignment import Alignment
+from tests.alignments import build_alignment
+
+
+def assert_same_alignment(restored, alignment):
+    assert restored.name == alignment.name
+    assert [type(s) for s in restored.horizontal] == [type(s) for s in alignment.horizontal]
+    assert [type(s) for s in restored.vertical] == [type(s) for s in alignment.vertical]
+    assert restored.horizontal_mapping == alignment.horizontal_mapping
+    assert restored.vertical_mapping == alignment.vertical_mapping
+    pandas.testing.assert_frame_equal(restored.sample(0.5), alignment.sample(0.5))
+    pandas.testing.assert_frame_equal(restored.sample_adaptive(0.001, 0.1, 10.0), alignment.sample_adaptive(0.001, 0.1, 10.0))
+
+
+def test_json_round_trip(tmp_path):
+    alignment = build_alignment()
+    alignment.sample(1.0)
+    alignment.to_json(tmp_path / "#T_1m00.json")
+    assert_same_alignment(Alignment.from_json(tmp_path / "#T_1m00.json"), alignment)
+
+
+def test_binary_round_trip(tmp_path):
+    alignment = build_alignment("T.1")
+    alignment.sample(1.0)
+    path = Alignment.binary_path(tmp_path, alignment.name)
+    assert path.name == "#Tm1.alignment.npz"
+    alignment.to_binary(path)
+    assert_same_alignment(Alignment.from_binary(path), alignment)
+
+
+def test_arrow_and_csv_round_trip(tmp_path):
+    samples = build_alignment().sample(1.0)
+    Alignment.to_arrow(samples, tmp_path / "#T_1m00.arrow")
+    samples.to_csv(tmp_path / "#T_1m00.csv", index=False)
+
+    restored = Alignment.read_samples(tmp_path / "#T_1m00.arrow")
+    pandas.testing.assert_frame_equal(restored, samples.astype(restored.dtypes.to_dict()))
+    assert restored["segment_horizontal"].dtype == "int32"
+    pandas.testing.assert_frame_equal(Alignment.read_samples(tmp_path / "#T_1m00.arrow", ["x", "y"]), restored[["x", "y"]])
+    csv = Alignment.read_samples(tmp_path / "#T_1m00.csv")
+    pandas.testing.assert_frame_equal(csv[["x", "y", "z", "horizontal_distance"]], restored[["x", "y", "z", "horizontal_distance"]],
+                                      check_exact=False, rtol=0, atol=1e-9)
+    # the binary store is preferred over the csv export
+    assert Alignment.sample_paths(tmp_path) == [tmp_path / "#T_1m00.arrow"]
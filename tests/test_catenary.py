@@ -0,0 +1,69 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+import numpy as np
+
+from python.modelling.catenary import split_catenaries
+
+
+def legacy(np_verts, faces):
+    """former implementation of extract_areas"""
+    vertices = np_verts - np_verts.mean(axis=0)
+    U, s, V = np.linalg.svd(vertices, full_matrices=False)
+    v_diff = np.array([1, 1, 1]).dot(V.T)
+    transformed_vertices = np.dot(vertices, np.sign(v_diff) * V.T)
+    v2_heights = transformed_vertices[faces, 1]
+    tags = np.zeros_like(v2_heights)
+    tags[v2_heights < v2_heights.min() + 0.044] = -1
+    tags[v2_heights > v2_heights.max() - 0.044] = 1
+    face_bins = [[], [], []]
+    for i, face in enumerate(tags.sum(axis=1)):
+        face_bins[0 if face == -3 else 2 if face == 3 else 1].append(i)
+    result = []
+    for bin_idx, _bin in enumerate(face_bins):
+        bin_faces = faces[np.array(_bin)]
+        original_index = np.unique(bin_faces)
+        result.append((bin_idx, np_verts[original_index], np.searchsorted(original_index, bin_faces)))
+    return result
+
+
+def wire(z, length=60.0, radius=0.006, n=40):
+    """square tube along the track direction"""
+    s = np.linspace(0, length, n)
+    ring = np.array([[0, -radius, -radius], [0, radius, -radius], [0, radius, radius], [0, -radius, radius]])
+    points = np.concatenate([ring + [si, 0, z] for si in s])
+    faces = []
+    for i in range(n - 1):
+        for k in range(4):
+            a, b, c, d = 4 * i + k, 4 * i + (k + 1) % 4, 4 * (i + 1) + (k + 1) % 4, 4 * (i + 1) + k
+            faces += [(a, b, c), (a, c, d)]
+    return points, np.array(faces)
+
+
+def catenary(offset, heading):
+    """contact wire, messenger wire and droppers in world coordinates"""
+    meshes = [wire(5.3), wire(6.5 + 0.1 * offset)]
+    for x in np.linspace(5, 55, 6):
+        p, f = wire(0, length=1.2 + 0.05 * offset, n=2)
+        meshes.append((p[:, [1, 2, 0]] + [x, 0, 5.3], f))
+    points, faces, count = [], [], 0
+    for p, f in meshes:
+        points.append(p)
+        faces.append(f + count)
+        count += len(p)
+    points = np.concatenate(points)
+    rotation = np.array([[np.cos(heading), -np.sin(heading), 0], [np.sin(heading), np.cos(heading), 0], [0, 0, 1]])
+    return points @ rotation.T + [4.4e5 + offset, 5.4e6, 500], np.concatenate(faces)
+
+
+def test_split_catenaries_matches_legacy():
+    batch = [catenary(i, 0.4 * i) for i in range(5)]
+    for (v, f), parts in zip(batch, split_catenaries(batch)):
+        expected = legacy(v, f)
+        assert len(parts) == len(expected) == 3
+        for (part, pv, pf), (epart, ev, ef) in zip(parts, expected):
+            assert part == epart
+            assert np.array_equal(pv, ev)
+            assert np.array_equal(pf, ef)
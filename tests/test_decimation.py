@@ -0,0 +1,83 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from python.modelling.decimation import BASE_CELL, DEFAULT_RULE, DecimationConfig, alignment_tree, decimate_container, \
+    decimate_mesh, error_bound
+from python.modelling.obj_writer import ObjWriter, read_obj
+
+
+def surface(x0, size=0.5, n=101):
+    """wavy grid mesh of size x size m starting at x0"""
+    x, y = np.meshgrid(np.linspace(x0, x0 + size, n), np.linspace(0.0, size, n), indexing="ij")
+    vertices = np.column_stack((x.ravel(), y.ravel(), (0.05 * np.sin(20 * x) * np.cos(20 * y)).ravel()))
+    index = np.arange(n * n).reshape(n, n)
+    a, b, c, d = index[:-1, :-1].ravel(), index[1:, :-1].ravel(), index[1:, 1:].ravel(), index[:-1, 1:].ravel()
+    return vertices, np.concatenate((np.column_stack((a, b, c)), np.column_stack((a, c, d))))
+
+
+def track():
+    """alignment along the y axis"""
+    return alignment_tree([np.column_stack((np.zeros(11), np.linspace(-100, 100, 11), np.zeros(11)))])
+
+
+def test_error_bound():
+    rule = {**DEFAULT_RULE, "min_error": 0.001, "error_per_m": 0.001, "max_error": 0.02}
+    assert np.allclose(error_bound(rule, np.array([0.0, 9.0, 100.0])), [0.001, 0.01, 0.02])
+    assert not error_bound({**rule, "keep": True}, np.array([0.0, 100.0])).any()
+
+
+def test_decimation_respects_the_error_bound():
+    vertices, faces = surface(100.0)
+    rule = {**DEFAULT_RULE, "error_per_m": 0.0005, "max_error": 0.05}
+    new_vertices, new_faces = decimate_mesh(vertices, faces, track(), rule)
+    assert len(new_faces) < len(faces) / 4
+
+    # every vertex of the result is the mean of a cluster within the bound of its vertices
+    distances, nearest = cKDTree(vertices).query(new_vertices)
+    bound = error_bound(rule, track().query(vertices)[0])
+    assert np.all(distances <= bound[nearest] + 1e-9)
+    # and no part of the surface is lost
+    assert np.all(cKDTree(new_vertices).query(vertices)[0] <= 2 * rule["max_error"])
+
+
+def test_vertices_below_the_base_cell_stay():
+    vertices, faces = surface(0.0, size=0.1, n=11)
+    rule = {**DEFAULT_RULE, "error_per_m": BASE_CELL / 10, "max_error": BASE_CELL}
+    new_vertices, new_faces = decimate_mesh(vertices, faces, track(), rule)
+    assert np.array_equal(new_vertices[new_faces], vertices[faces])
+
+
+def test_config_rules():
+    config = DecimationConfig([{"class": "IfcRail*", "keep": True}, {"name": "*Gelaender*", "max_error": 0.1}],
+                              default={"max_error": 0.02})
+    assert config.rule("IfcRail", "Schiene")["keep"]
+    assert config.rule("IfcRailing", "Gelaender 3")["keep"]
+    assert config.rule("IfcWall", "Gelaender 3")["max_error"] == 0.1
+    # the class of an obj may be unknown, only rules without class match
+    assert config.rule(None, "Gelaender 3")["max_error"] == 0.1
+    assert config.rule(None, "Schiene") == {**DEFAULT_RULE, "max_error": 0.02}
+
+
+def test_container_is_decimated_once(tmp_path):
+    vertices, faces = surface(100.0)
+    path = tmp_path / "#A_1m00.obj"
+    with ObjWriter(path) as writer:
+        writer.add("0c2bd4e1", vertices, faces)
+        writer.add("1f6a0b7c", vertices + [0.0, 10.0, 0.0], faces)
+    # the objects are named after the GlobalId, the rules match the element names of the class mapping
+    names = {"0c2bd4e1": "Mast 1", "1f6a0b7c": "Schiene 1"}
+    config = DecimationConfig([{"name": "Schiene*", "keep": True}])
+
+    before, after = decimate_container(path, track(), config, names)
+    assert before == 2 * len(faces) and len(faces) < after < before
+    (_, _, element_faces), (_, rail_vertices, rail_faces) = read_obj(path)
+    assert len(element_faces) < len(faces)
+    assert np.allclose(rail_vertices[rail_faces], vertices[faces] + [0.0, 10.0, 0.0], atol=1e-6)
+    # decimating twice would add up the errors
+    assert decimate_container(path, track(), config, names) is None
+    assert decimate_container(path, track(), DecimationConfig(), names) is not None
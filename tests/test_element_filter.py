@@ -0,0 +1,58 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+import json
+
+import ifcopenshell.geom
+
+from python.modelling.element_filter import ElementFilter
+from python.modelling.tessellation_cache import tessellate
+
+
+def names(products):
+    return sorted(product.Name for product in products)
+
+
+def test_empty_filter_keeps_everything(model):
+    selection = ElementFilter.read(None)
+    assert not selection
+    kept, filtered = selection.split(model.by_type("IfcProduct"))
+    assert len(kept) == len(model.by_type("IfcProduct")) and not filtered
+
+
+def test_include_and_exclude(model):
+    selection = ElementFilter(include=[{"class": "IfcBuildingElement"}], exclude=[{"name": "E2"}])
+    kept, filtered = selection.split(model.by_type("IfcProduct"))
+    # subtypes of the class match, IfcSite and IfcBuilding are spatial elements
+    assert names(kept) == ["E0", "E1"]
+    assert names(filtered) == ["Building", "E2", "Site"]
+
+
+def test_property_rules(model):
+    selection = ElementFilter(exclude=[{"properties": {"Pset_Test.Index": 1}}, {"properties": {"Pset_Missing.Value": "*"}}])
+    assert names(selection.split(model.by_type("IfcBuildingElementProxy"))[0]) == ["E0", "E2"]
+
+    model.by_type("IfcBuildingElementProxy")[0].Name = "Weiche 12"
+    patterns = ElementFilter(include=[{"name": "Weiche*"},
+                                      {"class": "IfcBuildingElementProxy", "properties": {"Pset_Test.Index": 2}}])
+    assert names(patterns.split(model.by_type("IfcProduct"))[0]) == ["E2", "Weiche 12"]
+
+
+def test_read_and_key(tmp_path):
+    path = tmp_path / "filter.json"
+    with open(path, "w") as f:
+        json.dump({"exclude": [{"class": "IfcSpace"}]}, f)
+    selection = ElementFilter.read(path)
+    assert selection.include == [] and selection.exclude == [{"class": "IfcSpace"}]
+    assert selection.key != ElementFilter().key
+    assert selection.key == ElementFilter(exclude=[{"class": "IfcSpace"}]).key
+
+
+def test_filtered_elements_are_not_triangulated(model):
+    settings = ifcopenshell.geom.settings()
+    settings.set(settings.USE_WORLD_COORDS, True)
+    selection = ElementFilter(exclude=[{"name": "E1"}])
+    guids = {guid for guid, _, _ in tessellate(model, settings, element_filter=selection)}
+    assert guids == {product.GlobalId for product in model.by_type("IfcBuildingElementProxy") if product.Name != "E1"}
@@ -0,0 +1,112 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+import ifcopenshell
+import ifcopenshell.geom
+import ifcopenshell.guid
+import numpy as np
+import pytest
+
+from python.modelling.instancing import InstancedTessellation, transformation_entity, transformation_operator
+from tests.ifc_models import build_model, placement, tetrahedron
+
+
+def direction(ifc_file, xyz):
+    return ifc_file.create_entity("IfcDirection", DirectionRatios=[float(v) for v in xyz])
+
+
+@pytest.fixture
+def mapped_model():
+    """
+    build_model with products of one representation map (with a mapping origin): plain, rotated and scaled,
+    non-uniformly scaled and two mapped items, one with a z axis along y (degenerated default y axis)
+    """
+    ifc_file = build_model(1)
+    context = ifc_file.by_type("IfcGeometricRepresentationContext")[0]
+    origin = ifc_file.create_entity("IfcAxis2Placement3D",
+                                    Location=ifc_file.create_entity("IfcCartesianPoint", Coordinates=[0.5, 0.0, 0.0]),
+                                    Axis=direction(ifc_file, (0, 0, 1)), RefDirection=direction(ifc_file, (0, 1, 0)))
+    representation_map = ifc_file.create_entity("IfcRepresentationMap", MappingOrigin=origin,
+                                                MappedRepresentation=tetrahedron(ifc_file, context))
+
+    def item(x, **attributes):
+        target = ifc_file.create_entity("IfcCartesianTransformationOperator3D" if "Scale2" not in attributes else
+                                        "IfcCartesianTransformationOperator3DnonUniform",
+                                        LocalOrigin=ifc_file.create_entity("IfcCartesianPoint", Coordinates=[x, 1.0, 0.0]),
+                                        **attributes)
+        return ifc_file.create_entity("IfcMappedItem", MappingSource=representation_map, MappingTarget=target)
+
+    targets = [[item(0.0)], [item(0.0, Axis1=direction(ifc_file, (np.cos(1), np.sin(1), 0)), Scale=2.0)],
+               [item(0.0, Scale=1.0, Scale2=2.0, Scale3=0.5)], [item(0.0), item(3.0, Axis3=direction(ifc_file, (0, 1, 0)))]]
+    for i, items in enumerate(targets):
+        ifc_file.create_entity("IfcBuildingElementProxy", GlobalId=ifcopenshell.guid.new(), Name=f"M{i}",
+                               ObjectPlacement=placement(ifc_file, (10.0 * i, 5.0, 1.0)),
+                               Representation=ifc_file.create_entity("IfcProductDefinitionShape", Representations=[
+                                   ifc_file.create_entity("IfcShapeRepresentation", ContextOfItems=context,
+                                                          RepresentationIdentifier="Body",
+                                                          RepresentationType="MappedRepresentation", Items=items)]))
+    return ifc_file
+
+
+def triangles(vertices, faces):
+    """orientation independent, sorted triangles"""
+    return np.sort(np.round(vertices[faces], 6).reshape(-1, 3, 3).tolist(), axis=0)
+
+
+def test_instances_equal_the_geometry_iterator(mapped_model):
+    settings = ifcopenshell.geom.settings()
+    settings.set(settings.USE_WORLD_COORDS, True)
+    instancing = InstancedTessellation(mapped_model, settings)
+    instanced, remaining = instancing.split(mapped_model.by_type("IfcBuildingElementProxy"))
+    assert sorted(product.Name for product in instanced) == ["M0", "M1", "M2", "M3"]
+    assert [product.Name for product in remaining] == ["E0"]
+    # the representation map is triangulated once
+    assert len(instancing.meshes) == 1
+
+    for guid, vertices, faces in instancing.shapes(instanced):
+        shape = ifcopenshell.geom.create_shape(settings, mapped_model.by_guid(guid))
+        expected_vertices = np.reshape(shape.geometry.verts, (-1, 3))
+        expected_faces = np.reshape(shape.geometry.faces, (-1, 3))
+        assert len(faces) == len(expected_faces)
+        assert np.allclose(triangles(vertices, faces), triangles(expected_vertices, expected_faces), atol=1e-5)
+
+
+def test_instance_keeps_only_single_items(mapped_model):
+    settings = ifcopenshell.geom.settings()
+    instancing = InstancedTessellation(mapped_model, settings)
+    instanced, _ = instancing.split(mapped_model.by_type("IfcBuildingElementProxy"))
+    list(instancing.shapes(instanced))
+    products = {product.Name: product.GlobalId for product in instanced}
+    assert instancing.instance(products["M0"]) is not None
+    assert instancing.instance(products["M2"]) is not None
+    assert instancing.instance(products["M3"]) is None
+
+
+def test_transformation_entity_round_trip():
+    ifc_file = ifcopenshell.file(schema="IFC4")
+    rotation = np.array([[np.cos(0.3), -np.sin(0.3), 0], [np.sin(0.3), np.cos(0.3), 0], [0, 0, 1]])
+    for scales in ([1.0, 1.0, 1.0], [2.0, 2.0, 2.0], [1.0, 3.0, 0.5]):
+        matrix = np.eye(4)
+        matrix[:3, :3] = rotation * scales
+        matrix[:3, 3] = [4.0, -2.0, 1.5]
+        assert np.allclose(transformation_operator(transformation_entity(ifc_file, matrix)), matrix)
+    sheared = np.eye(4)
+    sheared[0, 1] = 0.5
+    assert transformation_entity(ifc_file, sheared) is None
+
+
+def test_representation_map_created_once_per_file(mapped_model):
+    settings = ifcopenshell.geom.settings()
+    instancing = InstancedTessellation(mapped_model, settings)
+    instanced, _ = instancing.split(mapped_model.by_type("IfcBuildingElementProxy"))
+    list(instancing.shapes(instanced))
+    target = build_model(0)
+    context = target.by_type("IfcGeometricRepresentationContext")[0]
+    source_size = len(list(mapped_model))
+    for product in instanced[:3]:
+        instancing.representation(instancing.instance(product.GlobalId), target, context)
+    assert len(target.by_type("IfcRepresentationMap")) == 1
+    assert len(target.by_type("IfcMappedItem")) == 3
+    assert len(list(mapped_model)) == source_size
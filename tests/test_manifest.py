@@ -0,0 +1,55 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+from python.modelling.manifest import ElementManifest
+
+
+def saved_manifest(model, path, settings_key="settings"):
+    manifest = ElementManifest(path, settings_key)
+    for guid, value in manifest.hashes(model).items():
+        manifest.record(guid, value, ["#A_1m00"], [guid])
+    manifest.save()
+    return ElementManifest(path, settings_key)
+
+
+def test_unchanged_model(model, tmp_path):
+    manifest = saved_manifest(model, tmp_path / "manifest.json")
+    hashes = manifest.hashes(model)
+    assert manifest.valid
+    assert len(hashes) == 3
+    assert not manifest.changed(hashes) and not manifest.removed(hashes)
+
+
+def test_changed_elements(model, tmp_path):
+    manifest = saved_manifest(model, tmp_path / "manifest.json")
+    first, second, third = model.by_type("IfcBuildingElementProxy")
+    first.Name = "renamed"
+    second.ObjectPlacement.RelativePlacement.Location.Coordinates = [12.0, 0.0, 0.0]
+    third.IsDefinedBy[0].RelatingPropertyDefinition.HasProperties[0].NominalValue.wrappedValue = 7
+    assert manifest.changed(manifest.hashes(model)) == {first.GlobalId, second.GlobalId, third.GlobalId}
+
+
+def test_changed_style(model, tmp_path):
+    manifest = saved_manifest(model, tmp_path / "manifest.json")
+    model.by_type("IfcColourRgb")[0].Green = 1.0
+    # the style is shared by all elements
+    assert len(manifest.changed(manifest.hashes(model))) == 3
+
+
+def test_removed_element(model, tmp_path):
+    manifest = saved_manifest(model, tmp_path / "manifest.json")
+    element = model.by_type("IfcBuildingElementProxy")[0]
+    guid = element.GlobalId
+    model.remove(element)
+    hashes = manifest.hashes(model)
+    assert manifest.removed(hashes) == {guid}
+    assert manifest.containers(manifest.removed(hashes)) == {"#A_1m00"}
+    assert manifest.outputs(manifest.removed(hashes)) == {guid}
+
+
+def test_changed_settings(model, tmp_path):
+    saved_manifest(model, tmp_path / "manifest.json", settings_key="resolution 1.0")
+    assert not ElementManifest(tmp_path / "manifest.json", "resolution 0.5").valid
+    assert ElementManifest(tmp_path / "manifest.json", "resolution 1.0").valid
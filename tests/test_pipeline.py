@@ -0,0 +1,83 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+import time
+
+import ifcopenshell.geom
+import numpy as np
+import pytest
+
+from python.modelling.pipeline import Pipeline
+from python.modelling.tessellation_cache import tessellate
+
+
+def test_pipeline_keeps_items_and_order():
+    pipeline = Pipeline(iter(range(100)), depth=4)
+    assert list(pipeline) == list(range(100))
+    assert pipeline.items == 100
+    assert pipeline.max_depth <= 4
+    assert "100 items" in pipeline.summary()
+
+
+def test_pipeline_measures_the_slower_side():
+    def slow_source():
+        for i in range(5):
+            time.sleep(0.02)
+            yield i
+
+    pipeline = Pipeline(slow_source(), depth=2)
+    assert list(pipeline) == list(range(5))
+    # the consumer waited for the producer
+    assert pipeline.consumer_wait > 0.05
+    assert pipeline.producer_wait < pipeline.consumer_wait
+
+    pipeline = Pipeline(iter(range(5)), depth=1)
+    for _ in pipeline:
+        time.sleep(0.02)
+    assert pipeline.producer_wait > 0.05
+
+
+def test_pipeline_propagates_errors():
+    def failing_source():
+        yield 1
+        raise KeyError("triangulation failed")
+
+    consumed = []
+    with pytest.raises(KeyError, match="triangulation failed"):
+        for item in Pipeline(failing_source(), depth=2):
+            consumed.append(item)
+    assert consumed == [1]
+
+
+def test_pipeline_stops_the_producer_of_an_early_exit():
+    closed = []
+
+    def endless_source():
+        try:
+            i = 0
+            while True:
+                yield i
+                i += 1
+        finally:
+            closed.append(True)
+
+    pipeline = Pipeline(endless_source(), depth=2)
+    items = iter(pipeline)
+    for item in items:
+        if item == 3:
+            break
+    items.close()
+    assert closed == [True]
+    assert not pipeline._thread.is_alive()
+
+
+def test_pipelined_tessellation_equals_lock_step(model):
+    settings = ifcopenshell.geom.settings()
+    settings.set(settings.USE_WORLD_COORDS, True)
+    lock_step = list(tessellate(model, settings))
+    pipelined = list(Pipeline(tessellate(model, settings), depth=1))
+    assert [guid for guid, _, _ in pipelined] == [guid for guid, _, _ in lock_step]
+    for (_, vertices, faces), (_, expected_vertices, expected_faces) in zip(pipelined, lock_step):
+        assert np.array_equal(vertices, expected_vertices) and np.array_equal(faces, expected_faces)
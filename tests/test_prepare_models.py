@@ -0,0 +1,141 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+import collections
+
+import ifcopenshell
+import ifcopenshell.geom
+import ifcopenshell.guid
+import numpy as np
+import pyarrow
+import pyarrow.feather
+import pytest
+
+import python.t1_prepare_models as t1
+from python.modelling.catenary import PART_NAMES, split_catenaries
+from python.modelling.manifest import ElementManifest
+from tests.ifc_models import build_model, placement
+from tests.test_catenary import catenary
+
+
+def setup_model(path, model):
+    """writes the model and a sampled alignment covering its elements"""
+    ifc_path = path / "m.ifc"
+    model.write(str(ifc_path))
+    (path / "m").mkdir()
+    alignment_path = path / "m" / "#A_1m00.arrow"
+    pyarrow.feather.write_feather(pyarrow.table({"x": np.linspace(-5.0, 100.0, 21), "y": np.zeros(21),
+                                                 "z": np.zeros(21)}), str(alignment_path))
+    return ifc_path, [alignment_path]
+
+
+def meshes(output):
+    """triangles (rounded, world coordinates) per element name of all container files"""
+    settings = ifcopenshell.geom.settings()
+    settings.set(settings.USE_WORLD_COORDS, True)
+    result = {}
+    for path in sorted(output.glob("*/*.ifc")):
+        ifc_file = ifcopenshell.open(str(path))
+        for product in ifc_file.by_type("IfcProduct"):
+            if product.Representation is None:
+                continue
+            shape = ifcopenshell.geom.create_shape(settings, product)
+            vertices = np.reshape(shape.geometry.verts, (-1, 3))
+            faces = np.reshape(shape.geometry.faces, (-1, 3))
+            result[(path.name, product.GlobalId, product.Name)] = sorted(map(tuple, np.round(vertices[faces], 4).reshape(-1, 9)))
+    return result
+
+
+def contents(output):
+    """entity counts and products (name, property values, style names) of all container files"""
+    result = {}
+    for path in sorted(output.glob("*/*.ifc")):
+        ifc_file = ifcopenshell.open(str(path))
+        products = {}
+        for product in ifc_file.by_type("IfcBuildingElement"):
+            properties = sorted((relation.RelatingPropertyDefinition.Name, value.Name, value.NominalValue.wrappedValue) for relation in
+                                product.IsDefinedBy for value in relation.RelatingPropertyDefinition.HasProperties)
+            styles = sorted(style.Name for item in product.Representation.Representations[0].Items
+                            for styled_item in item.StyledByItem for style in styled_item.Styles)
+            products[product.GlobalId] = (product.Name, properties, styles)
+        result[path.name] = (collections.Counter(entity.is_a() for entity in ifc_file), products)
+    return result
+
+
+def test_pipeline_equals_lock_step(tmp_path):
+    # IFC4X1, the schema of the containers
+    model = build_model(6, schema="IFC4X1")
+    results = []
+    for pipeline_depth in (0, 2):
+        output = tmp_path / f"depth{pipeline_depth}"
+        output.mkdir()
+        ifc_path, alignment_paths = setup_model(output, model)
+        t1.extract_areas_file(ifc_path, alignment_paths, output, 1.0, iterator_threads=1, pipeline_depth=pipeline_depth)
+        results.append(meshes(output))
+    assert len(results[0]) == 6
+    assert results[0] == results[1]
+
+
+def test_pipeline_rejects_stream(tmp_path):
+    ifc_path, alignment_paths = setup_model(tmp_path, build_model(schema="IFC4X1"))
+    with pytest.raises(ValueError):
+        t1.extract_areas_file(ifc_path, alignment_paths, tmp_path, 1.0, iterator_threads=1, pipeline_depth=2, stream=True)
+
+
+def test_stream_equals_write(tmp_path):
+    model = build_model(6, schema="IFC4X1")
+    results = []
+    for stream in (False, True):
+        output = tmp_path / f"stream{stream}"
+        output.mkdir()
+        ifc_path, alignment_paths = setup_model(output, model)
+        t1.extract_areas_file(ifc_path, alignment_paths, output, 1.0, iterator_threads=1, stream=stream)
+        results.append((meshes(output), contents(output)))
+    assert len(results[0][0]) == 6
+    assert all(properties for _, products in results[0][1].values() for _, properties, _ in products.values())
+    assert results[0] == results[1]
+
+
+def test_incremental_records_failed_elements(tmp_path):
+    model = build_model(4, schema="IFC4X1")
+    # only an axis, the geometry iterator does not triangulate it
+    context = model.by_type("IfcGeometricRepresentationContext")[0]
+    element = model.by_type("IfcBuildingElementProxy")[0]
+    element.Representation.Representations = [model.create_entity(
+        "IfcShapeRepresentation", ContextOfItems=context, RepresentationIdentifier="Axis", RepresentationType="Curve3D",
+        Items=[model.create_entity("IfcPolyline", Points=[model.create_entity("IfcCartesianPoint", Coordinates=[0.0, 0.0, 0.0]),
+                                                          model.create_entity("IfcCartesianPoint", Coordinates=[1.0, 0.0, 0.0])])])]
+    ifc_path, alignment_paths = setup_model(tmp_path, model)
+    t1.extract_areas_file(ifc_path, alignment_paths, tmp_path, 1.0, iterator_threads=1, incremental=True)
+
+    manifest = ElementManifest(tmp_path / "m" / "m_manifest.json", "")
+    assert manifest.previous[element.GlobalId]["containers"] == []
+    assert not manifest.changed(manifest.hashes(ifcopenshell.open(str(ifc_path))))
+
+
+def test_catenaries_split_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(t1, "CATENARY_BATCH", 2)
+    model = build_model(1, schema="IFC4X1")
+    context = model.by_type("IfcGeometricRepresentationContext")[0]
+    expected = {}
+    for i in range(3):
+        vertices, faces = catenary(i, 0.0)
+        vertices = vertices - [4.4e5, 5.4e6, 500.0]
+        item = model.create_entity("IfcTriangulatedFaceSet", Closed=False, CoordIndex=(faces + 1).tolist(),
+                                   Coordinates=model.create_entity("IfcCartesianPointList3D", vertices.tolist()))
+        model.create_entity("IfcStyledItem", Item=item, Styles=model.by_type("IfcSurfaceStyle"))
+        model.create_entity("IfcBuildingElementProxy", GlobalId=ifcopenshell.guid.new(), Name=f"Fahrdraht {i}",
+                            ObjectPlacement=placement(model, (0, 0, 0)), Representation=model.create_entity(
+                                "IfcProductDefinitionShape", Representations=[model.create_entity(
+                                    "IfcShapeRepresentation", ContextOfItems=context, RepresentationIdentifier="Body",
+                                    RepresentationType="Tessellation", Items=[item])]))
+        for part, _, part_faces in split_catenaries([(vertices, faces)])[0]:
+            expected[f"{PART_NAMES[part]} {i}"] = len(part_faces)
+    ifc_path, alignment_paths = setup_model(tmp_path, model)
+    t1.extract_areas_file(ifc_path, alignment_paths, tmp_path, 1.0, iterator_threads=1)
+
+    parts = {name: len(triangles) for (_, _, name), triangles in meshes(tmp_path).items() if name != "E0"}
+    assert parts == expected
+    assert len(expected) == 9
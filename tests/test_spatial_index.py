@@ -0,0 +1,91 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+import numpy as np
+
+from python.modelling.spatial_index import AlignmentCorridor, ContainerIndex
+
+
+def boxes(rng, count=40):
+    """container bounding boxes of different sizes, some of them overlap"""
+    lower = rng.uniform(0, 1000, (count, 3)) * [1, 1, 0.01]
+    return [(tuple(lo), tuple(lo + extent)) for lo, extent in zip(lower, rng.uniform(20, 200, (count, 3)))]
+
+
+def brute_force(bounding_boxes, vertices):
+    found = []
+    for idx, (lower, upper) in enumerate(bounding_boxes):
+        inside = (vertices > np.array(lower)) & (vertices < np.array(upper))
+        if np.all(np.any(inside, axis=0)):
+            found.append(idx)
+    return found
+
+
+def test_container_index_equals_brute_force():
+    rng = np.random.default_rng(0)
+    bounding_boxes = boxes(rng)
+    index = ContainerIndex(bounding_boxes)
+    assert len(index) == len(bounding_boxes)
+    hits = 0
+    for _ in range(500):
+        vertices = rng.uniform([-50, -50, 0], [1250, 1250, 50]) + rng.uniform(-30, 30, (8, 3))
+        expected = brute_force(bounding_boxes, vertices)
+        assert index.query(vertices).tolist() == expected
+        hits += len(expected) > 1
+    # elements on the borders of overlapping containers
+    assert hits > 10
+
+
+def test_container_index_cell_sizes():
+    rng = np.random.default_rng(1)
+    bounding_boxes = boxes(rng)
+    vertices = [rng.uniform([0, 0, 0], [1200, 1200, 50]) + rng.uniform(-5, 5, (4, 3)) for _ in range(200)]
+    expected = [brute_force(bounding_boxes, v) for v in vertices]
+    for cell_size in (5.0, 37.0, 5000.0):
+        index = ContainerIndex(bounding_boxes, cell_size=cell_size)
+        assert [index.query(v).tolist() for v in vertices] == expected
+
+
+def test_empty_container_index():
+    index = ContainerIndex([])
+    assert len(index) == 0
+    assert len(index.query(np.zeros((3, 3)))) == 0
+
+
+def polyline_distance(polyline, points):
+    """distance in the (x, y) plane of every point to the densified polyline"""
+    dense = np.concatenate([np.linspace(a, b, 200) for a, b in zip(polyline[:-1], polyline[1:])])
+    return np.min(np.linalg.norm(points[:, None, :2] - dense[None, :, :2], axis=2), axis=1)
+
+
+def test_corridor_equals_brute_force():
+    rng = np.random.default_rng(2)
+    polyline = np.column_stack((np.linspace(0, 500, 26), 40 * np.sin(np.linspace(0, 3, 26))))
+    corridor = AlignmentCorridor([polyline], width=10.0)
+    kept = 0
+    for _ in range(300):
+        vertices = rng.uniform([-20, -70, 0], [520, 70, 5]) + rng.uniform(-1, 1, (6, 3))
+        distances = polyline_distance(polyline, vertices)
+        # the densified polyline is slightly farther away than the exact one
+        if np.abs(distances - 10.0).min() < 0.05:
+            continue
+        assert corridor.contains(vertices) == bool(np.any(distances <= 10.0))
+        kept += corridor.contains(vertices)
+    assert 10 < kept < 290
+
+
+def test_corridor_keeps_large_elements_crossed_by_the_alignment():
+    corridor = AlignmentCorridor([np.array([[0.0, 0.0], [100.0, 0.0], [200.0, 0.0]])], width=5.0)
+    # terrain patch, all vertices are far away from the alignment
+    terrain = np.array([[50.0, -300.0, 0.0], [150.0, -300.0, 0.0], [150.0, 300.0, 0.0], [50.0, 300.0, 0.0]])
+    assert corridor.contains(terrain)
+    assert not corridor.contains(terrain + [500.0, 0.0, 0.0])
+
+
+def test_corridor_of_several_alignments():
+    corridor = AlignmentCorridor([np.array([[0.0, 0.0], [100.0, 0.0]]), np.array([[0.0, 50.0]])], width=2.0, cell_size=7.0)
+    assert corridor.contains(np.array([[50.0, 1.5, 0.0]]))
+    assert corridor.contains(np.array([[1.0, 51.0, 0.0]]))
+    assert not corridor.contains(np.array([[50.0, 25.0, 0.0]]))
@@ -0,0 +1,67 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+import ifcopenshell
+import ifcopenshell.guid
+
+from python.modelling.step_writer import StepStreamWriter, step_record
+from tests.ifc_models import build_model, placement, tetrahedron
+
+
+def data_records(path):
+    """
+    :return: records of the DATA section of a STEP file
+    """
+    text = path.read_text()
+    data = text[text.index("DATA;") + len("DATA;"):text.index("ENDSEC;", text.index("DATA;"))]
+    return sorted(line.rstrip(";") for line in data.split("\n") if line.strip())
+
+
+def test_step_record_equals_write(model, tmp_path):
+    model.by_type("IfcBuildingElementProxy")[0].Name = "Weiche 'ä'"
+    model.write(str(tmp_path / "model.ifc"))
+    assert sorted(step_record(entity) for entity in model) == data_records(tmp_path / "model.ifc")
+
+
+def add_element(ifc_file, name):
+    context = ifc_file.by_type("IfcGeometricRepresentationContext")[0]
+    return ifc_file.create_entity("IfcBuildingElementProxy", GlobalId=ifcopenshell.guid.new(), Name=name,
+                                  ObjectPlacement=placement(ifc_file, (0, 0, 0)),
+                                  Representation=ifc_file.create_entity("IfcProductDefinitionShape",
+                                                                        Representations=[tetrahedron(ifc_file, context)]))
+
+
+def test_streamed_equals_written(tmp_path):
+    model = build_model()
+    writer = StepStreamWriter(model, tmp_path / "streamed.ifc")
+    first = add_element(model, "first")
+    # not referenced by any root of the flush
+    unreferenced = model.create_entity("IfcPropertySet", GlobalId=ifcopenshell.guid.new(), Name="Pset_Unreferenced",
+                                       HasProperties=[model.create_entity("IfcPropertySingleValue", Name="Value")])
+    writer.flush([first])
+    # an earlier, written instance referenced by a new one
+    model.create_entity("IfcRelDefinesByProperties", GlobalId=ifcopenshell.guid.new(),
+                        RelatedObjects=[add_element(model, "second")], RelatingPropertyDefinition=unreferenced)
+    writer.flush([])
+    assert writer.flush([first]) == 0
+    writer.close()
+
+    model.write(str(tmp_path / "written.ifc"))
+    assert data_records(tmp_path / "streamed.ifc") == data_records(tmp_path / "written.ifc")
+    assert writer.count == len(list(model))
+
+
+def test_removed_instances_stay_written(tmp_path):
+    model = build_model()
+    writer = StepStreamWriter(model, tmp_path / "streamed.ifc")
+    element = add_element(model, "removed")
+    records = sorted(step_record(entity) for entity in model)
+    writer.flush([element])
+    model.remove(element)
+    # created and removed between two flushes, never written
+    model.remove(model.create_entity("IfcCartesianPoint", Coordinates=[9.0, 9.0, 9.0]))
+    writer.flush([])
+    writer.close()
+    assert data_records(tmp_path / "streamed.ifc") == records
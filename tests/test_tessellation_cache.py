@@ -0,0 +1,70 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+import ifcopenshell
+import ifcopenshell.geom
+import ifcopenshell.guid
+import numpy as np
+
+from python.modelling.tessellation_cache import TessellationCache, tessellate
+from tests.ifc_models import placement
+
+
+def add_opening(ifc_file, element, xyz):
+    """box opening of 0.2 m in the element"""
+    context = ifc_file.by_type("IfcGeometricRepresentationContext")[0]
+    profile = ifc_file.create_entity("IfcRectangleProfileDef", ProfileType="AREA", XDim=0.2, YDim=0.2)
+    solid = ifc_file.create_entity("IfcExtrudedAreaSolid", SweptArea=profile, Depth=0.2,
+                                   ExtrudedDirection=ifc_file.create_entity("IfcDirection", DirectionRatios=[0.0, 0.0, 1.0]))
+    opening = ifc_file.create_entity(
+        "IfcOpeningElement", GlobalId=ifcopenshell.guid.new(), ObjectPlacement=placement(ifc_file, xyz, element.ObjectPlacement),
+        Representation=ifc_file.create_entity("IfcProductDefinitionShape", Representations=[
+            ifc_file.create_entity("IfcShapeRepresentation", ContextOfItems=context, RepresentationIdentifier="Body",
+                                   RepresentationType="SweptSolid", Items=[solid])]))
+    ifc_file.create_entity("IfcRelVoidsElement", GlobalId=ifcopenshell.guid.new(), RelatingBuildingElement=element,
+                           RelatedOpeningElement=opening)
+    return opening
+
+
+def test_key_ignores_ids_and_names(model, tmp_path):
+    cache = TessellationCache(tmp_path)
+    first, second = model.by_type("IfcBuildingElementProxy")[:2]
+    second.ObjectPlacement = first.ObjectPlacement
+    second.Name = "other"
+    assert cache.key(first) == cache.key(second)
+
+
+def test_key_depends_on_openings(model, tmp_path):
+    element = model.by_type("IfcBuildingElementProxy")[0]
+    before = TessellationCache(tmp_path).key(element)
+    opening = add_opening(model, element, (0.1, 0.1, 0.0))
+    with_opening = TessellationCache(tmp_path).key(element)
+    opening.ObjectPlacement.RelativePlacement.Location.Coordinates = [0.2, 0.1, 0.0]
+    moved = TessellationCache(tmp_path).key(element)
+    assert len({before, with_opening, moved}) == 3
+
+
+def test_key_depends_on_units(model, tmp_path):
+    cache = TessellationCache(tmp_path)
+    element = model.by_type("IfcBuildingElementProxy")[0]
+    metre = cache.key(element, cache.units(model))
+    model.by_type("IfcSIUnit")[0].Prefix = "MILLI"
+    cache = TessellationCache(tmp_path)
+    assert cache.key(element, cache.units(model)) != metre
+
+
+def test_cached_shapes_equal_triangulated(model, tmp_path):
+    settings = ifcopenshell.geom.settings()
+    settings.set(settings.USE_WORLD_COORDS, True)
+    cache = TessellationCache(tmp_path)
+    triangulated = {guid: (v, f) for guid, v, f in tessellate(model, settings, cache=cache)}
+    assert cache.misses == len(triangulated) and cache.hits == 0
+
+    cache = TessellationCache(tmp_path)
+    cached = {guid: (v, f) for guid, v, f in tessellate(model, settings, cache=cache)}
+    assert cache.hits == len(triangulated) and cache.misses == 0
+    assert cached.keys() == triangulated.keys()
+    for guid, (vertices, faces) in triangulated.items():
+        assert np.array_equal(cached[guid][0], vertices) and np.array_equal(cached[guid][1], faces)
@@ -0,0 +1,30 @@
+#  17.10.2026 ----------------------------------------------------------------------------------------------------------------------
+#  created by: Felix Eickeler
+#              felix.eickeler@tum.de
+# ----------------------------------------------------------------------------------------------------------------------------------
+
+import numpy as np
+import pytest
+
+from python.modelling.alignment_shapes.TransitionCurveSegment import TransitionCurveSegment
+
+Clothoid = pytest.importorskip("pyclothoids").Clothoid
+
+
+@pytest.mark.parametrize("length, r0, ccw0, r1, ccw1, direction", [
+    (10, 0, False, 10, False, 0), (120, 0, True, 350, True, 1.2),
+    (80, 900, False, 400, False, -2.5), (60, 300, True, 800, False, 0.4)])
+def test_clothoid_matches_pyclothoids(length, r0, ccw0, r1, ccw1, direction):
+    """regression against pyclothoids, which was used for sampling before"""
+    segment = TransitionCurveSegment(length, direction, np.array([4521330.5, 5332110.25]), r0, ccw0, r1, ccw1,
+                                     "CLOTHOIDCURVE")
+    distances, points = segment.sample(0.5, is_end=True)
+    clothoid = Clothoid.StandardParams(segment.start_point[0], segment.start_point[1], direction,
+                                       segment.start_curvature,
+                                       (segment.end_curvature - segment.start_curvature) / length, length)
+    expected = np.array([[clothoid.X(i) for i in distances], [clothoid.Y(i) for i in distances]])
+
+    # Fresnel evaluation and the generic quadrature of the other curve types
+    assert np.abs(points - expected).max() < 1e-6
+    assert np.abs(segment._integrated_points(distances) - expected).max() < 1e-6
+    assert np.abs(np.array([clothoid.Theta(i) for i in distances]) - segment.heading_at(distances)).max() < 1e-9